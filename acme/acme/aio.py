@@ -0,0 +1,494 @@
+"""Asyncio ACME v2 client API.
+
+This module requires Python 3.5 or later and the ``aio`` extra of the
+acme package, which installs `aiohttp`. It provides coroutine versions
+of `acme.client.ClientV2` and `acme.client.ClientNetwork`, so that a
+single event loop can drive many orders at once. Messages, JWS signing,
+nonce handling and the mapping of error responses to exceptions are
+shared with the blocking client.
+
+"""
+import asyncio
+import datetime
+import logging
+
+import aiohttp
+import OpenSSL
+import josepy as jose
+import requests
+from requests.structures import CaseInsensitiveDict
+from six.moves import http_client  # pylint: disable=import-error
+
+from acme import client
+from acme import errors
+from acme import messages
+from acme import nonces
+
+logger = logging.getLogger(__name__)
+
+
+def _requests_response(method, url, status, headers, content):
+    """Wrap a received response in a `requests.Response`.
+
+    This lets the response be checked and parsed by the same code as
+    the responses of the blocking client.
+
+    :param str method: method of the request
+    :param str url: URL of the request
+    :param int status: HTTP status code
+    :param headers: response headers
+    :param bytes content: response body
+
+    :rtype: `requests.Response`
+
+    """
+    response = requests.Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers)
+    response.url = url
+    response.encoding = requests.utils.get_encoding_from_headers(
+        response.headers)
+    response._content = content  # pylint: disable=protected-access
+    response.request = requests.Request(method, url)
+    return response
+
+
+class ClientNetwork(client.ClientNetwork):
+    """Asyncio counterpart of `acme.client.ClientNetwork`.
+
+    The `aiohttp.ClientSession` used to send requests is created on first
+    use, and must be released with `close` when the network is no longer
+    needed.
+
+    :param josepy.JWK key: Account private key
+    :param messages.RegistrationResource account: Account object.
+    :param josepy.JWASignature alg: Algoritm to use in signing JWS.
+    :param bool verify_ssl: Whether to verify certificates on SSL connections.
+    :param str user_agent: String to send as User-Agent header.
+    :param float timeout: Timeout for requests.
+    :param float nonce_ttl: Seconds after which unused nonces are discarded.
+    :param int nonce_low_water_mark: Number of unused nonces below which
+            more are requested from ``nonce_url`` ahead of demand.
+    """
+    def __init__(self, key, account=None, alg=jose.RS256, verify_ssl=True,
+                 user_agent='acme-python',
+                 timeout=client.DEFAULT_NETWORK_TIMEOUT,
+                 nonce_ttl=nonces.DEFAULT_NONCE_TTL, nonce_low_water_mark=0):
+        # pylint: disable=too-many-arguments
+        super(ClientNetwork, self).__init__(
+            key, account=account, alg=alg, verify_ssl=verify_ssl,
+            user_agent=user_agent, timeout=timeout, nonce_ttl=nonce_ttl,
+            nonce_low_water_mark=nonce_low_water_mark)
+        # Requests are sent with aiohttp instead
+        self.session.close()
+        self._nonce_session.close()
+        self.session = None
+        self._nonce_session = None
+        self._refill_task = None
+
+    def __del__(self):
+        # The session is closed asynchronously by close()
+        pass
+
+    async def close(self):
+        """Stop prefetching nonces and close the underlying HTTP session."""
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+            self._refill_task = None
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _send_request(self, method, url, *args, **kwargs):
+        """Send HTTP request.
+
+        Makes sure that `verify_ssl` is respected. Logs request and
+        response (with headers).
+
+        :param str method: method of the request
+        :param str url: URL of the request
+
+        :returns: HTTP Response
+        :rtype: `requests.Response`
+
+        """
+        if method == "POST":
+            logger.debug('Sending POST request to %s:\n%s',
+                         url, kwargs['data'])
+        else:
+            logger.debug('Sending %s request to %s.', method, url)
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+        # Unlike requests, aiohttp doesn't drop headers set to None
+        kwargs['headers'] = dict(
+            (name, value) for name, value in kwargs.get('headers', {}).items()
+            if value is not None)
+        kwargs['headers'].setdefault('User-Agent', self.user_agent)
+        kwargs['timeout'] = aiohttp.ClientTimeout(
+            total=kwargs.get('timeout', self._default_timeout))
+        if not self.verify_ssl:
+            kwargs['ssl'] = False
+        async with self.session.request(method, url, *args, **kwargs) as resp:
+            content = await resp.read()
+            response = _requests_response(
+                method, url, resp.status, resp.headers, content)
+        logger.debug('Received response:\nHTTP %d\n%s\n\n%s',
+                     response.status_code,
+                     "\n".join(["{0}: {1}".format(k, v)
+                                for k, v in response.headers.items()]),
+                     response.content)
+        return response
+
+    async def head(self, *args, **kwargs):
+        """Send HEAD request without checking the response."""
+        return await self._send_request('HEAD', *args, **kwargs)
+
+    async def get(self, url, content_type=client.ClientNetwork.JSON_CONTENT_TYPE,
+                  **kwargs):
+        """Send GET request and check response."""
+        return self._check_response(
+            await self._send_request('GET', url, **kwargs),
+            content_type=content_type)
+
+    async def _get_nonce(self, url):
+        nonce = self._nonces.pop()
+        if nonce is None:
+            logger.debug('Requesting fresh nonce')
+            nonce = self._decode_nonce(await self.head(self.nonce_url or url))
+        self._prefetch_nonces()
+        return nonce
+
+    def _prefetch_nonces(self):
+        """Refill the nonce pool in the background if it is running low."""
+        if self.nonce_url is not None and self._nonces.start_refill():
+            self._refill_task = asyncio.ensure_future(self._refill_nonces())
+
+    async def _refill_nonces(self):
+        """Request nonces until the pool is above its low-water mark."""
+        try:
+            while self._nonces.needs_refill():
+                self._add_nonce(await self.head(self.nonce_url))
+        except Exception as error:  # pylint: disable=broad-except
+            # Nonces will be requested on demand instead
+            logger.debug('Failed to prefetch nonce: %s', error)
+        finally:
+            self._nonces.finish_refill()
+
+    async def post(self, *args, **kwargs):
+        """POST object wrapped in `.JWS` and check response.
+
+        If the server responded with a badNonce error, the request will
+        be retried once.
+
+        """
+        try:
+            return await self._post_once(*args, **kwargs)
+        except messages.Error as error:
+            if error.code == 'badNonce':
+                logger.debug('Retrying request after error:\n%s', error)
+                return await self._post_once(*args, **kwargs)
+            else:
+                raise
+
+    async def _post_once(self, url, obj,
+                         content_type=client.ClientNetwork.JOSE_CONTENT_TYPE,
+                         acme_version=1, **kwargs):
+        nonce = await self._get_nonce(url)
+        data = self._wrap_in_jws(obj, nonce, url, acme_version)
+        kwargs.setdefault('headers', {'Content-Type': content_type})
+        response = await self._send_request('POST', url, data=data, **kwargs)
+        self._add_nonce(response)
+        return self._check_response(response, content_type=content_type)
+
+
+class ClientV2(client.ClientV2):
+    """Asyncio counterpart of `acme.client.ClientV2`.
+
+    :ivar messages.Directory directory:
+    :ivar .ClientNetwork net: Client network.
+    """
+
+    @classmethod
+    async def get_directory(cls, url, net):
+        """Retrieve the directory of an ACME server.
+
+        :param str url: URL of the directory
+        :param .ClientNetwork net: Client network.
+
+        :rtype: `.messages.Directory`
+        """
+        return messages.Directory.from_json((await net.get(url)).json())
+
+    async def _post(self, *args, **kwargs):
+        """Wrapper around self.net.post that adds the acme_version."""
+        kwargs.setdefault('acme_version', self.acme_version)
+        return await self.net.post(*args, **kwargs)
+
+    async def _send_recv_regr(self, regr, body):
+        response = await self._post(regr.uri, body)
+        return self._regr_from_response(
+            response, uri=regr.uri,
+            terms_of_service=regr.terms_of_service)
+
+    async def update_registration(self, regr, update=None):
+        """Update registration.
+
+        :param messages.RegistrationResource regr: Registration Resource.
+        :param messages.Registration update: Updated body of the
+            resource. If not provided, body will be taken from `regr`.
+
+        :returns: Updated Registration Resource.
+        :rtype: `.RegistrationResource`
+
+        """
+        update = regr.body if update is None else update
+        body = messages.UpdateRegistration(**dict(update))
+        updated_regr = await self._send_recv_regr(regr, body=body)
+        self.net.account = updated_regr
+        return updated_regr
+
+    async def deactivate_registration(self, regr):
+        """Deactivate registration.
+
+        :param messages.RegistrationResource regr: The Registration Resource
+            to be deactivated.
+
+        :returns: The Registration resource that was deactivated.
+        :rtype: `.RegistrationResource`
+
+        """
+        return await self.update_registration(
+            regr, update={'status': 'deactivated'})
+
+    async def query_registration(self, regr):
+        """Query server about registration.
+
+        :param messages.RegistrationResource: Existing Registration
+            Resource.
+
+        """
+        return await self._send_recv_regr(regr, messages.UpdateRegistration())
+
+    async def answer_challenge(self, challb, response):
+        """Answer challenge.
+
+        :param challb: Challenge Resource body.
+        :type challb: `.ChallengeBody`
+
+        :param response: Corresponding Challenge response
+        :type response: `.challenges.ChallengeResponse`
+
+        :returns: Challenge Resource with updated body.
+        :rtype: `.ChallengeResource`
+
+        :raises .UnexpectedUpdate:
+
+        """
+        return self._challr_from_response(
+            challb, await self._post(challb.uri, response))
+
+    async def poll(self, authzr):
+        """Poll Authorization Resource for status.
+
+        :param authzr: Authorization Resource
+        :type authzr: `.AuthorizationResource`
+
+        :returns: Updated Authorization Resource and HTTP response.
+
+        :rtype: (`.AuthorizationResource`, `requests.Response`)
+
+        """
+        response = await self.net.get(authzr.uri)
+        updated_authzr = self._authzr_from_response(
+            response, authzr.body.identifier, authzr.uri)
+        return updated_authzr, response
+
+    async def new_account(self, new_account):
+        """Register.
+
+        :param .NewRegistration new_account:
+
+        :returns: Registration Resource.
+        :rtype: `.RegistrationResource`
+        """
+        response = await self._post(self.directory['newAccount'], new_account)
+        regr = self._regr_from_response(response)
+        self.net.account = regr
+        return regr
+
+    async def new_order(self, csr_pem):
+        """Request a new Order object from the server.
+
+        The authorizations of the order are retrieved concurrently.
+
+        :param str csr_pem: A CSR in PEM format.
+
+        :returns: The newly created order.
+        :rtype: OrderResource
+        """
+        response = await self._post(self.directory['newOrder'],
+                                    self._new_order_from_csr(csr_pem))
+        body = messages.Order.from_json(response.json())
+        authz_responses = await asyncio.gather(
+            *[self.net.get(url) for url in body.authorizations])
+        authorizations = [
+            self._authzr_from_response(authz_response, uri=url)
+            for url, authz_response in zip(body.authorizations, authz_responses)]
+        return messages.OrderResource(
+            body=body,
+            uri=response.headers.get('Location'),
+            authorizations=authorizations,
+            csr_pem=csr_pem)
+
+    async def poll_and_finalize(self, orderr, deadline=None):
+        """Poll authorizations and finalize the order.
+
+        If no deadline is provided, this method will timeout after 90
+        seconds.
+
+        :param messages.OrderResource orderr: order to finalize
+        :param datetime.datetime deadline: when to stop polling and timeout
+
+        :returns: finalized order
+        :rtype: messages.OrderResource
+
+        """
+        if deadline is None:
+            deadline = datetime.datetime.now() + datetime.timedelta(seconds=90)
+        orderr = await self.poll_authorizations(orderr, deadline)
+        return await self.finalize_order(orderr, deadline)
+
+    async def _poll_authorization(self, orderr, url, deadline):
+        """Poll a single authorization until it is no longer pending.
+
+        :param messages.OrderResource orderr: order the authorization
+            belongs to
+        :param str url: URL of the authorization
+        :param datetime.datetime deadline: when to stop polling and timeout
+
+        :rtype: `.AuthorizationResource`
+
+        :raises .TimeoutError: if the authorization is still pending at
+            the deadline
+
+        """
+        attempt = 0
+        while True:
+            response = await self.net.get(url)
+            self.polling_policy.record_poll(orderr.uri)
+            authzr = self._authzr_from_response(response, uri=url)
+            if authzr.body.status != messages.STATUS_PENDING:
+                return authzr
+            when = self.polling_policy.next_poll(attempt, response)
+            if when >= deadline:
+                self.polling_policy.forget(orderr.uri)
+                raise errors.TimeoutError()
+            await asyncio.sleep(
+                max((when - datetime.datetime.now()).total_seconds(), 0))
+            attempt += 1
+
+    async def poll_authorizations(self, orderr, deadline):
+        """Poll all authorizations of an order concurrently.
+
+        :param messages.OrderResource orderr: order whose authorizations
+            should be polled
+        :param datetime.datetime deadline: when to stop polling and timeout
+
+        :returns: order updated with the final authorizations
+        :rtype: messages.OrderResource
+
+        :raises .TimeoutError: if some authorization is still pending at
+            the deadline
+        :raises .ValidationError: if some authorization failed
+
+        """
+        tasks = [asyncio.ensure_future(self._poll_authorization(orderr, url, deadline))
+                 for url in orderr.body.authorizations]
+        try:
+            responses = await asyncio.gather(*tasks)
+        except Exception:
+            for task in tasks:
+                task.cancel()
+            raise
+        try:
+            self._check_authorizations(responses)
+        except errors.ValidationError:
+            self.polling_policy.forget(orderr.uri)
+            raise
+        return orderr.update(authorizations=list(responses))
+
+    async def finalize_order(self, orderr, deadline):
+        """Finalize an order and obtain a certificate.
+
+        :param messages.OrderResource orderr: order to finalize
+        :param datetime.datetime deadline: when to stop polling and timeout
+
+        :returns: finalized order
+        :rtype: messages.OrderResource
+
+        """
+        csr = OpenSSL.crypto.load_certificate_request(
+            OpenSSL.crypto.FILETYPE_PEM, orderr.csr_pem)
+        wrapped_csr = messages.CertificateRequest(csr=jose.ComparableX509(csr))
+        response = await self._post(orderr.body.finalize, wrapped_csr)
+        attempt = 0
+        while True:
+            body = messages.Order.from_json(response.json())
+            if body.error is not None:
+                self.polling_policy.forget(orderr.uri)
+                raise errors.IssuanceError(body.error)
+            if body.certificate is not None:
+                logger.debug('Order %s finalized after %d polls', orderr.uri,
+                             self.polling_policy.forget(orderr.uri))
+                certificate_response = (await self.net.get(
+                    body.certificate, content_type=client.DER_CONTENT_TYPE)).text
+                return orderr.update(body=body, fullchain_pem=certificate_response)
+
+            when = self.polling_policy.next_poll(attempt, response)
+            if when >= deadline:
+                self.polling_policy.forget(orderr.uri)
+                raise errors.TimeoutError()
+            await asyncio.sleep(
+                max((when - datetime.datetime.now()).total_seconds(), 0))
+            response = await self.net.get(orderr.uri)
+            self.polling_policy.record_poll(orderr.uri)
+            attempt += 1
+
+    async def _revoke(self, cert, rsn, url):
+        """Revoke certificate.
+
+        :param .ComparableX509 cert: `OpenSSL.crypto.X509` wrapped in
+            `.ComparableX509`
+
+        :param int rsn: Reason code for certificate revocation.
+
+        :param str url: ACME URL to post to
+
+        :raises .ClientError: If revocation is unsuccessful.
+
+        """
+        response = await self._post(url,
+                                    messages.Revocation(
+                                        certificate=cert,
+                                        reason=rsn),
+                                    content_type=None)
+        if response.status_code != http_client.OK:
+            raise errors.ClientError(
+                'Successful revocation must return HTTP OK status')
+
+    async def revoke(self, cert, rsn):
+        """Revoke certificate.
+
+        :param .ComparableX509 cert: `OpenSSL.crypto.X509` wrapped in
+            `.ComparableX509`
+
+        :param int rsn: Reason code for certificate revocation.
+
+        :raises .ClientError: If revocation is unsuccessful.
+
+        """
+        return await self._revoke(cert, rsn, self.directory['revokeCert'])
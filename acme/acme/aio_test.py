@@ -0,0 +1,395 @@
+"""Tests for acme.aio."""
+import asyncio
+import datetime
+import json
+import unittest
+
+import josepy as jose
+import mock
+from six.moves import http_client  # pylint: disable=import-error
+
+from acme import challenges
+from acme import errors
+from acme import jws as acme_jws
+from acme import messages
+from acme import messages_test
+from acme import test_util
+from acme.client_test import DIRECTORY_V2
+
+
+CSR_SAN_PEM = test_util.load_vector('csr-san.pem')
+KEY = jose.JWKRSA.load(test_util.load_vector('rsa512_key.pem'))
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _response(status=http_client.OK, jobj=None, headers=None, content=None):
+    from acme.aio import _requests_response
+    if jobj is not None:
+        content = json.dumps(jobj).encode()
+        headers = dict(headers or {})
+        headers.setdefault('Content-Type', 'application/json')
+    return _requests_response(
+        'GET', 'https://example.com', status, headers or {}, content or b'')
+
+
+class _FakeNet(object):
+    """Fake acme.aio.ClientNetwork returning canned responses per URL."""
+
+    def __init__(self):
+        self.account = None
+        self.nonce_url = None
+        self.responses = {}
+        self.posted = []
+
+    def _pop(self, url):
+        response = self.responses[url]
+        return response.pop(0) if isinstance(response, list) else response
+
+    async def get(self, url, **unused_kwargs):
+        # pylint: disable=missing-docstring
+        return self._pop(url)
+
+    async def post(self, url, obj, **kwargs):
+        # pylint: disable=missing-docstring
+        self.posted.append((url, obj, kwargs))
+        return self._pop(url)
+
+
+class ClientV2Test(unittest.TestCase):
+    """Tests for acme.aio.ClientV2."""
+
+    def setUp(self):
+        from acme.aio import ClientV2
+        self.net = _FakeNet()
+        self.client = ClientV2(DIRECTORY_V2, self.net)
+
+        self.authzr_uri = 'https://www.letsencrypt-demo.org/acme/authz/1'
+        self.authzr_uri2 = 'https://www.letsencrypt-demo.org/acme/authz/2'
+        challb = messages.ChallengeBody(
+            uri=(self.authzr_uri + '/1'), status=messages.STATUS_VALID,
+            chall=challenges.DNS(token=jose.b64decode(
+                'evaGxfADs6pSRb2LAv9IZf17Dt3juxGJ-PCt92wr-oA')))
+        self.challb = challb
+        self.authz = messages.Authorization(
+            identifier=messages.Identifier(
+                typ=messages.IDENTIFIER_FQDN, value='example.com'),
+            challenges=(challb,), combinations=None,
+            status=messages.STATUS_PENDING)
+        self.authz2 = self.authz.update(identifier=messages.Identifier(
+            typ=messages.IDENTIFIER_FQDN, value='www.example.com'))
+        self.order = messages.Order(
+            identifiers=(self.authz.identifier, self.authz2.identifier),
+            status=messages.STATUS_PENDING,
+            authorizations=(self.authzr_uri, self.authzr_uri2),
+            finalize='https://www.letsencrypt-demo.org/acme/acct/1/order/1/finalize')
+        self.orderr = messages.OrderResource(
+            body=self.order,
+            uri='https://www.letsencrypt-demo.org/acme/acct/1/order/1',
+            authorizations=[], csr_pem=CSR_SAN_PEM)
+
+    def test_init(self):
+        self.assertEqual(self.net.nonce_url, DIRECTORY_V2['newNonce'])
+
+    def test_io_methods_overridden(self):
+        from acme.aio import ClientV2
+        for name in ('_post', '_send_recv_regr', 'update_registration',
+                     'deactivate_registration', 'query_registration',
+                     'answer_challenge', 'poll', '_revoke', 'new_account',
+                     'new_order', 'poll_and_finalize', 'poll_authorizations',
+                     'finalize_order', 'revoke', 'get_directory'):
+            self.assertTrue(
+                asyncio.iscoroutinefunction(getattr(ClientV2, name)), name)
+
+    def test_get_directory(self):
+        self.net.responses['dir'] = _response(jobj=DIRECTORY_V2.to_json())
+        directory = _run(self.client.get_directory('dir', self.net))
+        self.assertEqual(directory['newOrder'], DIRECTORY_V2['newOrder'])
+
+    def test_new_account(self):
+        reg = messages.Registration(contact=('mailto:cert-admin@example.com',))
+        self.net.responses[DIRECTORY_V2['newAccount']] = _response(
+            status=http_client.CREATED, jobj=reg.to_json(),
+            headers={'Location': 'https://example.com/acct/1'})
+        regr = _run(self.client.new_account(messages.NewRegistration()))
+        self.assertEqual(regr.uri, 'https://example.com/acct/1')
+        self.assertEqual(regr.body, reg)
+        self.assertEqual(self.net.account, regr)
+
+    def test_update_registration(self):
+        reg = messages.Registration(contact=('mailto:cert-admin@example.com',))
+        regr = messages.RegistrationResource(
+            body=reg, uri='https://example.com/acct/1')
+        self.net.responses[regr.uri] = _response(jobj=reg.to_json())
+        self.assertEqual(_run(self.client.query_registration(regr)), regr)
+        self.assertEqual(_run(self.client.deactivate_registration(regr)), regr)
+        self.assertEqual(self.net.posted[-1][1].status, 'deactivated')
+
+    def test_answer_challenge(self):
+        self.net.responses[self.challb.uri] = _response(
+            jobj=self.challb.to_json(),
+            headers={'Link': '<{0}>;rel="up"'.format(self.authzr_uri)})
+        challr = _run(self.client.answer_challenge(
+            self.challb, challenges.DNSResponse(validation=None)))
+        self.assertEqual(challr.authzr_uri, self.authzr_uri)
+
+    def test_new_order(self):
+        self.net.responses[DIRECTORY_V2['newOrder']] = _response(
+            status=http_client.CREATED, jobj=self.order.to_json(),
+            headers={'Location': self.orderr.uri})
+        self.net.responses[self.authzr_uri] = _response(jobj=self.authz.to_json())
+        self.net.responses[self.authzr_uri2] = _response(jobj=self.authz2.to_json())
+
+        orderr = _run(self.client.new_order(CSR_SAN_PEM))
+        self.assertEqual(orderr.uri, self.orderr.uri)
+        self.assertEqual([authzr.body for authzr in orderr.authorizations],
+                         [self.authz, self.authz2])
+        self.assertEqual(
+            set(identifier.value for identifier in self.net.posted[0][1].identifiers),
+            set(['example.com', 'www.example.com']))
+
+    @mock.patch('acme.aio.asyncio.sleep')
+    def test_poll_authorizations(self, mock_sleep):
+        async def sleep(unused_seconds):
+            pass
+        mock_sleep.side_effect = sleep
+        valid = self.authz.update(status=messages.STATUS_VALID)
+        valid2 = self.authz2.update(status=messages.STATUS_VALID)
+        self.net.responses[self.authzr_uri] = [
+            _response(jobj=self.authz.to_json()), _response(jobj=valid.to_json())]
+        self.net.responses[self.authzr_uri2] = [_response(jobj=valid2.to_json())]
+
+        deadline = datetime.datetime(9999, 9, 9)
+        orderr = _run(self.client.poll_authorizations(self.orderr, deadline))
+        self.assertEqual([authzr.body for authzr in orderr.authorizations],
+                         [valid, valid2])
+        self.assertEqual(mock_sleep.call_count, 1)
+        self.assertEqual(self.client.polling_policy.polls[self.orderr.uri], 3)
+
+    def test_poll_authorizations_timeout(self):
+        self.net.responses[self.authzr_uri] = _response(
+            jobj=self.authz.to_json(), headers={'Retry-After': '120'})
+        self.net.responses[self.authzr_uri2] = _response(
+            jobj=self.authz2.to_json(), headers={'Retry-After': '120'})
+        deadline = datetime.datetime.now() + datetime.timedelta(seconds=60)
+        self.assertRaises(errors.TimeoutError, _run,
+                          self.client.poll_authorizations(self.orderr, deadline))
+
+    def test_poll_authorizations_failure(self):
+        challb = self.challb.update(status=messages.STATUS_INVALID,
+                                    error=messages.Error.with_code('unauthorized'))
+        invalid = self.authz.update(status=messages.STATUS_INVALID,
+                                    challenges=(challb,))
+        self.net.responses[self.authzr_uri] = _response(jobj=invalid.to_json())
+        self.net.responses[self.authzr_uri2] = _response(jobj=invalid.to_json())
+        deadline = datetime.datetime(9999, 9, 9)
+        self.assertRaises(errors.ValidationError, _run,
+                          self.client.poll_authorizations(self.orderr, deadline))
+
+    @mock.patch('acme.aio.asyncio.sleep')
+    def test_finalize_order(self, mock_sleep):
+        async def sleep(unused_seconds):
+            pass
+        mock_sleep.side_effect = sleep
+        cert_url = 'https://www.letsencrypt-demo.org/acme/cert/'
+        updated_order = self.order.update(certificate=cert_url)
+        self.net.responses[self.order.finalize] = _response(
+            jobj=self.order.to_json())
+        self.net.responses[self.orderr.uri] = [
+            _response(jobj=self.order.to_json()),
+            _response(jobj=updated_order.to_json())]
+        self.net.responses[cert_url] = _response(content=b'fullchain')
+
+        deadline = datetime.datetime(9999, 9, 9)
+        orderr = _run(self.client.finalize_order(self.orderr, deadline))
+        self.assertEqual(orderr.fullchain_pem, 'fullchain')
+        self.assertEqual(orderr.body, updated_order)
+        self.assertFalse(self.orderr.uri in self.client.polling_policy.polls)
+
+    def test_finalize_order_error(self):
+        error_order = self.order.update(error=messages.Error.with_code('unauthorized'))
+        self.net.responses[self.order.finalize] = _response(
+            jobj=self.order.to_json())
+        self.net.responses[self.orderr.uri] = _response(
+            jobj=error_order.to_json())
+        with mock.patch('acme.aio.asyncio.sleep') as mock_sleep:
+            async def sleep(unused_seconds):
+                pass
+            mock_sleep.side_effect = sleep
+            self.assertRaises(errors.IssuanceError, _run, self.client.finalize_order(
+                self.orderr, datetime.datetime(9999, 9, 9)))
+
+    def test_revoke(self):
+        self.net.responses[DIRECTORY_V2['revokeCert']] = _response()
+        _run(self.client.revoke(messages_test.CERT, 1))
+        self.assertTrue(self.net.posted[0][2]['content_type'] is None)
+
+        self.net.responses[DIRECTORY_V2['revokeCert']] = _response(
+            status=http_client.ACCEPTED)
+        self.assertRaises(errors.ClientError, _run,
+                          self.client.revoke(messages_test.CERT, 1))
+
+
+class ClientNetworkTest(unittest.TestCase):
+    """Tests for acme.aio.ClientNetwork."""
+
+    def setUp(self):
+        from acme.aio import ClientNetwork
+        self.net = ClientNetwork(key=KEY, alg=jose.RS256, verify_ssl=False)
+        self.requests = []
+        self.responses = []
+
+        async def send_request(method, url, *args, **kwargs):
+            # pylint: disable=unused-argument
+            self.requests.append((method, url, kwargs))
+            return self.responses.pop(0)
+        self.net._send_request = send_request  # pylint: disable=protected-access
+
+    @classmethod
+    def _nonce_response(cls, nonce, jobj=None, status=http_client.OK):
+        return _response(status=status, jobj=jobj if jobj is not None else {},
+                         headers={'Replay-Nonce': jose.b64encode(nonce).decode()})
+
+    def test_init(self):
+        self.assertTrue(self.net.session is None)
+        self.assertTrue(self.net._nonce_session is None)  # pylint: disable=protected-access
+
+    def test_io_methods_overridden(self):
+        from acme.aio import ClientNetwork
+        for name in ('_send_request', 'head', 'get', '_get_nonce',
+                     '_refill_nonces', 'post', '_post_once', 'close'):
+            self.assertTrue(
+                asyncio.iscoroutinefunction(getattr(ClientNetwork, name)), name)
+
+    def test_head_get(self):
+        self.responses = [_response(), _response(jobj={'a': 1})]
+        self.assertEqual(_run(self.net.head('url')).status_code, http_client.OK)
+        self.assertEqual(_run(self.net.get('url')).json(), {'a': 1})
+        self.assertEqual([request[0] for request in self.requests],
+                         ['HEAD', 'GET'])
+
+    def test_get_error(self):
+        self.responses = [_response(
+            status=http_client.BAD_REQUEST,
+            jobj=messages.Error.with_code('malformed').to_json())]
+        self.assertRaises(messages.Error, _run, self.net.get('url'))
+
+    def test_post(self):
+        self.net.nonce_url = 'new-nonce'
+        self.responses = [self._nonce_response(b'first'),
+                          self._nonce_response(b'second', {'ok': True})]
+        response = _run(self.net.post('url', messages.NewRegistration(),
+                                      acme_version=2))
+        self.assertEqual(response.json(), {'ok': True})
+        self.assertEqual(self.requests[0][:2], ('HEAD', 'new-nonce'))
+        jws = acme_jws.JWS.json_loads(self.requests[1][2]['data'])
+        self.assertEqual(jws.signature.combined.nonce, b'first')
+        self.assertEqual(jws.signature.combined.url, 'url')
+        # pylint: disable=protected-access
+        self.assertEqual(self.net._nonces.pop(), b'second')
+
+    def test_post_bad_nonce_retry(self):
+        bad_nonce = messages.Error.with_code('badNonce').to_json()
+        self.responses = [
+            self._nonce_response(b'first'),
+            self._nonce_response(b'second', bad_nonce, http_client.BAD_REQUEST),
+            self._nonce_response(b'third', {'ok': True})]
+        response = _run(self.net.post('url', messages.NewRegistration()))
+        self.assertEqual(response.json(), {'ok': True})
+
+    def test_refill_nonces(self):
+        self.net.nonce_url = 'new-nonce'
+        self.net._nonces.low_water_mark = 2  # pylint: disable=protected-access
+        self.responses = [self._nonce_response(b'1'), self._nonce_response(b'2')]
+
+        async def post_and_drain():
+            self.net._prefetch_nonces()  # pylint: disable=protected-access
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+        _run(post_and_drain())
+        self.assertEqual(len(self.net._nonces), 2)  # pylint: disable=protected-access
+
+    def test_close_cancels_refill(self):
+        self.net.nonce_url = 'new-nonce'
+        self.net._nonces.low_water_mark = 2  # pylint: disable=protected-access
+        started = []
+
+        async def send_request(*unused_args, **unused_kwargs):
+            started.append(True)
+            await asyncio.sleep(60)
+        self.net._send_request = send_request  # pylint: disable=protected-access
+
+        async def prefetch_and_close():
+            self.net._prefetch_nonces()  # pylint: disable=protected-access
+            await asyncio.sleep(0)
+            task = self.net._refill_task  # pylint: disable=protected-access
+            await self.net.close()
+            return task
+        task = _run(prefetch_and_close())
+        self.assertEqual(started, [True])
+        self.assertTrue(task.done())
+        self.assertTrue(self.net._refill_task is None)  # pylint: disable=protected-access
+        # pylint: disable=protected-access
+        self.assertTrue(self.net._nonces.start_refill())
+
+    def test_refill_nonces_error(self):
+        self.net.nonce_url = 'new-nonce'
+        self.net._nonces.low_water_mark = 2  # pylint: disable=protected-access
+        self.responses = [_response()]
+        # pylint: disable=protected-access
+        self.assertTrue(self.net._nonces.start_refill())
+        _run(self.net._refill_nonces())
+        self.assertTrue(self.net._nonces.start_refill())
+
+
+class SendRequestTest(unittest.TestCase):
+    """Tests for acme.aio.ClientNetwork._send_request."""
+
+    def setUp(self):
+        from acme.aio import ClientNetwork
+        self.net = ClientNetwork(key=KEY, verify_ssl=False, user_agent='test')
+        self.session = mock.MagicMock()
+        self.net.session = self.session
+        self.resp = mock.MagicMock(
+            status=http_client.OK, headers={'Content-Type': 'application/json'})
+
+        async def read():
+            return b'{"a": 1}'
+        self.resp.read = read
+
+        class _RequestContext(object):
+            # pylint: disable=missing-docstring
+            def __init__(self, resp):
+                self.resp = resp
+
+            async def __aenter__(self):
+                return self.resp
+
+            async def __aexit__(self, *args):
+                pass
+        self.session.request.return_value = _RequestContext(self.resp)
+
+    def test_send_request(self):
+        # pylint: disable=protected-access
+        response = _run(self.net._send_request(
+            'POST', 'url', data='data', headers={'Content-Type': None}))
+        self.assertEqual(response.json(), {'a': 1})
+        self.assertEqual(response.headers['content-type'], 'application/json')
+        _, kwargs = self.session.request.call_args
+        self.assertEqual(kwargs['headers'], {'User-Agent': 'test'})
+        self.assertTrue(kwargs['ssl'] is False)
+
+    def test_close(self):
+        async def close():
+            pass
+        self.session.close = mock.MagicMock(side_effect=close)
+        _run(self.net.close())
+        self.assertTrue(self.session.close.called)
+        self.assertTrue(self.net.session is None)
+        _run(self.net.close())
+
+
+if __name__ == '__main__':
+    unittest.main()  # pragma: no cover
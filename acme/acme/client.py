@@ -5,6 +5,7 @@ import datetime
 from email.utils import parsedate_tz
 import heapq
 import logging
+import threading
 import time
 
 import six
@@ -20,6 +21,8 @@ from acme import crypto_util
 from acme import errors
 from acme import jws
 from acme import messages
+from acme import nonces
+from acme import polling
 
 
 logger = logging.getLogger(__name__)
@@ -46,18 +49,24 @@ class ClientBase(object):  # pylint: disable=too-many-instance-attributes
     :ivar messages.Directory directory:
     :ivar .ClientNetwork net: Client network.
     :ivar int acme_version: ACME protocol version. 1 or 2.
+    :ivar .PollingPolicy polling_policy: Schedule of polls of pending
+        resources, shared by all polling loops of the client.
     """
 
-    def __init__(self, directory, net, acme_version):
+    def __init__(self, directory, net, acme_version, polling_policy=None):
         """Initialize.
 
         :param .messages.Directory directory: Directory Resource
         :param .ClientNetwork net: Client network.
         :param int acme_version: ACME protocol version. 1 or 2.
+        :param .PollingPolicy polling_policy: Schedule of polls of pending
+            resources. A default `.PollingPolicy` is used if not provided.
         """
         self.directory = directory
         self.net = net
         self.acme_version = acme_version
+        self.polling_policy = (polling.PollingPolicy() if polling_policy is None
+                               else polling_policy)
 
     @classmethod
     def _regr_from_response(cls, response, uri=None, terms_of_service=None):
@@ -150,7 +159,10 @@ class ClientBase(object):  # pylint: disable=too-many-instance-attributes
         :raises .UnexpectedUpdate:
 
         """
-        response = self._post(challb.uri, response)
+        return self._challr_from_response(challb, self._post(challb.uri, response))
+
+    @classmethod
+    def _challr_from_response(cls, challb, response):
         try:
             authzr_uri = response.links['up']['url']
         except KeyError:
@@ -561,14 +573,18 @@ class ClientV2(ClientBase):
     :ivar .ClientNetwork net: Client network.
     """
 
-    def __init__(self, directory, net):
+    def __init__(self, directory, net, polling_policy=None):
         """Initialize.
 
         :param .messages.Directory directory: Directory Resource
         :param .ClientNetwork net: Client network.
+        :param .PollingPolicy polling_policy: Schedule of polls of pending
+            resources.
         """
         super(ClientV2, self).__init__(directory=directory,
-            net=net, acme_version=2)
+            net=net, acme_version=2, polling_policy=polling_policy)
+        if hasattr(directory, 'newNonce'):
+            self.net.nonce_url = directory['newNonce']
 
     def new_account(self, new_account):
         """Register.
@@ -593,16 +609,8 @@ class ClientV2(ClientBase):
         :returns: The newly created order.
         :rtype: OrderResource
         """
-        csr = OpenSSL.crypto.load_certificate_request(OpenSSL.crypto.FILETYPE_PEM, csr_pem)
-        # pylint: disable=protected-access
-        dnsNames = crypto_util._pyopenssl_cert_or_req_all_names(csr)
-
-        identifiers = []
-        for name in dnsNames:
-            identifiers.append(messages.Identifier(typ=messages.IDENTIFIER_FQDN,
-                value=name))
-        order = messages.NewOrder(identifiers=identifiers)
-        response = self._post(self.directory['newOrder'], order)
+        response = self._post(self.directory['newOrder'],
+                              self._new_order_from_csr(csr_pem))
         body = messages.Order.from_json(response.json())
         authorizations = []
         for url in body.authorizations:
@@ -613,6 +621,24 @@ class ClientV2(ClientBase):
             authorizations=authorizations,
             csr_pem=csr_pem)
 
+    @classmethod
+    def _new_order_from_csr(cls, csr_pem):
+        """Build the new order message for the names in a CSR.
+
+        :param str csr_pem: A CSR in PEM format.
+
+        :rtype: messages.NewOrder
+        """
+        csr = OpenSSL.crypto.load_certificate_request(OpenSSL.crypto.FILETYPE_PEM, csr_pem)
+        # pylint: disable=protected-access
+        dnsNames = crypto_util._pyopenssl_cert_or_req_all_names(csr)
+
+        identifiers = []
+        for name in dnsNames:
+            identifiers.append(messages.Identifier(typ=messages.IDENTIFIER_FQDN,
+                value=name))
+        return messages.NewOrder(identifiers=identifiers)
+
     def poll_and_finalize(self, orderr, deadline=None):
         """Poll authorizations and finalize the order.
 
@@ -632,28 +658,78 @@ class ClientV2(ClientBase):
         return self.finalize_order(orderr, deadline)
 
     def poll_authorizations(self, orderr, deadline):
-        """Poll Order Resource for status."""
-        responses = []
-        for url in orderr.body.authorizations:
-            while datetime.datetime.now() < deadline:
-                authzr = self._authzr_from_response(self.net.get(url), uri=url)
-                if authzr.body.status != messages.STATUS_PENDING:
-                    responses.append(authzr)
-                    break
-                time.sleep(1)
-        # If we didn't get a response for every authorization, we fell through
-        # the bottom of the loop due to hitting the deadline.
-        if len(responses) < len(orderr.body.authorizations):
-            raise errors.TimeoutError()
+        """Poll Order Resource for status.
+
+        All authorizations of the order are polled in turn, each one when
+        `polling_policy` schedules its next poll, so the time spent waiting
+        is bounded by the slowest validation rather than the sum of all of
+        them.
+
+        :param messages.OrderResource orderr: order whose authorizations
+            should be polled
+        :param datetime.datetime deadline: when to stop polling and timeout
+
+        :returns: order updated with the final authorizations
+        :rtype: messages.OrderResource
+
+        :raises .TimeoutError: if some authorization is still pending at
+            the deadline
+        :raises .ValidationError: if some authorization failed
+
+        """
+        urls = orderr.body.authorizations
+        responses = [None] * len(urls)
+        attempts = [0] * len(urls)
+        # priority queue with the time of the next poll (given by the
+        # polling policy) as key, and the index of the authorization as value
+        now = datetime.datetime.now()
+        waiting = [(now, index) for index in range(len(urls))]
+        while waiting:
+            when, index = heapq.heappop(waiting)
+            now = datetime.datetime.now()
+            # Stop if the deadline passes before the next poll is due
+            if max(when, now) >= deadline:
+                self.polling_policy.forget(orderr.uri)
+                raise errors.TimeoutError()
+            if when > now:
+                seconds = (when - now).total_seconds()
+                logger.debug('Sleeping for %.1f seconds', seconds)
+                time.sleep(seconds)
+
+            response = self.net.get(urls[index])
+            self.polling_policy.record_poll(orderr.uri)
+            authzr = self._authzr_from_response(response, uri=urls[index])
+            if authzr.body.status != messages.STATUS_PENDING:
+                responses[index] = authzr
+            else:
+                heapq.heappush(waiting, (self.polling_policy.next_poll(
+                    attempts[index], response), index))
+                attempts[index] += 1
+        try:
+            self._check_authorizations(responses)
+        except errors.ValidationError:
+            self.polling_policy.forget(orderr.uri)
+            raise
+        return orderr.update(authorizations=responses)
+
+    @classmethod
+    def _check_authorizations(cls, authzrs):
+        """Check that no authorization of an order has failed.
+
+        :param list authzrs: `.AuthorizationResource` that are no longer
+            pending
+
+        :raises .ValidationError: if some authorization failed
+
+        """
         failed = []
-        for authzr in responses:
+        for authzr in authzrs:
             if authzr.body.status != messages.STATUS_VALID:
                 for chall in authzr.body.challenges:
                     if chall.error != None:
                         failed.append(authzr)
         if len(failed) > 0:
             raise errors.ValidationError(failed)
-        return orderr.update(authorizations=responses)
 
     def finalize_order(self, orderr, deadline):
         """Finalize an order and obtain a certificate.
@@ -668,18 +744,30 @@ class ClientV2(ClientBase):
         csr = OpenSSL.crypto.load_certificate_request(
             OpenSSL.crypto.FILETYPE_PEM, orderr.csr_pem)
         wrapped_csr = messages.CertificateRequest(csr=jose.ComparableX509(csr))
-        self._post(orderr.body.finalize, wrapped_csr)
-        while datetime.datetime.now() < deadline:
-            time.sleep(1)
-            response = self.net.get(orderr.uri)
+        response = self._post(orderr.body.finalize, wrapped_csr)
+        attempt = 0
+        while True:
             body = messages.Order.from_json(response.json())
             if body.error is not None:
+                self.polling_policy.forget(orderr.uri)
                 raise errors.IssuanceError(body.error)
             if body.certificate is not None:
+                logger.debug('Order %s finalized after %d polls', orderr.uri,
+                             self.polling_policy.forget(orderr.uri))
                 certificate_response = self.net.get(body.certificate,
                                                     content_type=DER_CONTENT_TYPE).text
                 return orderr.update(body=body, fullchain_pem=certificate_response)
-        raise errors.TimeoutError()
+
+            when = self.polling_policy.next_poll(attempt, response)
+            now = datetime.datetime.now()
+            if max(when, now) >= deadline:
+                self.polling_policy.forget(orderr.uri)
+                raise errors.TimeoutError()
+            if when > now:
+                time.sleep((when - now).total_seconds())
+            response = self.net.get(orderr.uri)
+            self.polling_policy.record_poll(orderr.uri)
+            attempt += 1
 
     def revoke(self, cert, rsn):
         """Revoke certificate.
@@ -856,17 +944,30 @@ class ClientNetwork(object):  # pylint: disable=too-many-instance-attributes
     :param bool verify_ssl: Whether to verify certificates on SSL connections.
     :param str user_agent: String to send as User-Agent header.
     :param float timeout: Timeout for requests.
+    :param float nonce_ttl: Seconds after which unused nonces are discarded.
+    :param int nonce_low_water_mark: Number of unused nonces below which
+            more are requested from ``nonce_url`` in the background, or 0
+            to only request nonces when none are left.
+
+    :ivar str nonce_url: URL of the ``newNonce`` resource, set by `ClientV2`.
+            Fresh nonces are requested from the URL being POSTed to if
+            this is `None`.
     """
     def __init__(self, key, account=None, alg=jose.RS256, verify_ssl=True,
-                 user_agent='acme-python', timeout=DEFAULT_NETWORK_TIMEOUT):
+                 user_agent='acme-python', timeout=DEFAULT_NETWORK_TIMEOUT,
+                 nonce_ttl=nonces.DEFAULT_NONCE_TTL, nonce_low_water_mark=0):
         # pylint: disable=too-many-arguments
         self.key = key
         self.account = account
         self.alg = alg
         self.verify_ssl = verify_ssl
-        self._nonces = set()
+        self.nonce_url = None
+        self._nonces = nonces.NoncePool(
+            ttl=nonce_ttl, low_water_mark=nonce_low_water_mark)
         self.user_agent = user_agent
         self.session = requests.Session()
+        # Sessions are not thread-safe, nonces are prefetched with their own
+        self._nonce_session = requests.Session()
         self._default_timeout = timeout
 
     def __del__(self):
@@ -874,6 +975,7 @@ class ClientNetwork(object):  # pylint: disable=too-many-instance-attributes
         # user if the call to close() fails. See #4840.
         try:
             self.session.close()
+            self._nonce_session.close()
         except Exception:  # pylint: disable=broad-except
             pass
 
@@ -969,6 +1071,8 @@ class ClientNetwork(object):  # pylint: disable=too-many-instance-attributes
 
         :param str method: method for the new `requests.Request` object
         :param str url: URL for the new `requests.Request` object
+        :param requests.Session session: session to send the request
+            with, ``self.session`` by default
 
         :raises requests.exceptions.RequestException: in case of any problems
 
@@ -986,8 +1090,9 @@ class ClientNetwork(object):  # pylint: disable=too-many-instance-attributes
         kwargs.setdefault('headers', {})
         kwargs['headers'].setdefault('User-Agent', self.user_agent)
         kwargs.setdefault('timeout', self._default_timeout)
+        session = kwargs.pop('session', self.session)
         try:
-            response = self.session.request(method, url, *args, **kwargs)
+            response = session.request(method, url, *args, **kwargs)
         except requests.exceptions.RequestException as e:
             # pylint: disable=pointless-string-statement
             """Requests response parsing
@@ -1040,23 +1145,47 @@ class ClientNetwork(object):  # pylint: disable=too-many-instance-attributes
         return self._check_response(
             self._send_request('GET', url, **kwargs), content_type=content_type)
 
-    def _add_nonce(self, response):
+    def _decode_nonce(self, response):
         if self.REPLAY_NONCE_HEADER in response.headers:
             nonce = response.headers[self.REPLAY_NONCE_HEADER]
             try:
-                decoded_nonce = jws.Header._fields['nonce'].decode(nonce)
+                return jws.Header._fields['nonce'].decode(nonce)
             except jose.DeserializationError as error:
                 raise errors.BadNonce(nonce, error)
-            logger.debug('Storing nonce: %s', nonce)
-            self._nonces.add(decoded_nonce)
         else:
             raise errors.MissingNonce(response)
 
+    def _add_nonce(self, response):
+        decoded_nonce = self._decode_nonce(response)
+        logger.debug('Storing nonce: %s', response.headers[self.REPLAY_NONCE_HEADER])
+        self._nonces.add(decoded_nonce)
+
     def _get_nonce(self, url):
-        if not self._nonces:
+        nonce = self._nonces.pop()
+        if nonce is None:
             logger.debug('Requesting fresh nonce')
-            self._add_nonce(self.head(url))
-        return self._nonces.pop()
+            nonce = self._decode_nonce(self.head(self.nonce_url or url))
+        self._prefetch_nonces()
+        return nonce
+
+    def _prefetch_nonces(self):
+        """Refill the nonce pool in the background if it is running low."""
+        if self.nonce_url is not None and self._nonces.start_refill():
+            thread = threading.Thread(target=self._refill_nonces)
+            thread.daemon = True
+            thread.start()
+
+    def _refill_nonces(self):
+        """Request nonces until the pool is above its low-water mark."""
+        try:
+            while self._nonces.needs_refill():
+                self._add_nonce(self.head(self.nonce_url,
+                                          session=self._nonce_session))
+        except Exception as error:  # pylint: disable=broad-except
+            # Nonces will be requested on demand instead
+            logger.debug('Failed to prefetch nonce: %s', error)
+        finally:
+            self._nonces.finish_refill()
 
     def post(self, *args, **kwargs):
         """POST object wrapped in `.JWS` and check response.
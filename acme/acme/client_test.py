@@ -681,6 +681,9 @@ class ClientV2Test(ClientTestBase):
             uri='https://www.letsencrypt-demo.org/acme/acct/1/order/1',
             authorizations=[self.authzr, self.authzr2], csr_pem=CSR_SAN_PEM)
 
+    def test_init_nonce_url(self):
+        self.assertEqual(self.net.nonce_url, DIRECTORY_V2['newNonce'])
+
     def test_new_account(self):
         self.response.status_code = http_client.CREATED
         self.response.json.return_value = self.regr.body.to_json()
@@ -751,6 +754,48 @@ class ClientV2Test(ClientTestBase):
             self.authz.to_json(), self.authz2.to_json(), updated_authz2.to_json())
         self.assertEqual(self.client.poll_authorizations(self.orderr, deadline), updated_orderr)
 
+    @mock.patch('acme.client.time')
+    def test_poll_authorizations_interleaved(self, mock_time):
+        deadline = datetime.datetime(9999, 9, 9)
+        pending = copy.deepcopy(self.response)
+        pending.json.return_value = self.authz2.to_json()
+        pending.headers['Retry-After'] = '0'
+        updated_authz = self.authz.update(status=messages.STATUS_VALID)
+        valid = copy.deepcopy(self.response)
+        valid.json.return_value = updated_authz.to_json()
+        updated_authz2 = self.authz2.update(status=messages.STATUS_VALID)
+        valid2 = copy.deepcopy(self.response)
+        valid2.json.return_value = updated_authz2.to_json()
+        responses = {
+            self.authzr.uri: [pending, pending, valid],
+            self.authzr_uri2: [pending, valid2],
+        }
+        self.net.get.side_effect = lambda url: responses[url].pop(0)
+
+        updated_orderr = self.client.poll_authorizations(self.orderr, deadline)
+
+        self.assertEqual(
+            [call[0][0] for call in self.net.get.call_args_list],
+            [self.authzr.uri, self.authzr_uri2, self.authzr.uri,
+             self.authzr_uri2, self.authzr.uri])
+        self.assertEqual(updated_orderr.authorizations, [
+            messages.AuthorizationResource(
+                body=updated_authz, uri=self.authzr.uri),
+            messages.AuthorizationResource(
+                body=updated_authz2, uri=self.authzr_uri2)])
+        self.assertFalse(mock_time.sleep.called)
+
+    @mock.patch('acme.client.time')
+    def test_poll_authorizations_retry_after_past_deadline(self, mock_time):
+        deadline = datetime.datetime.now() + datetime.timedelta(seconds=60)
+        self.response.json.return_value = self.authz2.to_json()
+        self.response.headers['Retry-After'] = '120'
+
+        self.assertRaises(errors.TimeoutError,
+            self.client.poll_authorizations, self.orderr, deadline)
+        self.assertEqual(self.net.get.call_count, 2)
+        self.assertFalse(mock_time.sleep.called)
+
     def test_finalize_order_success(self):
         updated_order = self.order.update(
             certificate='https://www.letsencrypt-demo.org/acme/cert/')
@@ -770,8 +815,31 @@ class ClientV2Test(ClientTestBase):
         self.assertRaises(errors.IssuanceError, self.client.finalize_order, self.orderr, deadline)
 
     def test_finalize_order_timeout(self):
+        self.client.polling_policy.record_poll(self.orderr.uri)
         deadline = datetime.datetime.now() - datetime.timedelta(seconds=60)
         self.assertRaises(errors.TimeoutError, self.client.finalize_order, self.orderr, deadline)
+        self.assertFalse(self.orderr.uri in self.client.polling_policy.polls)
+
+    @mock.patch('acme.client.time')
+    def test_finalize_order_polls(self, mock_time):
+        updated_order = self.order.update(
+            certificate='https://www.letsencrypt-demo.org/acme/cert/')
+        self.response.json.side_effect = [
+            self.order.to_json(), self.order.to_json(), updated_order.to_json()]
+        self.response.text = CERT_SAN_PEM
+
+        deadline = datetime.datetime(9999, 9, 9)
+        orderr = self.client.finalize_order(self.orderr, deadline)
+        self.assertEqual(orderr.fullchain_pem, CERT_SAN_PEM)
+        self.assertEqual(mock_time.sleep.call_count, 2)
+        self.assertFalse(self.orderr.uri in self.client.polling_policy.polls)
+
+    def test_polling_policy(self):
+        from acme.client import ClientV2
+        from acme.polling import PollingPolicy
+        policy = PollingPolicy()
+        client = ClientV2(self.directory, self.net, polling_policy=policy)
+        self.assertTrue(client.polling_policy is policy)
 
     def test_revoke(self):
         self.client.revoke(messages_test.CERT, self.rsn)
@@ -900,6 +968,18 @@ class ClientNetworkTest(unittest.TestCase):
             'HEAD', 'http://example.com/', 'foo',
             headers=mock.ANY, verify=mock.ANY, timeout=mock.ANY, bar='baz')
 
+    def test_send_request_session(self):
+        self.net.session = mock.MagicMock()
+        session = mock.MagicMock()
+        session.request.return_value = self.response
+        # pylint: disable=protected-access
+        self.assertEqual(self.response, self.net._send_request(
+            'HEAD', 'http://example.com/', session=session))
+        session.request.assert_called_once_with(
+            'HEAD', 'http://example.com/',
+            headers=mock.ANY, verify=mock.ANY, timeout=mock.ANY)
+        self.assertFalse(self.net.session.request.called)
+
     @mock.patch('acme.client.logger')
     def test_send_request_get_der(self, mock_logger):
         self.net.session = mock.MagicMock()
@@ -1111,6 +1191,47 @@ class ClientNetworkWithMockedResponseTest(unittest.TestCase):
         self.assertEqual(self.checked_response, self.net.post(
             'uri', self.obj, content_type=self.content_type))
 
+    def test_post_uses_nonce_url(self):
+        self.net.nonce_url = 'new-nonce'
+        self.net.post('uri', self.obj, content_type=self.content_type)
+        self.assertEqual(self.send_request.call_args_list[0],
+                         mock.call('HEAD', 'new-nonce'))
+
+    @mock.patch('acme.client.threading')
+    def test_prefetch_nonces(self, mock_threading):
+        # pylint: disable=protected-access
+        self.net._nonces.low_water_mark = 2
+        self.net.post('uri', self.obj, content_type=self.content_type)
+        self.assertFalse(mock_threading.Thread.called)
+
+        self.net.nonce_url = 'new-nonce'
+        self.net.post('uri', self.obj, content_type=self.content_type)
+        mock_threading.Thread.assert_called_once_with(
+            target=self.net._refill_nonces)
+        self.assertTrue(mock_threading.Thread().start.called)
+
+    def test_refill_nonces(self):
+        # pylint: disable=protected-access
+        self.net.nonce_url = 'new-nonce'
+        self.net._nonces.low_water_mark = 2
+        self.assertTrue(self.net._nonces.start_refill())
+        self.net._refill_nonces()
+        self.assertEqual(len(self.net._nonces), 2)
+        self.assertEqual(self.send_request.call_args_list, [
+            mock.call('HEAD', 'new-nonce', session=self.net._nonce_session),
+        ] * 2)
+        self.assertTrue(self.net._nonces.start_refill() is False)
+
+    def test_refill_nonces_error(self):
+        # pylint: disable=protected-access
+        self.net.nonce_url = 'new-nonce'
+        self.net._nonces.low_water_mark = 2
+        self.available_nonces = []
+        self.assertTrue(self.net._nonces.start_refill())
+        self.net._refill_nonces()
+        self.assertEqual(len(self.net._nonces), 0)
+        self.assertTrue(self.net._nonces.start_refill())
+
     def test_head_get_post_error_passthrough(self):
         self.send_request.side_effect = requests.exceptions.RequestException
         for method in self.net.head, self.net.get:
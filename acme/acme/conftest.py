@@ -0,0 +1,13 @@
+"""pytest configuration for acme."""
+import sys
+
+collect_ignore = []
+
+try:
+    import aiohttp  # pylint: disable=unused-import
+except ImportError:
+    aiohttp = None
+
+if sys.version_info < (3, 5) or aiohttp is None:
+    # acme.aio uses async/await syntax and requires the aio extra
+    collect_ignore.extend(['aio.py', 'aio_test.py'])
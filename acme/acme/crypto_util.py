@@ -158,7 +158,7 @@ def probe_sni(name, host, port=443, timeout=300,
 def make_csr(private_key_pem, domains, must_staple=False):
     """Generate a CSR containing a list of domains as subjectAltNames.
 
-    :param buffer private_key_pem: Private key, in PEM PKCS#8 format.
+    :param buffer private_key_pem: RSA or EC private key, in PEM format.
     :param list domains: List of DNS names to include in subjectAltNames of CSR.
     :param bool must_staple: Whether to include the TLS Feature extension (aka
         OCSP Must Staple: https://tools.ietf.org/html/rfc7633).
@@ -182,10 +182,25 @@ def make_csr(private_key_pem, domains, must_staple=False):
     csr.add_extensions(extensions)
     csr.set_pubkey(private_key)
     csr.set_version(2)
-    csr.sign(private_key, 'sha256')
+    csr.sign(private_key, _signature_digest(private_key))
     return OpenSSL.crypto.dump_certificate_request(
         OpenSSL.crypto.FILETYPE_PEM, csr)
 
+
+def _signature_digest(private_key):
+    """Digest to sign with private_key, matching the strength of EC keys.
+
+    :param OpenSSL.crypto.PKey private_key: RSA or EC private key
+    :rtype: str
+
+    """
+    if private_key.type() != OpenSSL.crypto.TYPE_RSA:
+        if private_key.bits() > 384:
+            return 'sha512'
+        elif private_key.bits() > 256:
+            return 'sha384'
+    return 'sha256'
+
 def _pyopenssl_cert_or_req_all_names(loaded_cert_or_req):
     common_name = loaded_cert_or_req.get_subject().CN
     sans = _pyopenssl_cert_or_req_san(loaded_cert_or_req)
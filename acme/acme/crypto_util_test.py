@@ -10,6 +10,10 @@ from six.moves import socketserver  #type: ignore  # pylint: disable=import-erro
 
 import josepy as jose
 import OpenSSL
+from cryptography import x509
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
 
 from acme import errors
 from acme import test_util
@@ -225,6 +229,21 @@ class MakeCSRTest(unittest.TestCase):
             self.assertEqual(len(must_staple_exts), 1,
                 "Expected exactly one Must Staple extension")
 
+    def test_make_csr_ecdsa(self):
+        from acme.crypto_util import make_csr
+        for curve, hash_name in ((ec.SECP256R1, 'sha256'),
+                                 (ec.SECP384R1, 'sha384'),
+                                 (ec.SECP521R1, 'sha512')):
+            privkey_pem = ec.generate_private_key(
+                curve(), default_backend()).private_bytes(
+                    serialization.Encoding.PEM,
+                    serialization.PrivateFormat.TraditionalOpenSSL,
+                    serialization.NoEncryption())
+            csr = x509.load_pem_x509_csr(
+                make_csr(privkey_pem, ["a.example"]), default_backend())
+            self.assertEqual(csr.signature_hash_algorithm.name, hash_name)
+            self.assertTrue(isinstance(csr.public_key(), ec.EllipticCurvePublicKey))
+
 
 class DumpPyopensslChainTest(unittest.TestCase):
     """Test for dump_pyopenssl_chain."""
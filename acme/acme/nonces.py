@@ -0,0 +1,86 @@
+"""Pool of replay nonces."""
+import collections
+import threading
+import time
+
+DEFAULT_NONCE_TTL = 60
+"""Seconds after which unused nonces are discarded."""
+
+DEFAULT_NONCE_POOL_SIZE = 64
+"""Maximum number of unused nonces kept by `.ClientNetwork`."""
+
+
+class NoncePool(object):
+    """Thread-safe pool of unused replay nonces.
+
+    Nonces are handed out newest first, as those are the least likely to
+    have been forgotten by the server. Nonces older than ``ttl`` seconds
+    are discarded, as are the oldest ones when more than ``max_size``
+    nonces are stored.
+
+    :ivar int low_water_mark: Number of nonces below which the pool
+        should be refilled ahead of demand, or 0 to never refill it.
+
+    """
+    def __init__(self, ttl=DEFAULT_NONCE_TTL, max_size=DEFAULT_NONCE_POOL_SIZE,
+                 low_water_mark=0):
+        self.ttl = ttl
+        self.low_water_mark = min(low_water_mark, max_size)
+        self._nonces = collections.deque(maxlen=max_size)
+        self._lock = threading.Lock()
+        self._refilling = False
+
+    def __len__(self):
+        with self._lock:
+            self._expire()
+            return len(self._nonces)
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        while self._nonces and self._nonces[0][0] < cutoff:
+            self._nonces.popleft()
+
+    def add(self, nonce):
+        """Add a fresh nonce to the pool.
+
+        :param bytes nonce: decoded nonce
+
+        """
+        with self._lock:
+            self._nonces.append((time.time(), nonce))
+
+    def pop(self):
+        """Take the freshest nonce out of the pool.
+
+        :returns: decoded nonce or `None` if the pool is empty
+        :rtype: bytes
+
+        """
+        with self._lock:
+            self._expire()
+            return self._nonces.pop()[1] if self._nonces else None
+
+    def start_refill(self):
+        """Claim the right to refill the pool if it is needed.
+
+        :returns: `True` if the pool is below its low-water mark and
+            nobody else is refilling it, in which case `finish_refill`
+            must be called once done
+        :rtype: bool
+
+        """
+        with self._lock:
+            self._expire()
+            if self._refilling or len(self._nonces) >= self.low_water_mark:
+                return False
+            self._refilling = True
+            return True
+
+    def needs_refill(self):
+        """Is the pool below its low-water mark?"""
+        return len(self) < self.low_water_mark
+
+    def finish_refill(self):
+        """Release the claim taken by `start_refill`."""
+        with self._lock:
+            self._refilling = False
@@ -0,0 +1,60 @@
+"""Tests for acme.nonces."""
+import unittest
+
+import mock
+
+
+class NoncePoolTest(unittest.TestCase):
+    """Tests for acme.nonces.NoncePool."""
+
+    def setUp(self):
+        from acme.nonces import NoncePool
+        self.pool = NoncePool(ttl=60, max_size=3, low_water_mark=2)
+
+    def test_empty(self):
+        self.assertEqual(len(self.pool), 0)
+        self.assertTrue(self.pool.pop() is None)
+
+    def test_newest_first(self):
+        self.pool.add(b'old')
+        self.pool.add(b'new')
+        self.assertEqual(self.pool.pop(), b'new')
+        self.assertEqual(self.pool.pop(), b'old')
+
+    def test_bounded(self):
+        for nonce in (b'1', b'2', b'3', b'4'):
+            self.pool.add(nonce)
+        self.assertEqual(len(self.pool), 3)
+        self.assertEqual([self.pool.pop() for _ in range(4)],
+                         [b'4', b'3', b'2', None])
+
+    @mock.patch('acme.nonces.time')
+    def test_expired(self, mock_time):
+        mock_time.time.return_value = 1000
+        self.pool.add(b'stale')
+        mock_time.time.return_value = 1030
+        self.pool.add(b'fresh')
+        mock_time.time.return_value = 1070
+        self.assertEqual(len(self.pool), 1)
+        self.assertEqual(self.pool.pop(), b'fresh')
+        self.assertTrue(self.pool.pop() is None)
+
+    def test_refill(self):
+        self.assertTrue(self.pool.needs_refill())
+        self.assertTrue(self.pool.start_refill())
+        self.assertFalse(self.pool.start_refill())
+        self.pool.finish_refill()
+        self.pool.add(b'1')
+        self.pool.add(b'2')
+        self.assertFalse(self.pool.needs_refill())
+        self.assertFalse(self.pool.start_refill())
+
+    def test_no_low_water_mark(self):
+        from acme.nonces import NoncePool
+        pool = NoncePool()
+        self.assertFalse(pool.needs_refill())
+        self.assertFalse(pool.start_refill())
+
+
+if __name__ == '__main__':
+    unittest.main()  # pragma: no cover
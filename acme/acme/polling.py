@@ -0,0 +1,95 @@
+"""Scheduling of polls of pending ACME resources."""
+import collections
+import datetime
+import random
+import threading
+
+
+class PollingPolicy(object):
+    """Schedule of polls of a pending ACME resource.
+
+    Unless the server asks for a specific delay with a ``Retry-After``
+    header, the delay between polls grows exponentially from
+    ``initial_delay`` up to ``max_delay`` seconds, and is randomized by
+    up to ``jitter`` times its value so that many clients polling the
+    same server do not synchronize.
+
+    The number of polls made for each order is counted in `polls`, keyed
+    by the URI of the order, until the order reaches a final state and
+    its count is dropped with `forget`.
+
+    :ivar collections.Counter polls: Number of polls made for each order
+        that is still being polled.
+
+    """
+    def __init__(self, initial_delay=1, max_delay=10, multiplier=2, jitter=0.2):
+        """Initialize.
+
+        :param float initial_delay: Seconds before the first poll.
+        :param float max_delay: Maximum number of seconds between polls.
+        :param float multiplier: Factor by which the delay grows after
+            each poll.
+        :param float jitter: Fraction of the delay by which it is randomly
+            shortened or lengthened.
+
+        """
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.polls = collections.Counter()
+        self._lock = threading.Lock()
+
+    def delay(self, attempt):
+        """Number of seconds to wait after a poll.
+
+        :param int attempt: Number of polls of the resource made before
+            the one that returned it still pending.
+
+        :rtype: float
+
+        """
+        delay = min(self.max_delay,
+                    self.initial_delay * self.multiplier ** attempt)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def next_poll(self, attempt, response=None):
+        """Compute the time of the next poll of a pending resource.
+
+        :param int attempt: Number of polls of the resource made before
+            the one that returned it still pending.
+        :param requests.Response response: Response that returned the
+            pending resource. Its ``Retry-After`` header takes precedence
+            over the backoff.
+
+        :returns: Time point when the next poll should be performed.
+        :rtype: `datetime.datetime`
+
+        """
+        if response is not None and 'Retry-After' in response.headers:
+            # acme.client imports this module
+            from acme.client import ClientBase
+            return ClientBase.retry_after(response, default=self.delay(attempt))
+        return datetime.datetime.now() + datetime.timedelta(
+            seconds=self.delay(attempt))
+
+    def record_poll(self, key):
+        """Count a poll made for an order.
+
+        :param str key: URI of the order.
+
+        """
+        with self._lock:
+            self.polls[key] += 1
+
+    def forget(self, key):
+        """Stop counting the polls made for an order.
+
+        :param str key: URI of the order.
+
+        :returns: Number of polls made for the order.
+        :rtype: int
+
+        """
+        with self._lock:
+            return self.polls.pop(key, 0)
@@ -0,0 +1,66 @@
+"""Tests for acme.polling."""
+import datetime
+import unittest
+
+import mock
+
+
+class PollingPolicyTest(unittest.TestCase):
+    """Tests for acme.polling.PollingPolicy."""
+
+    def setUp(self):
+        from acme.polling import PollingPolicy
+        self.policy = PollingPolicy(
+            initial_delay=1, max_delay=10, multiplier=2, jitter=0.5)
+        self.response = mock.MagicMock(headers={})
+
+    def test_delay(self):
+        for attempt, expected in [(0, 1), (1, 2), (3, 8), (4, 10), (100, 10)]:
+            delay = self.policy.delay(attempt)
+            self.assertTrue(0.5 * expected <= delay <= 1.5 * expected)
+
+    def test_delay_no_jitter(self):
+        self.policy.jitter = 0
+        self.assertEqual([self.policy.delay(attempt) for attempt in range(6)],
+                         [1, 2, 4, 8, 10, 10])
+
+    @mock.patch('acme.client.datetime')
+    @mock.patch('acme.polling.datetime')
+    def test_next_poll(self, dt_mock, client_dt_mock):
+        for mock_module in (dt_mock, client_dt_mock):
+            mock_module.datetime.now.return_value = datetime.datetime(2015, 3, 27)
+            mock_module.timedelta = datetime.timedelta
+        self.policy.jitter = 0
+
+        self.assertEqual(datetime.datetime(2015, 3, 27, 0, 0, 4),
+                         self.policy.next_poll(2))
+        self.assertEqual(datetime.datetime(2015, 3, 27, 0, 0, 4),
+                         self.policy.next_poll(2, self.response))
+
+        self.response.headers['Retry-After'] = '0'
+        self.assertEqual(datetime.datetime(2015, 3, 27),
+                         self.policy.next_poll(2, self.response))
+
+        self.response.headers['Retry-After'] = 'foo'
+        self.assertEqual(datetime.datetime(2015, 3, 27, 0, 0, 4),
+                         self.policy.next_poll(2, self.response))
+
+    def test_record_poll(self):
+        self.policy.record_poll('order1')
+        self.policy.record_poll('order1')
+        self.policy.record_poll('order2')
+        self.assertEqual(self.policy.polls['order1'], 2)
+        self.assertEqual(self.policy.polls['order2'], 1)
+        self.assertEqual(self.policy.polls['order3'], 0)
+
+    def test_forget(self):
+        self.policy.record_poll('order1')
+        self.policy.record_poll('order1')
+        self.policy.record_poll('order2')
+        self.assertEqual(self.policy.forget('order1'), 2)
+        self.assertEqual(self.policy.forget('order3'), 0)
+        self.assertEqual(dict(self.policy.polls), {'order2': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()  # pragma: no cover
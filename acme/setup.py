@@ -23,6 +23,11 @@ install_requires = [
     'six>=1.9.0',  # needed for python_2_unicode_compatible
 ]
 
+aio_extras = [
+    # Python 3.5+ only, see acme.aio
+    'aiohttp>=3.3',
+]
+
 dev_extras = [
     'pytest',
     'pytest-xdist',
@@ -63,6 +68,7 @@ setup(
     include_package_data=True,
     install_requires=install_requires,
     extras_require={
+        'aio': aio_extras,
         'dev': dev_extras,
         'docs': docs_extras,
     },
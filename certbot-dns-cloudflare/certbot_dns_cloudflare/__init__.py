@@ -14,6 +14,15 @@ Named Arguments
                                           to propagate before asking the ACME
                                           server to verify the DNS record.
                                           (Default: 10)
+``--dns-cloudflare-propagation-check``    Query the authoritative nameservers
+                                          until they all serve the DNS record,
+                                          waiting at most propagation-seconds.
+                                          Requires dnspython.
+``--dns-cloudflare-zone-cache-ttl``       The number of seconds for which the DNS
+                                          zones found for domains are saved and
+                                          reused by later runs. 0 only reuses
+                                          them within a single run.
+                                          (Default: 0)
 ========================================  =====================================
 
 
@@ -24,6 +24,7 @@ class Authenticator(dns_common.DNSAuthenticator):
     description = ('Obtain certificates using a DNS TXT record (if you are using Cloudflare for '
                    'DNS).')
     ttl = 120
+    uses_zone_cache = True
 
     def __init__(self, *args, **kwargs):
         super(Authenticator, self).__init__(*args, **kwargs)
@@ -55,7 +56,8 @@ class Authenticator(dns_common.DNSAuthenticator):
         self._get_cloudflare_client().del_txt_record(domain, validation_name, validation)
 
     def _get_cloudflare_client(self):
-        return _CloudflareClient(self.credentials.conf('email'), self.credentials.conf('api-key'))
+        return _CloudflareClient(self.credentials.conf('email'), self.credentials.conf('api-key'),
+                                 self._get_zone_cache())
 
 
 class _CloudflareClient(object):
@@ -63,8 +65,10 @@ class _CloudflareClient(object):
     Encapsulates all communication with the Cloudflare API.
     """
 
-    def __init__(self, email, api_key):
+    def __init__(self, email, api_key, zone_cache=None):
         self.cf = CloudFlare.CloudFlare(email, api_key)
+        self.zone_cache = zone_cache if zone_cache is not None else dns_common.ZoneCache()
+        self.zone_cache_namespace = 'cloudflare:' + email
 
     def add_txt_record(self, domain, record_name, record_content, record_ttl):
         """
@@ -140,35 +144,49 @@ class _CloudflareClient(object):
 
         zone_name_guesses = dns_common.base_domain_name_guesses(domain)
 
-        for zone_name in zone_name_guesses:
-            params = {'name': zone_name,
-                      'per_page': 1}
-
-            try:
-                zones = self.cf.zones.get(params=params)  # zones | pylint: disable=no-member
-            except CloudFlare.exceptions.CloudFlareAPIError as e:
-                code = int(e)
-                hint = None
-
-                if code == 6003:
-                    hint = 'Did you copy your entire API key?'
-                elif code == 9103:
-                    hint = 'Did you enter the correct email address?'
-
-                raise errors.PluginError('Error determining zone_id: {0} {1}. Please confirm that '
-                                         'you have supplied valid Cloudflare API credentials.{2}'
-                                         .format(code, e, ' ({0})'.format(hint) if hint else ''))
-
-            if len(zones) > 0:
-                zone_id = zones[0]['id']
-                logger.debug('Found zone_id of %s for %s using name %s', zone_id, domain, zone_name)
-                return zone_id
+        zone_id = self.zone_cache.find_zone_id(self.zone_cache_namespace, domain,
+                                               self._query_zone_id)
+        if zone_id is not None:
+            logger.debug('Found zone_id of %s for %s', zone_id, domain)
+            return zone_id
 
         raise errors.PluginError('Unable to determine zone_id for {0} using zone names: {1}. '
                                  'Please confirm that the domain name has been entered correctly '
                                  'and is already associated with the supplied Cloudflare account.'
                                  .format(domain, zone_name_guesses))
 
+    def _query_zone_id(self, zone_name):
+        """
+        Query the zone_id of the zone with a given name.
+
+        :param str zone_name: The name of the zone.
+        :returns: The zone_id, or `None` if there is no such zone.
+        :rtype: str
+        :raises certbot.errors.PluginError: if the zones cannot be queried.
+        """
+
+        params = {'name': zone_name,
+                  'per_page': 1}
+
+        try:
+            zones = self.cf.zones.get(params=params)  # zones | pylint: disable=no-member
+        except CloudFlare.exceptions.CloudFlareAPIError as e:
+            code = int(e)
+            hint = None
+
+            if code == 6003:
+                hint = 'Did you copy your entire API key?'
+            elif code == 9103:
+                hint = 'Did you enter the correct email address?'
+
+            raise errors.PluginError('Error determining zone_id: {0} {1}. Please confirm that '
+                                     'you have supplied valid Cloudflare API credentials.{2}'
+                                     .format(code, e, ' ({0})'.format(hint) if hint else ''))
+
+        if len(zones) > 0:
+            return zones[0]['id']
+        return None
+
     def _find_txt_record_id(self, zone_id, record_name, record_content):
         """
         Find the record_id for a TXT record with the given name and content.
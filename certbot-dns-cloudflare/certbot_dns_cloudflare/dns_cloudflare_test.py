@@ -27,7 +27,8 @@ class AuthenticatorTest(test_util.TempDirTestCase, dns_test_common.BaseAuthentic
         dns_test_common.write({"cloudflare_email": EMAIL, "cloudflare_api_key": API_KEY}, path)
 
         self.config = mock.MagicMock(cloudflare_credentials=path,
-                                     cloudflare_propagation_seconds=0)  # don't wait during tests
+                                     cloudflare_propagation_seconds=0,  # don't wait during tests
+                                     cloudflare_propagation_check=False)
 
         self.auth = Authenticator(self.config, "cloudflare")
 
@@ -98,6 +99,18 @@ class CloudflareClientTest(unittest.TestCase):
             self.cloudflare_client.add_txt_record,
             DOMAIN, self.record_name, self.record_content, self.record_ttl)
 
+    def test_find_zone_id_cached(self):
+        self.cf.zones.get.side_effect = [[], [{'id': self.zone_id}]]
+
+        self.cloudflare_client.add_txt_record('www.' + DOMAIN, self.record_name,
+                                              self.record_content, self.record_ttl)
+        self.cloudflare_client.del_txt_record('www.' + DOMAIN, self.record_name,
+                                              self.record_content)
+
+        self.assertEqual(self.cf.zones.get.call_count, 2)
+        self.cf.zones.dns_records.post.assert_called_with(self.zone_id, data=mock.ANY)
+        self.cf.zones.dns_records.get.assert_called_with(self.zone_id, params=mock.ANY)
+
     def test_add_txt_record_zone_not_found(self):
         self.cf.zones.get.return_value = []
 
@@ -165,7 +178,8 @@ class CloudflareClientTest(unittest.TestCase):
         self.cf.zones.get.return_value = [{'id': None}]
 
         self.cloudflare_client.del_txt_record(DOMAIN, self.record_name, self.record_content)
-        expected = [mock.call.zones.get(params=mock.ANY)]
+        # A zone without id is skipped like a missing zone
+        expected = [mock.call.zones.get(params=mock.ANY), mock.call.zones.get(params=mock.ANY)]
 
         self.assertEqual(expected, self.cf.mock_calls)
 
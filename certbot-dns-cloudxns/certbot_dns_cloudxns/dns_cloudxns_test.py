@@ -30,7 +30,8 @@ class AuthenticatorTest(test_util.TempDirTestCase,
         dns_test_common.write({"cloudxns_api_key": API_KEY, "cloudxns_secret_key": SECRET}, path)
 
         self.config = mock.MagicMock(cloudxns_credentials=path,
-                                     cloudxns_propagation_seconds=0)  # don't wait during tests
+                                     cloudxns_propagation_seconds=0,  # don't wait during tests
+                                     cloudxns_propagation_check=False)
 
         self.auth = Authenticator(self.config, "cloudxns")
 
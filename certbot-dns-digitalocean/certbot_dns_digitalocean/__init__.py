@@ -15,6 +15,10 @@ Named Arguments
                                             ACME server to verify the DNS
                                             record.
                                             (Default: 10)
+``--dns-digitalocean-propagation-check``    Query the authoritative nameservers
+                                            until they all serve the DNS record,
+                                            waiting at most propagation-seconds.
+                                            Requires dnspython.
 ==========================================  ===================================
 
 
@@ -14,6 +14,10 @@ Named Arguments
                                           to propagate before asking the ACME
                                           server to verify the DNS record.
                                           (Default: 30)
+``--dns-dnsimple-propagation-check``      Query the authoritative nameservers
+                                          until they all serve the DNS record,
+                                          waiting at most propagation-seconds.
+                                          Requires dnspython.
 ========================================  =====================================
 
 
@@ -29,7 +29,8 @@ class AuthenticatorTest(test_util.TempDirTestCase,
                               path)
 
         self.config = mock.MagicMock(dnsmadeeasy_credentials=path,
-                                     dnsmadeeasy_propagation_seconds=0)  # don't wait during tests
+                                     dnsmadeeasy_propagation_seconds=0,  # don't wait during tests
+                                     dnsmadeeasy_propagation_check=False)
 
         self.auth = Authenticator(self.config, "dnsmadeeasy")
 
@@ -31,6 +31,7 @@ class Authenticator(dns_common.DNSAuthenticator):
     description = ('Obtain certificates using a DNS TXT record (if you are using Google Cloud DNS '
                    'for DNS).')
     ttl = 60
+    uses_zone_cache = True
 
     def __init__(self, *args, **kwargs):
         super(Authenticator, self).__init__(*args, **kwargs)
@@ -73,7 +74,7 @@ class Authenticator(dns_common.DNSAuthenticator):
         self._get_google_client().del_txt_record(domain, validation_name, validation, self.ttl)
 
     def _get_google_client(self):
-        return _GoogleClient(self.conf('credentials'))
+        return _GoogleClient(self.conf('credentials'), self._get_zone_cache())
 
 
 class _GoogleClient(object):
@@ -81,7 +82,7 @@ class _GoogleClient(object):
     Encapsulates all communication with the Google Cloud DNS API.
     """
 
-    def __init__(self, account_json=None):
+    def __init__(self, account_json=None, zone_cache=None):
 
         scopes = ['https://www.googleapis.com/auth/ndev.clouddns.readwrite']
         if account_json is not None:
@@ -93,6 +94,7 @@ class _GoogleClient(object):
             self.project_id = self.get_project_id()
 
         self.dns = discovery.build('dns', 'v1', credentials=credentials, cache_discovery=False)
+        self.zone_cache = zone_cache if zone_cache is not None else dns_common.ZoneCache()
 
     def add_txt_record(self, domain, record_name, record_content, record_ttl):
         """
@@ -187,24 +189,38 @@ class _GoogleClient(object):
 
         zone_dns_name_guesses = dns_common.base_domain_name_guesses(domain)
 
-        mz = self.dns.managedZones()  # managedZones | pylint: disable=no-member
-        for zone_name in zone_dns_name_guesses:
-            try:
-                request = mz.list(project=self.project_id, dnsName=zone_name + '.')
-                response = request.execute()
-                zones = response['managedZones']
-            except googleapiclient_errors.Error as e:
-                raise errors.PluginError('Encountered error finding managed zone: {0}'
-                                         .format(e))
-
-            if len(zones) > 0:
-                zone_id = zones[0]['id']
-                logger.debug('Found id of %s for %s using name %s', zone_id, domain, zone_name)
-                return zone_id
+        zone_id = self.zone_cache.find_zone_id('google:' + self.project_id, domain,
+                                               self._query_managed_zone_id)
+        if zone_id is not None:
+            logger.debug('Found id of %s for %s', zone_id, domain)
+            return zone_id
 
         raise errors.PluginError('Unable to determine managed zone for {0} using zone names: {1}.'
                                  .format(domain, zone_dns_name_guesses))
 
+    def _query_managed_zone_id(self, zone_name):
+        """
+        Query the ID of the managed zone with a given name.
+
+        :param str zone_name: The name of the managed zone.
+        :returns: The ID of the managed zone, or `None` if there is no such zone.
+        :rtype: str
+        :raises certbot.errors.PluginError: if the managed zones cannot be queried.
+        """
+
+        mz = self.dns.managedZones()  # managedZones | pylint: disable=no-member
+        try:
+            request = mz.list(project=self.project_id, dnsName=zone_name + '.')
+            response = request.execute()
+            zones = response['managedZones']
+        except googleapiclient_errors.Error as e:
+            raise errors.PluginError('Encountered error finding managed zone: {0}'
+                                     .format(e))
+
+        if len(zones) > 0:
+            return zones[0]['id']
+        return None
+
     @staticmethod
     def get_project_id():
         """
@@ -30,7 +30,8 @@ class AuthenticatorTest(test_util.TempDirTestCase, dns_test_common.BaseAuthentic
 
         super(AuthenticatorTest, self).setUp()
         self.config = mock.MagicMock(google_credentials=path,
-                                     google_propagation_seconds=0)  # don't wait during tests
+                                     google_propagation_seconds=0,  # don't wait during tests
+                                     google_propagation_check=False)
 
         self.auth = Authenticator(self.config, "google")
 
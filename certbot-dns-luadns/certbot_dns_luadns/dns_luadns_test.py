@@ -26,7 +26,8 @@ class AuthenticatorTest(test_util.TempDirTestCase,
         dns_test_common.write({"luadns_email": EMAIL, "luadns_token": TOKEN}, path)
 
         self.config = mock.MagicMock(luadns_credentials=path,
-                                     luadns_propagation_seconds=0)  # don't wait during tests
+                                     luadns_propagation_seconds=0,  # don't wait during tests
+                                     luadns_propagation_check=False)
 
         self.auth = Authenticator(self.config, "luadns")
 
@@ -38,6 +38,7 @@ class Authenticator(dns_common.DNSAuthenticator):
 
     description = 'Obtain certificates using a DNS TXT record (if you are using BIND for DNS).'
     ttl = 120
+    uses_zone_cache = True
 
     def __init__(self, *args, **kwargs):
         super(Authenticator, self).__init__(*args, **kwargs)
@@ -81,19 +82,21 @@ class Authenticator(dns_common.DNSAuthenticator):
                               self.credentials.conf('name'),
                               self.credentials.conf('secret'),
                               self.ALGORITHMS.get(self.credentials.conf('algorithm'),
-                                                  dns.tsig.HMAC_MD5))
+                                                  dns.tsig.HMAC_MD5),
+                              self._get_zone_cache())
 
 
 class _RFC2136Client(object):
     """
     Encapsulates all communication with the target DNS server.
     """
-    def __init__(self, server, key_name, key_secret, key_algorithm):
+    def __init__(self, server, key_name, key_secret, key_algorithm, zone_cache=None):
         self.server = server
         self.keyring = dns.tsigkeyring.from_text({
             key_name: key_secret
         })
         self.algorithm = key_algorithm
+        self.zone_cache = zone_cache if zone_cache is not None else dns_common.ZoneCache()
 
     def add_txt_record(self, domain_name, record_name, record_content, record_ttl):
         """
@@ -180,9 +183,11 @@ class _RFC2136Client(object):
         domain_name_guesses = dns_common.base_domain_name_guesses(domain_name)
 
         # Loop through until we find an authoritative SOA record
-        for guess in domain_name_guesses:
-            if self._query_soa(guess):
-                return guess
+        domain = self.zone_cache.find_zone_id(
+            'rfc2136:' + self.server, domain_name,
+            lambda guess: guess if self._query_soa(guess) else None)
+        if domain is not None:
+            return domain
 
         raise errors.PluginError('Unable to determine base domain for {0} using names: {1}.'
                                  .format(domain_name, domain_name_guesses))
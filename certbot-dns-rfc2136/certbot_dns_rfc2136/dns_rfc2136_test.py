@@ -30,7 +30,8 @@ class AuthenticatorTest(test_util.TempDirTestCase, dns_test_common.BaseAuthentic
         dns_test_common.write(VALID_CONFIG, path)
 
         self.config = mock.MagicMock(rfc2136_credentials=path,
-                                     rfc2136_propagation_seconds=0)  # don't wait during tests
+                                     rfc2136_propagation_seconds=0,  # don't wait during tests
+                                     rfc2136_propagation_check=False)
 
         self.auth = Authenticator(self.config, "rfc2136")
 
@@ -151,6 +152,15 @@ class RFC2136ClientTest(unittest.TestCase):
 
         self.assertTrue(domain == DOMAIN)
 
+    def test_find_domain_cached(self):
+        # _query_soa | pylint: disable=protected-access
+        self.rfc2136_client._query_soa = mock.MagicMock(side_effect=[False, True])
+
+        # _find_domain | pylint: disable=protected-access
+        self.assertEqual(self.rfc2136_client._find_domain('foo.'+DOMAIN), DOMAIN)
+        self.assertEqual(self.rfc2136_client._find_domain('foo.'+DOMAIN), DOMAIN)
+        self.assertEqual(self.rfc2136_client._query_soa.call_count, 2)
+
     def test_find_domain_wraps_errors(self):
         # _query_soa | pylint: disable=protected-access
         self.rfc2136_client._query_soa = mock.MagicMock(return_value=False)
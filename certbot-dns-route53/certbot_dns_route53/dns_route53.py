@@ -1,4 +1,5 @@
 """Certbot Route53 authenticator plugin."""
+import collections
 import logging
 import time
 
@@ -29,10 +30,12 @@ class Authenticator(dns_common.DNSAuthenticator):
     description = ("Obtain certificates using a DNS TXT record (if you are using AWS Route53 for "
                    "DNS).")
     ttl = 10
+    uses_zone_cache = True
 
     def __init__(self, *args, **kwargs):
         super(Authenticator, self).__init__(*args, **kwargs)
         self.r53 = boto3.client("route53")
+        self._account_id = None
 
     def more_info(self):  # pylint: disable=missing-docstring,no-self-use
         return "Solve a DNS01 challenge using AWS Route53"
@@ -55,23 +58,70 @@ class Authenticator(dns_common.DNSAuthenticator):
         except (NoCredentialsError, ClientError) as e:
             logger.debug('Encountered error during cleanup: %s', e, exc_info=True)
 
+    def _perform_achalls(self, achalls):
+        try:
+            change_ids = [
+                self._change_txt_records("UPSERT", zone_id, records)
+                for zone_id, records in self._group_by_zone(achalls).items()]
+
+            self._wait_for_changes(change_ids)
+        except (NoCredentialsError, ClientError) as e:
+            logger.debug('Encountered error during perform: %s', e, exc_info=True)
+            raise errors.PluginError("\n".join([str(e), INSTRUCTIONS]))
+
+    def _cleanup_achalls(self, achalls):
+        try:
+            records_by_zone = self._group_by_zone(achalls)
+        except (NoCredentialsError, ClientError) as e:
+            logger.debug('Encountered error during cleanup: %s', e, exc_info=True)
+            return
+        for zone_id, records in records_by_zone.items():
+            try:
+                self._change_txt_records("DELETE", zone_id, records)
+            except (NoCredentialsError, ClientError) as e:
+                logger.debug('Encountered error during cleanup: %s', e, exc_info=True)
+
+    def _group_by_zone(self, achalls):
+        """Group the validations of achalls by hosted zone and record name.
+
+        :param list achalls: The challenges being performed.
+        :returns: Mapping of zone id to a mapping of validation domain name
+            to the validations for that name.
+        :rtype: `dict` of `collections.OrderedDict`
+        """
+        records_by_zone = collections.OrderedDict()
+        for achall in achalls:
+            validation_domain_name = achall.validation_domain_name(achall.domain)
+            zone_id = self._find_zone_id_for_domain(validation_domain_name)
+            records = records_by_zone.setdefault(zone_id, collections.OrderedDict())
+            validations = records.setdefault(validation_domain_name, [])
+            validation = achall.validation(achall.account_key)
+            if validation not in validations:
+                validations.append(validation)
+        return records_by_zone
+
     def _find_zone_id_for_domain(self, domain):
         """Find the zone id responsible a given FQDN.
 
            That is, the id for the zone whose name is the longest parent of the
-           domain.
+           domain. The list of hosted zones is kept in the zone cache.
         """
-        paginator = self.r53.get_paginator("list_hosted_zones")
+        zone_cache = self._get_zone_cache()
+        namespace = "route53"
+        if self.conf('zone-cache-ttl'):
+            # Saved zones may have been listed with other credentials
+            namespace = "route53:{0}".format(self._get_account_id())
+        hosted_zones = zone_cache.get_zones(namespace)
+        if hosted_zones is None:
+            hosted_zones = self._list_public_hosted_zones()
+            zone_cache.set_zones(namespace, hosted_zones)
+
         zones = []
         target_labels = domain.rstrip(".").split(".")
-        for page in paginator.paginate():
-            for zone in page["HostedZones"]:
-                if zone["Config"]["PrivateZone"]:
-                    continue
-
-                candidate_labels = zone["Name"].rstrip(".").split(".")
-                if candidate_labels == target_labels[-len(candidate_labels):]:
-                    zones.append((zone["Name"], zone["Id"]))
+        for zone_name, zone_id in hosted_zones:
+            candidate_labels = zone_name.rstrip(".").split(".")
+            if candidate_labels == target_labels[-len(candidate_labels):]:
+                zones.append((zone_name, zone_id))
 
         if not zones:
             raise errors.PluginError(
@@ -85,9 +135,46 @@ class Authenticator(dns_common.DNSAuthenticator):
         zones.sort(key=lambda z: len(z[0]), reverse=True)
         return zones[0][1]
 
+    def _get_account_id(self):
+        """Get the id of the AWS account the credentials belong to.
+
+        Hosted zones saved in the work directory are cached per account,
+        so that zones listed with the credentials of one account are not
+        used with another.
+        """
+        if self._account_id is None:
+            sts = boto3.client("sts")
+            self._account_id = sts.get_caller_identity()["Account"]
+        return self._account_id
+
+    def _list_public_hosted_zones(self):
+        """List the names and ids of all public hosted zones."""
+        paginator = self.r53.get_paginator("list_hosted_zones")
+        zones = []
+        for page in paginator.paginate():
+            for zone in page["HostedZones"]:
+                if zone["Config"]["PrivateZone"]:
+                    continue
+
+                zones.append([zone["Name"], zone["Id"]])
+        return zones
+
     def _change_txt_record(self, action, validation_domain_name, validation):
         zone_id = self._find_zone_id_for_domain(validation_domain_name)
 
+        return self._change_txt_records(
+            action, zone_id, {validation_domain_name: [validation]})
+
+    def _change_txt_records(self, action, zone_id, records):
+        """Apply action to TXT records of a hosted zone in a single ChangeBatch.
+
+        :param str action: "UPSERT" or "DELETE".
+        :param str zone_id: The id of the hosted zone.
+        :param dict records: Mapping of record names to their values. All the
+            values for a name are stored in a single record set.
+        :returns: The id of the change.
+        :rtype: str
+        """
         response = self.r53.change_resource_record_sets(
             HostedZoneId=zone_id,
             ChangeBatch={
@@ -103,9 +190,11 @@ class Authenticator(dns_common.DNSAuthenticator):
                                 # For some reason TXT records need to be
                                 # manually quoted.
                                 {"Value": '"{0}"'.format(validation)}
+                                for validation in validations
                             ],
                         }
                     }
+                    for validation_domain_name, validations in records.items()
                 ]
             }
         )
@@ -115,9 +204,21 @@ class Authenticator(dns_common.DNSAuthenticator):
         """Wait for a change to be propagated to all Route53 DNS servers.
            https://docs.aws.amazon.com/Route53/latest/APIReference/API_GetChange.html
         """
+        self._wait_for_changes([change_id])
+
+    def _wait_for_changes(self, change_ids):
+        """Wait for changes to be propagated to all Route53 DNS servers.
+
+           All changes are polled in each round, so waiting for several
+           changes takes as long as waiting for the slowest of them.
+        """
+        pending = list(change_ids)
         for unused_n in range(0, 120):
-            response = self.r53.get_change(Id=change_id)
-            if response["ChangeInfo"]["Status"] == "INSYNC":
+            for change_id in list(pending):
+                response = self.r53.get_change(Id=change_id)
+                if response["ChangeInfo"]["Status"] == "INSYNC":
+                    pending.remove(change_id)
+            if not pending:
                 return
             time.sleep(5)
         raise errors.PluginError(
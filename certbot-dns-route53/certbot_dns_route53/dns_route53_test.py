@@ -3,11 +3,16 @@
 import unittest
 
 import mock
+from acme import challenges
+from acme import messages
 from botocore.exceptions import NoCredentialsError, ClientError
 
+from certbot import achallenges
 from certbot import errors
+from certbot.plugins import dns_common
 from certbot.plugins import dns_test_common
 from certbot.plugins.dns_test_common import DOMAIN
+from certbot.tests import acme_util
 
 
 class AuthenticatorTest(unittest.TestCase, dns_test_common.BaseAuthenticatorTest):
@@ -18,7 +23,7 @@ class AuthenticatorTest(unittest.TestCase, dns_test_common.BaseAuthenticatorTest
 
         super(AuthenticatorTest, self).setUp()
 
-        self.config = mock.MagicMock()
+        self.config = mock.MagicMock(route53_propagation_check=False)
 
         self.auth = Authenticator(self.config, "route53")
 
@@ -26,54 +31,105 @@ class AuthenticatorTest(unittest.TestCase, dns_test_common.BaseAuthenticatorTest
         self.auth._change_txt_record = mock.MagicMock()
         self.auth._wait_for_change = mock.MagicMock()
 
-        self.auth.perform([self.achall])
+        self.auth._perform(DOMAIN, '_acme-challenge.' + DOMAIN, 'foo')
 
         self.auth._change_txt_record.assert_called_once_with("UPSERT",
                                                              '_acme-challenge.' + DOMAIN,
-                                                             mock.ANY)
+                                                             'foo')
         self.assertEqual(self.auth._wait_for_change.call_count, 1)
 
+    def test_perform_batched(self):
+        self.config.route53_propagation_seconds = 0  # don't wait during tests
+        self.auth._find_zone_id_for_domain = mock.MagicMock(
+            side_effect=lambda name: "FOO" if name.endswith("foo.example.com") else "EXAMPLE")
+        self.auth._change_txt_records = mock.MagicMock(side_effect=["1", "2"])
+        self.auth._wait_for_changes = mock.MagicMock()
+
+        # the wildcard and the base domain share the same validation record
+        achalls = [self._achall(domain) for domain in
+                   (DOMAIN, "www." + DOMAIN, "foo." + DOMAIN)]
+        achalls.append(self._achall("foo." + DOMAIN, token=b"wildcard-token-for-foo-example"))
+        self.auth.perform(achalls)
+
+        self.assertEqual(self.auth._change_txt_records.call_args_list, [
+            mock.call("UPSERT", "EXAMPLE", {
+                "_acme-challenge." + DOMAIN: [mock.ANY],
+                "_acme-challenge.www." + DOMAIN: [mock.ANY]}),
+            mock.call("UPSERT", "FOO", {
+                "_acme-challenge.foo." + DOMAIN: [mock.ANY, mock.ANY]}),
+        ])
+        self.auth._wait_for_changes.assert_called_once_with(["1", "2"])
+
     def test_perform_no_credentials_error(self):
-        self.auth._change_txt_record = mock.MagicMock(side_effect=NoCredentialsError)
+        self.auth._find_zone_id_for_domain = mock.MagicMock(side_effect=NoCredentialsError)
 
         self.assertRaises(errors.PluginError,
                           self.auth.perform,
                           [self.achall])
 
     def test_perform_client_error(self):
-        self.auth._change_txt_record = mock.MagicMock(
+        self.auth._find_zone_id_for_domain = mock.MagicMock()
+        self.auth._change_txt_records = mock.MagicMock(
             side_effect=ClientError({"Error": {"Code": "foo"}}, "bar"))
 
         self.assertRaises(errors.PluginError,
                           self.auth.perform,
                           [self.achall])
 
+    def test_perform_single_no_credentials_error(self):
+        self.auth._change_txt_record = mock.MagicMock(side_effect=NoCredentialsError)
+
+        self.assertRaises(errors.PluginError, self.auth._perform,
+                          DOMAIN, '_acme-challenge.' + DOMAIN, 'foo')
+
     def test_cleanup(self):
         self.auth._attempt_cleanup = True
 
+        self.auth._find_zone_id_for_domain = mock.MagicMock(return_value="EXAMPLE")
+        self.auth._change_txt_records = mock.MagicMock()
+
+        self.auth.cleanup([self.achall, self._achall("www." + DOMAIN)])
+
+        self.auth._change_txt_records.assert_called_once_with("DELETE", "EXAMPLE", {
+            "_acme-challenge." + DOMAIN: [mock.ANY],
+            "_acme-challenge.www." + DOMAIN: [mock.ANY]})
+
+    def test_cleanup_single(self):
         self.auth._change_txt_record = mock.MagicMock()
 
-        self.auth.cleanup([self.achall])
+        self.auth._cleanup(DOMAIN, '_acme-challenge.' + DOMAIN, 'foo')
 
         self.auth._change_txt_record.assert_called_once_with("DELETE",
                                                              '_acme-challenge.'+DOMAIN,
-                                                             mock.ANY)
+                                                             'foo')
+        self.auth._change_txt_record.side_effect = NoCredentialsError
+        self.auth._cleanup(DOMAIN, '_acme-challenge.' + DOMAIN, 'foo')
 
     def test_cleanup_no_credentials_error(self):
         self.auth._attempt_cleanup = True
 
-        self.auth._change_txt_record = mock.MagicMock(side_effect=NoCredentialsError)
+        self.auth._find_zone_id_for_domain = mock.MagicMock(side_effect=NoCredentialsError)
 
         self.auth.cleanup([self.achall])
 
     def test_cleanup_client_error(self):
         self.auth._attempt_cleanup = True
 
-        self.auth._change_txt_record = mock.MagicMock(
+        self.auth._find_zone_id_for_domain = mock.MagicMock()
+        self.auth._change_txt_records = mock.MagicMock(
             side_effect=ClientError({"Error": {"Code": "foo"}}, "bar"))
 
         self.auth.cleanup([self.achall])
 
+    @staticmethod
+    def _achall(domain, token=None):
+        challb = acme_util.DNS01
+        if token is not None:
+            challb = acme_util.chall_to_challb(
+                challenges.DNS01(token=token), messages.STATUS_PENDING)
+        return achallenges.KeyAuthorizationAnnotatedChallenge(
+            challb=challb, domain=domain, account_key=dns_test_common.KEY)
+
 
 class ClientTest(unittest.TestCase):
     # pylint: disable=protected-access
@@ -115,9 +171,10 @@ class ClientTest(unittest.TestCase):
 
         super(ClientTest, self).setUp()
 
-        self.config = mock.MagicMock()
+        self.config = mock.MagicMock(route53_zone_cache_ttl=0)
 
         self.client = Authenticator(self.config, "route53")
+        self.client._zone_cache = dns_common.ZoneCache()
 
     def test_find_zone_id_for_domain(self):
         self.client.r53.get_paginator = mock.MagicMock()
@@ -133,6 +190,49 @@ class ClientTest(unittest.TestCase):
         result = self.client._find_zone_id_for_domain("foo.example.com")
         self.assertEqual(result, "EXAMPLE")
 
+    def test_find_zone_id_for_domain_cached(self):
+        self.client.r53.get_paginator = mock.MagicMock()
+        self.client.r53.get_paginator().paginate.return_value = [
+            {
+                "HostedZones": [
+                    self.PRIVATE_ZONE,
+                    self.EXAMPLE_COM_ZONE,
+                    self.FOO_EXAMPLE_COM_ZONE,
+                ]
+            }
+        ]
+
+        with mock.patch("certbot_dns_route53.dns_route53.boto3.client") as mock_client:
+            self.assertEqual(self.client._find_zone_id_for_domain("foo.example.com"), "FOO")
+            self.assertEqual(self.client._find_zone_id_for_domain("bar.example.com"), "EXAMPLE")
+        self.assertEqual(self.client.r53.get_paginator().paginate.call_count, 1)
+        # The account is only needed to save zones in the work directory
+        self.assertFalse(mock_client.called)
+
+    def test_find_zone_id_for_domain_cached_per_account(self):
+        self.config.route53_zone_cache_ttl = 3600
+        self.client.r53.get_paginator = mock.MagicMock()
+        self.client.r53.get_paginator().paginate.side_effect = [
+            [{"HostedZones": [self.EXAMPLE_COM_ZONE]}],
+            [{"HostedZones": [self.FOO_EXAMPLE_COM_ZONE]}],
+        ]
+        from certbot_dns_route53.dns_route53 import Authenticator
+        other = Authenticator(self.config, "route53")
+        other._zone_cache = self.client._zone_cache
+        other.r53 = self.client.r53
+
+        with mock.patch("certbot_dns_route53.dns_route53.boto3.client") as mock_client:
+            mock_client.return_value.get_caller_identity.side_effect = [
+                {"Account": "123456789012"}, {"Account": "210987654321"}]
+            self.assertEqual(self.client._find_zone_id_for_domain("foo.example.com"),
+                             "EXAMPLE")
+            self.assertEqual(self.client._find_zone_id_for_domain("bar.example.com"),
+                             "EXAMPLE")
+            self.assertEqual(other._find_zone_id_for_domain("foo.example.com"), "FOO")
+        mock_client.assert_called_with("sts")
+        self.assertEqual(mock_client.return_value.get_caller_identity.call_count, 2)
+        self.assertEqual(self.client.r53.get_paginator().paginate.call_count, 2)
+
     def test_find_zone_id_for_domain_pagination(self):
         self.client.r53.get_paginator = mock.MagicMock()
         self.client.r53.get_paginator().paginate.return_value = [
@@ -186,6 +286,24 @@ class ClientTest(unittest.TestCase):
         call_count = self.client.r53.change_resource_record_sets.call_count
         self.assertEqual(call_count, 1)
 
+    def test_change_txt_records(self):
+        self.client.r53.change_resource_record_sets = mock.MagicMock(
+            return_value={"ChangeInfo": {"Id": 1}})
+
+        change_id = self.client._change_txt_records("UPSERT", "EXAMPLE", {
+            "_acme-challenge." + DOMAIN: ["foo", "bar"],
+            "_acme-challenge.www." + DOMAIN: ["baz"]})
+
+        self.assertEqual(change_id, 1)
+        kwargs = self.client.r53.change_resource_record_sets.call_args[1]
+        self.assertEqual(kwargs["HostedZoneId"], "EXAMPLE")
+        changes = kwargs["ChangeBatch"]["Changes"]
+        self.assertEqual(
+            dict((change["ResourceRecordSet"]["Name"],
+                  change["ResourceRecordSet"]["ResourceRecords"]) for change in changes),
+            {"_acme-challenge." + DOMAIN: [{"Value": '"foo"'}, {"Value": '"bar"'}],
+             "_acme-challenge.www." + DOMAIN: [{"Value": '"baz"'}]})
+
     def test_wait_for_change(self):
         self.client.r53.get_change = mock.MagicMock(
             side_effect=[{"ChangeInfo": {"Status": "PENDING"}},
@@ -195,6 +313,24 @@ class ClientTest(unittest.TestCase):
 
         self.assertTrue(self.client.r53.get_change.called)
 
+    @mock.patch("certbot_dns_route53.dns_route53.time")
+    def test_wait_for_changes(self, mock_time):
+        statuses = {1: ["PENDING", "INSYNC"], 2: ["PENDING", "PENDING", "INSYNC"]}
+        self.client.r53.get_change = mock.MagicMock(
+            side_effect=lambda Id: {"ChangeInfo": {"Status": statuses[Id].pop(0)}})
+
+        self.client._wait_for_changes([1, 2])
+
+        self.assertEqual(self.client.r53.get_change.call_count, 5)
+        self.assertEqual(mock_time.sleep.call_count, 2)
+
+    @mock.patch("certbot_dns_route53.dns_route53.time")
+    def test_wait_for_changes_timeout(self, unused_mock_time):
+        self.client.r53.get_change = mock.MagicMock(
+            return_value={"ChangeInfo": {"Status": "PENDING"}})
+
+        self.assertRaises(errors.PluginError, self.client._wait_for_changes, [1])
+
 
 if __name__ == "__main__":
     unittest.main()  # pragma: no cover
@@ -134,7 +134,9 @@ class NginxConfigurator(common.Installer):
         self.config_test()
 
 
-        self.parser = parser.NginxParser(self.conf('server-root'))
+        self.parser = parser.NginxParser(
+            self.conf('server-root'),
+            os.path.join(self.config.work_dir, constants.PARSE_CACHE_DIR))
 
         install_ssl_options_conf(self.mod_ssl_conf, self.updated_mod_ssl_conf_digest)
 
@@ -371,8 +373,8 @@ class NginxConfigurator(common.Installer):
         :rtype: list
 
         """
-        vhost_list = self.parser.get_vhosts()
-        return self._rank_matches_by_name_and_ssl(vhost_list, target_name)
+        return self._rank_matches_by_name_and_ssl(
+            self.parser.find_vhosts(target_name))
 
     def _select_best_name_match(self, matches):
         """Returns the best name match of a ranked list of vhosts.
@@ -395,12 +397,12 @@ class NginxConfigurator(common.Installer):
             return matches[0]['vhost']
 
 
-    def _rank_matches_by_name_and_ssl(self, vhost_list, target_name):
-        """Returns a ranked list of vhosts from vhost_list that match target_name.
+    def _rank_matches_by_name_and_ssl(self, name_matches):  # pylint: disable=no-self-use
+        """Returns a ranked list of vhosts matching a name.
         The ranking gives preference to SSL vhosts.
 
-        :param list vhost_list: list of vhosts to filter and rank
-        :param str target_name: The name to match
+        :param list name_matches: vhosts matching the name as returned by
+            :meth:`~certbot_nginx.parser.NginxParser.find_vhosts`
         :returns: list of dicts containing the vhost, the matching name, and
             the numerical rank
         :rtype: list
@@ -412,8 +414,7 @@ class NginxConfigurator(common.Installer):
         # 3. longest wildcard name ending with *
         # 4. first matching regex in order of appearance in the file
         matches = []
-        for vhost in vhost_list:
-            name_type, name = parser.get_best_match(target_name, vhost.names)
+        for vhost, name_type, name in name_matches:
             if name_type == 'exact':
                 matches.append({'vhost': vhost,
                                 'name': name,
@@ -504,16 +505,12 @@ class NginxConfigurator(common.Installer):
         :rtype: list
 
         """
-        all_vhosts = self.parser.get_vhosts()
-
-        def _vhost_matches(vhost, port):
-            return self._vhost_listening_on_port_no_ssl(vhost, port)
-
-        matching_vhosts = [vhost for vhost in all_vhosts if _vhost_matches(vhost, port)]
+        name_matches = [match for match in self.parser.find_vhosts(target_name)
+                        if self._vhost_listening_on_port_no_ssl(match[0], port)]
 
         # We can use this ranking function because sslishness doesn't matter to us, and
         # there shouldn't be conflicting plaintextish servers listening on 80.
-        return self._rank_matches_by_name_and_ssl(matching_vhosts, target_name)
+        return self._rank_matches_by_name_and_ssl(name_matches)
 
     def get_all_names(self):
         """Returns all names found in the Nginx Configuration.
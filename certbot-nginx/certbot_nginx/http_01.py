@@ -92,6 +92,7 @@ class NginxHttp01(common.ChallengePerformer):
                     body.insert(0, bucket_directive)
                 if include_directive not in body:
                     body.insert(0, include_directive)
+                self.configurator.parser.invalidate_vhosts(root)
                 included = True
                 break
         if not included:
@@ -1,66 +1,134 @@
-"""Very low-level nginx config parser based on pyparsing."""
+"""Very low-level nginx config parser."""
 # Forked from https://github.com/fatiherikli/nginxparser (MIT Licensed)
 import copy
 import logging
+import re
 
-from pyparsing import (
-    Literal, White, Forward, Group, Optional, OneOrMore, QuotedString, Regex, ZeroOrMore, Combine)
-from pyparsing import stringEnd
-from pyparsing import restOfLine
+import pyparsing
 import six
 
 logger = logging.getLogger(__name__)
 
 class RawNginxParser(object):
-    # pylint: disable=expression-not-assigned
-    # pylint: disable=pointless-statement
-    """A class that parses nginx configuration with pyparsing."""
+    """A class that parses nginx configuration.
 
-    # constants
-    space = Optional(White()).leaveWhitespace()
-    required_space = White().leaveWhitespace()
+    The source is parsed in a single pass, keeping whitespace and comments
+    in the tree so that it can be dumped back unchanged. Syntax errors
+    raise :class:`pyparsing.ParseException`, as the pyparsing grammar
+    this parser replaced did.
 
-    left_bracket = Literal("{").suppress()
-    right_bracket = space + Literal("}").suppress()
-    semicolon = Literal(";").suppress()
-    dquoted = QuotedString('"', multiline=True, unquoteResults=False, escChar='\\')
-    squoted = QuotedString("'", multiline=True, unquoteResults=False, escChar='\\')
-    quoted = dquoted | squoted
-    head_tokenchars = Regex(r"[^{};\s'\"]") # if (last_space)
-    tail_tokenchars = Regex(r"(\$\{)|[^{;\s]") # else
-    tokenchars = Combine(head_tokenchars + ZeroOrMore(tail_tokenchars))
-    paren_quote_extend = Combine(quoted + Literal(')') + ZeroOrMore(tail_tokenchars))
-    # note: ')' allows extension, but then we fall into else, not last_space.
-
-    token = paren_quote_extend | tokenchars | quoted
+    """
+    # Whitespace between tokens. Other characters matched by \s are
+    # neither whitespace nor part of tokens, so they are syntax errors.
+    _space = re.compile(r"[ \t\r\n]*")
+    _tokenchars = re.compile(r"[^{};\s'\"](?:\$\{|[^{;\s])*")
+    _tail_tokenchars = re.compile(r"(?:\$\{|[^{;\s])*")
+    _quoted = re.compile(r"\"(?:[^\"\\]|\\.)*\"|'(?:[^'\\]|\\.)*'", re.DOTALL)
+    _rest_of_line = re.compile(r".*")
 
-    whitespace_token_group = space + token + ZeroOrMore(required_space + token) + space
-    assignment = whitespace_token_group + semicolon
+    def __init__(self, source):
+        self.source = source
 
-    comment = space + Literal('#') + restOfLine
+    def parse(self):
+        """Returns the parsed tree.
 
-    block = Forward()
+        :returns: the parsed tree, as nested lists of strings
+        :rtype: list
 
-    # order matters! see issue 518, and also http { # server { \n}
-    contents = Group(comment) | Group(block) | Group(assignment)
+        :raises pyparsing.ParseException: if the source is not valid
 
-    block_begin = Group(whitespace_token_group)
-    block_innards = Group(ZeroOrMore(contents) + space).leaveWhitespace()
-    block << block_begin + left_bracket + block_innards + right_bracket
+        """
+        source = self.source
+        space = self._space.match
+        rest_of_line = self._rest_of_line.match
+        tree = contents = []
+        # Contents of the blocks enclosing the current one
+        enclosing = []
+        pos = 0
+        while True:
+            space_end = space(source, pos).end()
+            char = source[space_end:space_end + 1]
+            if not char or char == "}":
+                if space_end > pos:
+                    contents.append(source[pos:space_end])
+                if not char and enclosing:
+                    raise self._error(space_end, "Expected \"}\"")
+                if char and not enclosing:
+                    raise self._error(space_end, "Unexpected \"}\"")
+                if not char:
+                    break
+                contents = enclosing.pop()
+                pos = space_end + 1
+                continue
 
-    script = OneOrMore(contents) + space + stringEnd
-    script.parseWithTabs().leaveWhitespace()
+            group = [source[pos:space_end]] if space_end > pos else []
+            if char == "#":
+                line = rest_of_line(source, space_end + 1)
+                group.extend(("#", line.group()))
+                contents.append(group)
+                pos = line.end()
+                continue
 
-    def __init__(self, source):
-        self.source = source
+            pos = self._parse_tokens(group, space_end)
+            char = source[pos:pos + 1]
+            if char == ";":
+                contents.append(group)
+            elif char == "{":
+                block_contents = []
+                contents.append([group, block_contents])
+                enclosing.append(contents)
+                contents = block_contents
+            else:
+                raise self._error(pos, "Expected \";\" or \"{\"")
+            pos += 1
 
-    def parse(self):
-        """Returns the parsed tree."""
-        return self.script.parseString(self.source)
+        if not any(isinstance(entry, list) for entry in tree):
+            raise self._error(0, "Expected a directive or comment")
+        return tree
 
     def as_list(self):
         """Returns the parsed tree as a list."""
-        return self.parse().asList()
+        return self.parse()
+
+    def _parse_tokens(self, group, pos):
+        """Appends the tokens at pos and the whitespace between them to group.
+
+        :returns: position after the tokens and any whitespace following them
+        :rtype: int
+
+        """
+        token_end = self._token_end(pos)
+        if token_end is None:
+            raise self._error(pos, "Expected a token")
+        group.append(self.source[pos:token_end])
+        pos = token_end
+        while True:
+            space_end = self._space.match(self.source, pos).end()
+            if space_end == pos:
+                return pos
+            token_end = self._token_end(space_end)
+            if token_end is None:
+                group.append(self.source[pos:space_end])
+                return space_end
+            group.extend((self.source[pos:space_end],
+                          self.source[space_end:token_end]))
+            pos = token_end
+
+    def _token_end(self, pos):
+        """Returns where the token at pos ends, or None if there is none."""
+        source = self.source
+        if source[pos:pos + 1] in ("\"", "'"):
+            quoted = self._quoted.match(source, pos)
+            if quoted is None:
+                return None
+            if source[quoted.end():quoted.end() + 1] == ")":
+                return self._tail_tokenchars.match(source, quoted.end() + 1).end()
+            return quoted.end()
+        token = self._tokenchars.match(source, pos)
+        return None if token is None else token.end()
+
+    def _error(self, pos, msg):
+        return pyparsing.ParseException(self.source, pos, msg)
 
 class RawNginxDumper(object):
     # pylint: disable=too-few-public-methods
@@ -109,7 +177,7 @@ def loads(source):
     :rtype: list
 
     """
-    return UnspacedList(RawNginxParser(source).as_list())
+    return UnspacedList.from_spaced(RawNginxParser(source).as_list())
 
 
 def load(_file):
@@ -148,26 +216,51 @@ def dump(blocks, _file):
 
 spacey = lambda x: (isinstance(x, six.string_types) and x.isspace()) or x == ''
 
+
+def _copy_tree(tree):
+    """Copies the lists of a parsed tree, which hold immutable strings."""
+    return [_copy_tree(entry) if isinstance(entry, list) else entry
+            for entry in tree]
+
+
 class UnspacedList(list):
     """Wrap a list [of lists], making any whitespace entries magically invisible"""
 
     def __init__(self, list_source):
         # ensure our argument is not a generator, and duplicate any sublists
-        self.spaced = copy.deepcopy(list(list_source))
+        list.__init__(self)
+        self.spaced = []
         self.dirty = False
+        self._wrap(_copy_tree(list_source))
+
+    @classmethod
+    def from_spaced(cls, spaced):
+        """Wraps a parsed tree without copying it.
+
+        :param list spaced: parsed tree, which must not be used elsewhere
+            as it becomes the `spaced` attribute of the result
 
-        # Turn self into a version of the source list that has spaces removed
-        # and all sub-lists also UnspacedList()ed
-        list.__init__(self, list_source)
-        for i, entry in reversed(list(enumerate(self))):
+        :rtype: UnspacedList
+
+        """
+        unspaced = cls.__new__(cls)
+        list.__init__(unspaced)
+        unspaced._wrap(spaced)  # pylint: disable=protected-access
+        return unspaced
+
+    def _wrap(self, spaced):
+        """Turn self into a version of spaced that has spaces removed
+        and all sub-lists also UnspacedList()ed"""
+        self.spaced = spaced
+        self.dirty = False
+        in_comment = False
+        for entry in spaced:
             if isinstance(entry, list):
-                sublist = UnspacedList(entry)
-                list.__setitem__(self, i, sublist)
-                self.spaced[i] = sublist.spaced
-            elif spacey(entry):
-                # don't delete comments
-                if "#" not in self[:i]:
-                    list.__delitem__(self, i)
+                list.append(self, UnspacedList.from_spaced(entry))
+            # don't delete comments
+            elif in_comment or not spacey(entry):
+                list.append(self, entry)
+            in_comment = in_comment or entry == "#"
 
     def _coerce(self, inbound):
         """
@@ -238,9 +331,8 @@ class UnspacedList(list):
         list.__delitem__(self, i)
         self.dirty = True
 
-    def __deepcopy__(self, memo):
-        new_spaced = copy.deepcopy(self.spaced, memo=memo)
-        l = UnspacedList(new_spaced)
+    def __deepcopy__(self, unused_memo):
+        l = UnspacedList(self.spaced)
         l.dirty = self.dirty
         return l
 
@@ -0,0 +1,106 @@
+"""Parsed nginx configuration files kept on disk between runs."""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+import six
+
+from certbot import util
+
+from certbot_nginx import nginxparser
+
+
+logger = logging.getLogger(__name__)
+
+_FORMAT = 1
+"""Version of the cache file format, changed when it is incompatible."""
+
+
+class ParseCache(object):
+    """Cache of the trees parsed from nginx configuration files.
+
+    Each file is cached in its own JSON file of the cache directory,
+    named after the hash of its path, next to the SHA-256 digest of its
+    contents. A cached tree is only used if the file still has the same
+    contents, whatever changed it, so editing the configuration by hand
+    or with :meth:`.NginxParser.filedump` never gives stale trees.
+
+    Failing to use or update the cache is never an error: the file is
+    then parsed as if there were no cache.
+
+    :ivar str directory: Directory holding the cache files
+
+    """
+    def __init__(self, directory):
+        self.directory = directory
+
+    def load(self, filename):
+        """Returns the tree parsed from filename.
+
+        :param str filename: path of the nginx configuration file
+
+        :returns: the parsed tree
+        :rtype: nginxparser.UnspacedList
+
+        :raises IOError: if the file cannot be read
+        :raises pyparsing.ParseException: if the file cannot be parsed
+
+        """
+        with open(filename) as _file:
+            source = _file.read()
+        digest = hashlib.sha256(
+            source.encode("utf-8") if isinstance(source, six.text_type)
+            else source).hexdigest()
+        cache_path = self._cache_path(filename)
+
+        spaced = self._read(cache_path, filename, digest)
+        if spaced is None:
+            spaced = nginxparser.RawNginxParser(source).as_list()
+            self._write(cache_path, filename, digest, spaced)
+        return nginxparser.UnspacedList.from_spaced(spaced)
+
+    def _cache_path(self, filename):
+        name = hashlib.sha256(os.path.abspath(filename).encode("utf-8"))
+        return os.path.join(self.directory, name.hexdigest() + ".json")
+
+    def _read(self, cache_path, filename, digest):
+        """Returns the cached tree of filename, or None if it is missing
+        or out of date."""
+        try:
+            with open(cache_path) as cache_file:
+                entry = json.load(cache_file)
+        except (IOError, OSError):
+            return None
+        except ValueError as error:
+            logger.debug("Ignoring unusable parse cache %s of %s: %s",
+                         cache_path, filename, error)
+            return None
+        if (isinstance(entry, dict) and entry.get("format") == _FORMAT and
+                entry.get("digest") == digest and
+                entry.get("path") == os.path.abspath(filename) and
+                isinstance(entry.get("tree"), list)):
+            return entry["tree"]
+        return None
+
+    def _write(self, cache_path, filename, digest, spaced):
+        """Caches the tree parsed from filename."""
+        try:
+            util.make_or_verify_dir(self.directory, 0o700, os.geteuid())
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".new-")
+            try:
+                with os.fdopen(fd, "w") as cache_file:
+                    # json.dump writes many small chunks, which is much slower
+                    cache_file.write(json.dumps({
+                        "format": _FORMAT,
+                        "path": os.path.abspath(filename),
+                        "digest": digest,
+                        "tree": spaced}))
+                os.rename(temp_path, cache_path)
+            except Exception:
+                util.safely_remove(temp_path)
+                raise
+        except Exception as error:  # pylint: disable=broad-except
+            logger.debug("Unable to cache the parsed %s in %s: %s",
+                         filename, self.directory, error)
@@ -13,6 +13,8 @@ from certbot import errors
 
 from certbot_nginx import obj
 from certbot_nginx import nginxparser
+from certbot_nginx import parse_cache
+from certbot_nginx import vhost_index
 
 
 logger = logging.getLogger(__name__)
@@ -24,13 +26,24 @@ class NginxParser(object):
     :ivar str root: Normalized absolute path to the server root
         directory. Without trailing slash.
     :ivar dict parsed: Mapping of file paths to parsed trees
+    :ivar cache: Trees parsed in previous runs, if any
+    :type cache: `certbot_nginx.parse_cache.ParseCache` or `None`
 
     """
 
-    def __init__(self, root):
+    def __init__(self, root, cache_dir=None):
         self.parsed = {}
         self.root = os.path.abspath(root)
         self.config_root = self._find_config_root()
+        self.cache = parse_cache.ParseCache(cache_dir) if cache_dir else None
+        self._vhost_index = None
+        self._addr_ssl_index = None
+        self._file_positions = None
+        # Sslishness of each indexed vhost without accounting for global
+        # address sslishness, by file and path
+        self._vhosts_raw_ssl = {}
+        # Files whose vhosts must be indexed again
+        self._stale_files = set()
 
         # Parse nginx.conf and included files.
         # TODO: Check sites-available/ as well. For now, the configurator does
@@ -42,8 +55,28 @@ class NginxParser(object):
 
         """
         self.parsed = {}
+        self.invalidate_vhosts()
         self._parse_recursively(self.config_root)
 
+    def invalidate_vhosts(self, filename=None):
+        """Forgets the virtual hosts found in the parsed trees.
+
+        They are found again when next needed. This must be called after
+        modifying the parsed trees other than through this class.
+
+        :param str filename: only forget the virtual hosts of this file,
+            whose parsed tree was modified
+
+        """
+        if filename is None:
+            self._vhost_index = None
+            self._addr_ssl_index = None
+            self._vhosts_raw_ssl = {}
+            self._stale_files = set()
+            self._file_positions = None
+        elif self._vhost_index is not None:
+            self._stale_files.add(filename)
+
     def _parse_recursively(self, filepath):
         """Parses nginx config files recursively by looking at 'include'
         directives inside 'http' and 'server' blocks. Note that this only
@@ -85,29 +118,17 @@ class NginxParser(object):
         else:
             return path
 
-    def _build_addr_to_ssl(self):
-        """Builds a map from address to whether it listens on ssl in any server block
-        """
-        servers = self._get_raw_servers()
-
-        addr_to_ssl = {}
-        for filename in servers:
-            for server, _ in servers[filename]:
-                # Parse the server block to save addr info
-                parsed_server = _parse_server_raw(server)
-                for addr in parsed_server['addrs']:
-                    addr_tuple = addr.normalized_tuple()
-                    if addr_tuple not in addr_to_ssl:
-                        addr_to_ssl[addr_tuple] = addr.ssl
-                    addr_to_ssl[addr_tuple] = addr.ssl or addr_to_ssl[addr_tuple]
-        return addr_to_ssl
-
-    def _get_raw_servers(self):
+    def _get_raw_servers(self, filenames=None):
         # pylint: disable=cell-var-from-loop
         """Get a map of unparsed all server blocks
+
+        :param filenames: files whose server blocks are returned, all
+            parsed files if `None`
         """
         servers = {}
-        for filename in self.parsed:
+        if filenames is None:
+            filenames = self.parsed
+        for filename in filenames:
             tree = self.parsed[filename]
             servers[filename] = []
             srv = servers[filename]  # workaround undefined loop var in lambdas
@@ -133,11 +154,55 @@ class NginxParser(object):
         :rtype: list
 
         """
-        enabled = True  # We only look at enabled vhosts for now
-        servers = self._get_raw_servers()
+        return self._get_vhost_index().vhosts()
+
+    def find_vhosts(self, target_name):
+        """Finds the virtual hosts with a server name matching target_name.
+
+        :param str target_name: The name to match
+
+        :returns: tuples of a :class:`~certbot_nginx.obj.VirtualHost`, the
+            type of its best match and the name that matched as returned
+            by :func:`get_best_match`, in the order of :meth:`get_vhosts`
+        :rtype: list
+
+        """
+        return self._get_vhost_index().find(target_name)
+
+    def _get_vhost_index(self):
+        """Returns the index of the virtual hosts, updating it if needed.
 
-        vhosts = []
-        for filename in servers:
+        Building the index also builds the index of address sslishness.
+
+        :rtype: :class:`~certbot_nginx.vhost_index.VhostIndex`
+
+        """
+        if self._vhost_index is None:
+            self._vhost_index = vhost_index.VhostIndex()
+            self._addr_ssl_index = vhost_index.AddrSslIndex()
+            self._stale_files = set(self.parsed)
+        if self._stale_files:
+            self._index_files()
+        return self._vhost_index
+
+    def _index_files(self):
+        """Indexes the vhosts of the stale files again."""
+        enabled = True  # We only look at enabled vhosts for now
+        stale_files = [filename for filename in self.parsed
+                       if filename in self._stale_files]
+        self._stale_files = set()
+
+        changed = set()
+        for vhost in self._vhost_index.vhosts():
+            if vhost.filep in stale_files:
+                self._vhost_index.remove(vhost)
+                del self._vhosts_raw_ssl[(vhost.filep, tuple(vhost.path))]
+        for filename in stale_files:
+            changed.update(self._addr_ssl_index.remove_file(filename))
+
+        new_vhosts = []
+        servers = self._get_raw_servers(stale_files)
+        for filename in stale_files:
             for server, path in servers[filename]:
                 # Parse the server block into a VirtualHost object
 
@@ -149,19 +214,63 @@ class NginxParser(object):
                                         parsed_server['names'],
                                         server,
                                         path)
-                vhosts.append(vhost)
+                changed.update(self._index_vhost(vhost, parsed_server))
+                new_vhosts.append(vhost)
+
+        self._update_vhosts_addrs_ssl(new_vhosts, changed)
+
+    def _index_vhost(self, vhost, parsed_server):
+        """Adds vhost to the indexes, replacing the one at the same position.
+
+        :param vhost: virtual host to index
+        :type vhost: :class:`~certbot_nginx.obj.VirtualHost`
+        :param dict parsed_server: vhost.raw parsed by `_parse_server_raw`
+
+        :returns: normalized tuples of the addresses whose sslishness
+            changed
+        :rtype: set
+
+        """
+        self._vhost_index.add(vhost, self._file_order(vhost.filep))
+        self._vhosts_raw_ssl[(vhost.filep, tuple(vhost.path))] = parsed_server['ssl']
+        return self._addr_ssl_index.set_server(
+            vhost.filep, vhost.path, parsed_server['addrs'])
+
+    def _file_order(self, filename):
+        """Position of filename in self.parsed, which orders the vhosts."""
+        if self._file_positions is None or filename not in self._file_positions:
+            self._file_positions = dict(
+                (name, i) for i, name in enumerate(self.parsed))
+        return self._file_positions.get(filename, len(self._file_positions))
+
+    def _reindex_vhost(self, vhost, parsed_server):
+        """Updates the indexes after vhost was added to or modified in the
+        parsed trees, applying global address sslishness to it.
+
+        :param vhost: virtual host to index
+        :type vhost: :class:`~certbot_nginx.obj.VirtualHost`
+        :param dict parsed_server: vhost.raw parsed by `_parse_server_raw`
+
+        """
+        self._get_vhost_index()
+        changed = self._index_vhost(vhost, parsed_server)
+        self._update_vhosts_addrs_ssl([vhost], changed)
 
-        self._update_vhosts_addrs_ssl(vhosts)
+    def _update_vhosts_addrs_ssl(self, vhosts, changed):
+        """Update vhosts and the indexed vhosts listening on changed
+        addresses to include global address sslishness
 
-        return vhosts
+        :param list vhosts: vhosts to update
+        :param set changed: normalized tuples of the addresses whose
+            sslishness changed
 
-    def _update_vhosts_addrs_ssl(self, vhosts):
-        """Update a list of raw parsed vhosts to include global address sslishness
         """
-        addr_to_ssl = self._build_addr_to_ssl()
+        if changed:
+            vhosts = self._vhost_index.vhosts()
         for vhost in vhosts:
+            vhost.ssl = self._vhosts_raw_ssl[(vhost.filep, tuple(vhost.path))]
             for addr in vhost.addrs:
-                addr.ssl = addr_to_ssl[addr.normalized_tuple()]
+                addr.ssl = self._addr_ssl_index.is_ssl(addr.normalized_tuple())
                 if addr.ssl:
                     vhost.ssl = True
 
@@ -202,10 +311,13 @@ class NginxParser(object):
             if item in self.parsed and not override:
                 continue
             try:
-                with open(item) as _file:
-                    parsed = nginxparser.load(_file)
-                    self.parsed[item] = parsed
-                    trees.append(parsed)
+                if self.cache is not None:
+                    parsed = self.cache.load(item)
+                else:
+                    with open(item) as _file:
+                        parsed = nginxparser.load(_file)
+                self.parsed[item] = parsed
+                trees.append(parsed)
             except IOError:
                 logger.warning("Could not open file: %s", item)
             except pyparsing.ParseException as err:
@@ -253,9 +365,9 @@ class NginxParser(object):
         :param list server: list of directives in a server block
         :rtype: dict
         """
-        addr_to_ssl = self._build_addr_to_ssl()
+        self._get_vhost_index()
         parsed_server = _parse_server_raw(server)
-        _apply_global_addr_ssl(addr_to_ssl, parsed_server)
+        _apply_global_addr_ssl(self._addr_ssl_index, parsed_server)
         return parsed_server
 
     def has_ssl_on_directive(self, vhost):
@@ -314,11 +426,12 @@ class NginxParser(object):
 
     def _update_vhost_based_on_new_directives(self, vhost, directives_list):
         new_server = self._get_included_directives(directives_list)
-        parsed_server = self.parse_server(new_server)
+        parsed_server = _parse_server_raw(new_server)
         vhost.addrs = parsed_server['addrs']
         vhost.ssl = parsed_server['ssl']
         vhost.names = parsed_server['names']
         vhost.raw = new_server
+        self._reindex_vhost(vhost, parsed_server)
 
     def _modify_server_directives(self, vhost, block_func):
         filename = vhost.filep
@@ -364,10 +477,12 @@ class NginxParser(object):
                     new_directives.append(directive)
             raw_in_parsed[1] = new_directives
 
-            self._update_vhost_based_on_new_directives(new_vhost, new_directives)
-
         enclosing_block.append(raw_in_parsed)
         new_vhost.path[-1] = len(enclosing_block) - 1
+        if only_directives is not None:
+            self._update_vhost_based_on_new_directives(new_vhost, new_directives)
+        else:
+            self._reindex_vhost(new_vhost, _parse_server_raw(new_vhost.raw))
         if delete_default:
             for addr in new_vhost.addrs:
                 addr.default = False
@@ -433,24 +548,8 @@ def get_best_match(target_name, names):
         elif _regex_match(target_name, name):
             regex.append(name)
 
-    if len(exact) > 0:
-        # There can be more than one exact match; e.g. eff.org, .eff.org
-        match = min(exact, key=len)
-        return ('exact', match)
-    if len(wildcard_start) > 0:
-        # Return the longest wildcard
-        match = max(wildcard_start, key=len)
-        return ('wildcard_start', match)
-    if len(wildcard_end) > 0:
-        # Return the longest wildcard
-        match = max(wildcard_end, key=len)
-        return ('wildcard_end', match)
-    if len(regex) > 0:
-        # Just return the first one for now
-        match = regex[0]
-        return ('regex', match)
-
-    return (None, None)
+    return vhost_index.select_best_match(
+        exact, wildcard_start, wildcard_end, regex)
 
 
 def _exact_match(target_name, name):
@@ -676,11 +775,11 @@ def _remove_directives(directive_name, match_func, block):
             return
         del block[location]
 
-def _apply_global_addr_ssl(addr_to_ssl, parsed_server):
+def _apply_global_addr_ssl(addr_ssl_index, parsed_server):
     """Apply global sslishness information to the parsed server block
     """
     for addr in parsed_server['addrs']:
-        addr.ssl = addr_to_ssl[addr.normalized_tuple()]
+        addr.ssl = addr.ssl or addr_ssl_index.is_ssl(addr.normalized_tuple())
         if addr.ssl:
             parsed_server['ssl'] = True
 
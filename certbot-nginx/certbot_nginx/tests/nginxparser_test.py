@@ -1,6 +1,8 @@
 """Test for certbot_nginx.nginxparser."""
 import copy
 import operator
+import os
+import random
 import tempfile
 import unittest
 
@@ -9,6 +11,7 @@ from pyparsing import ParseException
 from certbot_nginx.nginxparser import (
     RawNginxParser, loads, load, dumps, dump, UnspacedList)
 from certbot_nginx.tests import util
+from certbot_nginx.tests.pyparsing_nginxparser import PyparsingNginxParser
 
 
 FIRST = operator.itemgetter(0)
@@ -18,22 +21,22 @@ class TestRawNginxParser(unittest.TestCase):
     """Test the raw low-level Nginx config parser."""
 
     def test_assignments(self):
-        parsed = RawNginxParser.assignment.parseString('root /test;').asList()
-        self.assertEqual(parsed, ['root', ' ', '/test'])
-        parsed = RawNginxParser.assignment.parseString('root /test;foo bar;').asList()
-        self.assertEqual(parsed, ['root', ' ', '/test'], ['foo', ' ', 'bar'])
+        parsed = RawNginxParser('root /test;').as_list()
+        self.assertEqual(parsed, [['root', ' ', '/test']])
+        parsed = RawNginxParser('root /test;foo bar;').as_list()
+        self.assertEqual(parsed, [['root', ' ', '/test'], ['foo', ' ', 'bar']])
 
     def test_blocks(self):
-        parsed = RawNginxParser.block.parseString('foo {}').asList()
-        self.assertEqual(parsed, [['foo', ' '], []])
-        parsed = RawNginxParser.block.parseString('location /foo{}').asList()
-        self.assertEqual(parsed, [['location', ' ', '/foo'], []])
-        parsed = RawNginxParser.block.parseString('foo { bar foo ; }').asList()
-        self.assertEqual(parsed, [['foo', ' '], [[' ', 'bar', ' ', 'foo', ' '], ' ']])
+        parsed = RawNginxParser('foo {}').as_list()
+        self.assertEqual(parsed, [[['foo', ' '], []]])
+        parsed = RawNginxParser('location /foo{}').as_list()
+        self.assertEqual(parsed, [[['location', ' ', '/foo'], []]])
+        parsed = RawNginxParser('foo { bar foo ; }').as_list()
+        self.assertEqual(parsed, [[['foo', ' '], [[' ', 'bar', ' ', 'foo', ' '], ' ']]])
 
     def test_nested_blocks(self):
-        parsed = RawNginxParser.block.parseString('foo { bar {} }').asList()
-        block, content = parsed
+        parsed = RawNginxParser('foo { bar {} }').as_list()
+        block, content = FIRST(parsed)
         self.assertEqual(FIRST(content), [[' ', 'bar', ' '], []])
         self.assertEqual(FIRST(block), 'foo')
 
@@ -349,6 +352,75 @@ class TestRawNginxParser(unittest.TestCase):
         self.assertEqual(loads("blag${dfgdfg};"), [['blag${dfgdfg}']])
         self.assertRaises(ParseException, loads, "blag${dfgdf{g};")
 
+    def test_errors(self):
+        for source in ('', ' \n', 'foo', 'foo {', 'foo }', '}', 'foo {}}',
+                       '{}', ';', 'foo\f;', '"foo"bar;'):
+            self.assertRaises(ParseException, loads, source)
+
+
+class TestPyparsingEquivalence(unittest.TestCase):
+    """Test that RawNginxParser parses like the pyparsing grammar it replaced."""
+
+    FRAGMENTS = ('a', 'b1', '$x', '${', '}', '{', ';', ' ', '  ', '\t',
+                 '\n', '\r', '\f', '#', '"', "'", '\\', ')', '(', '"q"',
+                 "'s'", '"a\\"b"', 'server', 'listen', '/', '=', '~')
+
+    def _assert_same(self, source):
+        try:
+            expected = PyparsingNginxParser(source).as_list()
+        except ParseException:
+            self.assertRaises(ParseException, RawNginxParser(source).as_list)
+        else:
+            self.assertEqual(RawNginxParser(source).as_list(), expected)
+
+    def test_testdata(self):
+        for dirpath, _, filenames in os.walk(os.path.dirname(
+                util.get_data_filename('nginx.conf'))):
+            for filename in filenames:
+                with open(os.path.join(dirpath, filename)) as handle:
+                    self._assert_same(handle.read())
+
+    def test_random_fragments(self):
+        rnd = random.Random(0)
+        for _ in range(2000):
+            self._assert_same(''.join(
+                rnd.choice(self.FRAGMENTS) for _ in range(rnd.randint(0, 14))))
+
+    def test_random_configs(self):
+        rnd = random.Random(0)
+        for _ in range(200):
+            self._assert_same(_random_config(rnd, depth=3))
+
+
+def _random_config(rnd, depth):
+    """Returns a random, mostly valid, nginx configuration."""
+    spaces = ('', ' ', '  ', '\n', '\n    ', '\t', '\r\n')
+    words = ('listen', '443', 'ssl', 'server_name', '*.example.com', '$host',
+             '"quoted; {value}"', "'single'", '"a\\"b"', '("paren")',
+             '"q")tail', '~*', r'\.php$', 'blag${var}', '#notcomment')
+    parts = []
+    for _ in range(rnd.randint(1, 5)):
+        parts.append(rnd.choice(spaces))
+        kind = rnd.random()
+        if kind < 0.2:
+            parts.append('#' + rnd.choice(('', ' comment', ' { ; }')) + '\n')
+            continue
+        parts.append(rnd.choice(words))
+        for _ in range(rnd.randint(0, 3)):
+            parts.extend((rnd.choice(spaces[1:]), rnd.choice(words)))
+        parts.append(rnd.choice(spaces))
+        if kind < 0.5 and depth:
+            parts.extend(('{', _random_config(rnd, depth - 1)
+                          if rnd.random() < 0.8 else '', rnd.choice(spaces), '}'))
+        else:
+            parts.append(';')
+    parts.append(rnd.choice(spaces))
+    if rnd.random() < 0.05:
+        # Corrupt the configuration
+        position = rnd.randint(0, len(parts))
+        parts.insert(position, rnd.choice(('{', '}', ';', '"', '\f')))
+    return ''.join(parts)
+
 
 class TestUnspacedList(unittest.TestCase):
     """Test the UnspacedList data structure"""
@@ -0,0 +1,88 @@
+"""Tests for certbot_nginx.parse_cache."""
+import os
+import shutil
+import unittest
+
+import mock
+import pyparsing
+
+from certbot_nginx import nginxparser
+from certbot_nginx.tests import util
+
+
+class ParseCacheTest(util.NginxTest):
+    """Tests for certbot_nginx.parse_cache.ParseCache."""
+
+    def setUp(self):
+        super(ParseCacheTest, self).setUp()
+        from certbot_nginx.parse_cache import ParseCache
+        self.directory = os.path.join(self.work_dir, "cache")
+        self.cache = ParseCache(self.directory)
+        self.filename = os.path.join(self.config_path, "nginx.conf")
+        with open(self.filename) as f:
+            self.expected = nginxparser.load(f)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        shutil.rmtree(self.config_dir)
+        shutil.rmtree(self.work_dir)
+
+    def _cache_files(self):
+        return os.listdir(self.directory)
+
+    def _assert_same(self, tree):
+        self.assertEqual(tree, self.expected)
+        self.assertEqual(tree.spaced, self.expected.spaced)
+
+    def test_miss_then_hit(self):
+        self._assert_same(self.cache.load(self.filename))
+        self.assertEqual(len(self._cache_files()), 1)
+        self.assertEqual(os.stat(self.directory).st_mode & 0o777, 0o700)
+
+        with mock.patch("certbot_nginx.parse_cache.nginxparser."
+                        "RawNginxParser") as mock_parser:
+            self._assert_same(self.cache.load(self.filename))
+        self.assertFalse(mock_parser.called)
+
+    def test_hit_not_shared(self):
+        self.cache.load(self.filename).append(["user", "nobody"])
+        self._assert_same(self.cache.load(self.filename))
+
+    def test_file_changed(self):
+        self.cache.load(self.filename)
+        with open(self.filename, "a") as f:
+            f.write("\nuser nobody;\n")
+        tree = self.cache.load(self.filename)
+        self.assertEqual(tree[-1], ["user", "nobody"])
+        self.assertEqual(len(self._cache_files()), 1)
+        self.assertEqual(self.cache.load(self.filename), tree)
+
+    def test_corrupt_cache(self):
+        self.cache.load(self.filename)
+        for contents in ("not json", "[]", '{"format": 1}'):
+            cache_path = os.path.join(self.directory, self._cache_files()[0])
+            with open(cache_path, "w") as f:
+                f.write(contents)
+            self._assert_same(self.cache.load(self.filename))
+
+    @mock.patch("certbot_nginx.parse_cache.logger")
+    def test_write_failure(self, mock_logger):
+        with open(self.directory, "w"):
+            pass
+        self._assert_same(self.cache.load(self.filename))
+        self.assertTrue(mock_logger.debug.called)
+
+    def test_parse_error(self):
+        with open(self.filename, "w") as f:
+            f.write("server {")
+        self.assertRaises(pyparsing.ParseException,
+                          self.cache.load, self.filename)
+        self.assertFalse(os.path.exists(self.directory))
+
+    def test_missing_file(self):
+        self.assertRaises(IOError, self.cache.load,
+                          os.path.join(self.config_path, "missing.conf"))
+
+
+if __name__ == "__main__":
+    unittest.main()  # pragma: no cover
@@ -84,6 +84,22 @@ class NginxParserTest(util.NginxTest): #pylint: disable=too-many-public-methods
                                         ['server_name', 'example.*']]]],
                          parsed[0])
 
+    def test_load_cached(self):
+        cache_dir = os.path.join(self.work_dir, 'cache')
+        nparser = parser.NginxParser(self.config_path, cache_dir)
+        self.assertEqual(len(os.listdir(cache_dir)), len(nparser.parsed))
+        uncached = parser.NginxParser(self.config_path)
+        self.assertEqual(nparser.parsed, uncached.parsed)
+
+        example_com = nparser.abs_path('sites-enabled/example.com')
+        nparser.parsed[example_com][0][1].append(['server_name', ' ', 'new.com'])
+        nparser.filedump(ext='')
+        nparser.load()
+        self.assertEqual(['server_name', 'new.com'],
+                         nparser.parsed[example_com][0][1][-1])
+        self.assertEqual(nparser.parsed,
+                         parser.NginxParser(self.config_path).parsed)
+
     def test__do_for_subarray(self):
         # pylint: disable=protected-access
         mylists = [([[2], [3], [2]], [[0], [2]]),
@@ -119,6 +135,74 @@ class NginxParserTest(util.NginxTest): #pylint: disable=too-many-public-methods
         globalssl_com = [x for x in vhosts if 'globalssl.com' in x.filep][0]
         self.assertEqual(vhost, globalssl_com)
 
+    def test_find_vhosts(self):
+        nparser = parser.NginxParser(self.config_path)
+        matches = nparser.find_vhosts('www.example.com')
+        self.assertEqual([(vhost.filep, name_type, name)
+                          for vhost, name_type, name in matches],
+                         [(nparser.abs_path('nginx.conf'), 'regex',
+                           r'~^(www\.)?(example|bar)\.'),
+                          (nparser.abs_path('sites-enabled/example.com'),
+                           'wildcard_start', '.example.com')])
+
+    def test_vhosts_updated(self):
+        nparser = parser.NginxParser(self.config_path)
+        example_com = [x for x in nparser.get_vhosts()
+                       if 'example.*' in x.names][0]
+        nparser.add_server_directives(
+            example_com, [['server_name', 'new.org']], replace=False)
+        nparser.add_server_directives(
+            example_com, [['listen', '127.0.0.1', 'ssl']], replace=False)
+        self.assertEqual(nparser.find_vhosts('new.org'),
+                         [(example_com, 'exact', 'new.org')])
+
+        new_vhost = nparser.duplicate_vhost(example_com,
+                                            only_directives=['listen'])
+        self.assertEqual(nparser.find_vhosts('new.org'),
+                         [(example_com, 'exact', 'new.org')])
+        vhosts = nparser.get_vhosts()
+        self.assertTrue(new_vhost in vhosts)
+        self.assertEqual(len(vhosts), 13)
+
+        # 127.0.0.1 now listens with ssl in every server block
+        self.assertEqual(set(vhost.ssl for vhost in vhosts
+                             if '127.0.0.1' in [addr.get_addr()
+                                                for addr in vhost.addrs]),
+                         set([True]))
+        fresh = parser.NginxParser(self.config_path)
+        fresh.parsed = nparser.parsed
+        self.assertEqual(fresh.get_vhosts(), vhosts)
+
+    def test_invalidate_vhosts(self):
+        nparser = parser.NginxParser(self.config_path)
+        vhosts = nparser.get_vhosts()
+        self.assertEqual(nparser.get_vhosts(), vhosts)
+        nginx_conf = nparser.abs_path('nginx.conf')
+        http = nparser.parsed[nginx_conf][-1][1]
+        http.insert(0, ['include', 'foo.conf'])
+        nparser.invalidate_vhosts(nginx_conf)
+        new_vhosts = nparser.get_vhosts()
+        self.assertEqual([vhost.path for vhost in new_vhosts
+                          if vhost.filep == nginx_conf],
+                         [[10, 1, 10], [10, 1, 13]])
+        # The vhosts of the other files were kept
+        self.assertEqual(
+            [id(vhost) for vhost in vhosts if vhost.filep != nginx_conf],
+            [id(vhost) for vhost in new_vhosts if vhost.filep != nginx_conf])
+
+        nparser.invalidate_vhosts()
+        self.assertEqual(nparser.get_vhosts(), new_vhosts)
+
+    def test_invalidate_vhosts_ssl(self):
+        nparser = parser.NginxParser(self.config_path)
+        globalssl_com = nparser.abs_path('sites-enabled/globalssl.com')
+        self.assertTrue(nparser.parse_server([['listen', '4.8.2.6:57']])['ssl'])
+        del nparser.parsed[globalssl_com][1]
+        nparser.invalidate_vhosts(globalssl_com)
+        vhosts = [x for x in nparser.get_vhosts() if x.filep == globalssl_com]
+        self.assertEqual([vhost.ssl for vhost in vhosts], [False])
+        self.assertFalse(nparser.parse_server([['listen', '4.8.2.6:57']])['ssl'])
+
     def test_get_vhosts(self):
         nparser = parser.NginxParser(self.config_path)
         vhosts = nparser.get_vhosts()
@@ -0,0 +1,137 @@
+"""Tests for certbot_nginx.vhost_index."""
+import random
+import unittest
+
+from certbot_nginx import obj
+from certbot_nginx import parser
+
+
+def _vhost(names, index, filep='example.com'):
+    return obj.VirtualHost(filep, set(), False, True, set(names), [], [index])
+
+
+class VhostIndexTest(unittest.TestCase):
+    """Tests for certbot_nginx.vhost_index.VhostIndex."""
+
+    def setUp(self):
+        from certbot_nginx.vhost_index import VhostIndex
+        self.index = VhostIndex()
+        self.vhosts = [
+            _vhost(['www.eff.org', '.eff.org'], 0),
+            _vhost(['*.eff.org', 'www.eff.*'], 1),
+            _vhost(['.www.eff.org', 'eff.*'], 2),
+            _vhost([r'~^(www\.)?(eff|bar)\.'], 0, 'default'),
+            _vhost(['*'], 3),
+        ]
+        for vhost in self.vhosts:
+            self.index.add(vhost, 0 if vhost.filep == 'default' else 1)
+
+    def _find(self, target_name):
+        return [(self.vhosts.index(vhost), name_type, name) for
+                vhost, name_type, name in self.index.find(target_name)]
+
+    def test_vhosts(self):
+        self.assertEqual(self.index.vhosts(), [self.vhosts[i] for i in
+                                               (3, 0, 1, 2, 4)])
+
+    def test_find(self):
+        self.assertEqual(self._find('eff.org'), [
+            (3, 'regex', r'~^(www\.)?(eff|bar)\.'),
+            (0, 'exact', '.eff.org'),
+            (2, 'wildcard_end', 'eff.*'),
+            (4, 'wildcard_start', '*')])
+        self.assertEqual(self._find('www.eff.org'), [
+            (3, 'regex', r'~^(www\.)?(eff|bar)\.'),
+            (0, 'exact', 'www.eff.org'),
+            (1, 'wildcard_start', '*.eff.org'),
+            (2, 'exact', '.www.eff.org'),
+            (4, 'wildcard_start', '*')])
+        self.assertEqual(self._find('www.eff.com'), [
+            (3, 'regex', r'~^(www\.)?(eff|bar)\.'),
+            (1, 'wildcard_end', 'www.eff.*'),
+            (4, 'wildcard_start', '*')])
+
+    def test_update(self):
+        vhost = self.vhosts[1]
+        vhost.names = set(['example.org'])
+        self.index.add(vhost, 1)
+        self.assertEqual([match[0] for match in self._find('www.eff.com')],
+                         [3, 4])
+        self.assertEqual(self._find('example.org')[0],
+                         (1, 'exact', 'example.org'))
+        self.assertEqual(len(self.index.vhosts()), len(self.vhosts))
+
+    def test_remove(self):
+        for vhost in self.vhosts:
+            self.index.remove(vhost)
+        self.index.remove(self.vhosts[0])
+        self.assertEqual(self.index.vhosts(), [])
+        self.assertEqual(self.index.find('www.eff.org'), [])
+
+    def test_same_as_get_best_match(self):
+        rnd = random.Random(0)
+        labels = ['eff', 'org', 'www', '*', '', r'~^w', '~.*g$']
+
+        def random_name():
+            """Returns a random server name, possibly a wildcard or regex."""
+            return '.'.join(rnd.choice(labels)
+                            for _ in range(rnd.randint(1, 4)))
+
+        for vhost in self.vhosts:
+            self.index.remove(vhost)
+        vhosts = [_vhost([random_name() for _ in range(rnd.randint(0, 3))], i)
+                  for i in range(50)]
+        for vhost in vhosts:
+            self.index.add(vhost)
+        for _ in range(500):
+            target_name = random_name().replace('*', 'x').replace('~', 'y')
+            expected = []
+            for vhost in vhosts:
+                name_type, name = parser.get_best_match(target_name, vhost.names)
+                if name_type is not None:
+                    expected.append((vhost, name_type, name))
+            self.assertEqual(self.index.find(target_name), expected)
+
+
+class AddrSslIndexTest(unittest.TestCase):
+    """Tests for certbot_nginx.vhost_index.AddrSslIndex."""
+
+    def setUp(self):
+        from certbot_nginx.vhost_index import AddrSslIndex
+        self.index = AddrSslIndex()
+        self.http = obj.Addr.fromstring('80')
+        self.https = obj.Addr.fromstring('443 ssl')
+        self.https_plain = obj.Addr.fromstring('443')
+
+    def test_set_server(self):
+        self.assertEqual(self.index.set_server('a', [0], [self.http]), set())
+        self.assertEqual(self.index.set_server('a', [1], [self.https]),
+                         set([self.https.normalized_tuple()]))
+        self.assertEqual(self.index.set_server('b', [0], [self.https]), set())
+        self.assertTrue(self.index.is_ssl(self.https.normalized_tuple()))
+        self.assertFalse(self.index.is_ssl(self.http.normalized_tuple()))
+
+        self.assertEqual(self.index.set_server('a', [1], [self.https_plain]),
+                         set())
+        self.assertEqual(self.index.set_server('b', [0], [self.https_plain]),
+                         set([self.https.normalized_tuple()]))
+        self.assertFalse(self.index.is_ssl(self.https.normalized_tuple()))
+
+    def test_replace_unchanged(self):
+        self.index.set_server('a', [0], [self.https])
+        self.assertEqual(self.index.set_server('a', [0], [self.https]), set())
+        self.assertTrue(self.index.is_ssl(self.https.normalized_tuple()))
+
+    def test_remove_file(self):
+        self.index.set_server('a', [0], [self.https])
+        self.index.set_server('a', [1], [self.https])
+        self.index.set_server('b', [0], [self.http])
+        self.assertEqual(self.index.remove_file('b'), set())
+        self.assertEqual(self.index.remove_file('a'),
+                         set([self.https.normalized_tuple()]))
+        self.assertEqual(self.index.remove_file('a'), set())
+        self.assertFalse(self.index.is_ssl(self.https.normalized_tuple()))
+
+
+if __name__ == "__main__":
+    unittest.main()  # pragma: no cover
@@ -125,6 +125,7 @@ class NginxTlsSni01(common.TLSSNI01):
                     body.insert(0, bucket_directive)
                 if include_directive not in body:
                     body.insert(0, include_directive)
+                self.configurator.parser.invalidate_vhosts(root)
                 included = True
                 break
         if not included:
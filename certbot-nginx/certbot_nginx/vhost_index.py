@@ -0,0 +1,305 @@
+"""Indexes of the nginx virtual hosts by server name and address."""
+import re
+
+import six
+
+
+class VhostIndex(object):
+    """Virtual hosts found in the configuration, indexed by server name.
+
+    Lookups follow the nginx name-matching rules implemented by
+    :func:`certbot_nginx.parser.get_best_match` without comparing the
+    target name to every server name: exact names are found in a hash
+    map, wildcard names in tries of their labels (reversed for names
+    starting with a wildcard) and regex names are compiled only once.
+
+    Virtual hosts are identified by their file and path, so updating a
+    virtual host replaces the one previously indexed at its position.
+
+    """
+    def __init__(self):
+        self._vhosts = {}
+        self._names = {}
+        self._sort_keys = {}
+        self._ordered = None
+        self._keys_by_name = {}
+        self._wildcard_start = _LabelTrie()
+        self._wildcard_end = _LabelTrie()
+        self._regexes = {}
+
+    def add(self, vhost, order=0):
+        """Indexes vhost, replacing the one at the same position if any.
+
+        :param vhost: virtual host to index
+        :type vhost: :class:`~certbot_nginx.obj.VirtualHost`
+        :param int order: position of the file of vhost among the parsed
+            files, giving the order of :meth:`vhosts`
+
+        """
+        key = _key(vhost)
+        self.remove(vhost)
+        self._vhosts[key] = vhost
+        self._names[key] = tuple(vhost.names)
+        self._sort_keys[key] = (order, key[1])
+        self._ordered = None
+        for name in self._names[key]:
+            keys = self._keys_by_name.setdefault(name, set())
+            if not keys:
+                self._add_name(name)
+            keys.add(key)
+
+    def remove(self, vhost):
+        """Removes the virtual host at the position of vhost, if any.
+
+        :param vhost: virtual host to remove
+        :type vhost: :class:`~certbot_nginx.obj.VirtualHost`
+
+        """
+        key = _key(vhost)
+        if key not in self._vhosts:
+            return
+        for name in self._names.pop(key):
+            keys = self._keys_by_name[name]
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_name[name]
+                self._remove_name(name)
+        del self._vhosts[key]
+        del self._sort_keys[key]
+        self._ordered = None
+
+    def vhosts(self):
+        """Returns the indexed virtual hosts.
+
+        :returns: virtual hosts in the order of their files and of their
+            positions in the files
+        :rtype: list
+
+        """
+        if self._ordered is None:
+            self._ordered = sorted(self._vhosts, key=self._sort_keys.get)
+        return [self._vhosts[key] for key in self._ordered]
+
+    def find(self, target_name):
+        """Finds the virtual hosts with a server name matching target_name.
+
+        :param str target_name: The name to match
+
+        :returns: tuples of a virtual host, the type of its best match and
+            the name that matched as returned by
+            :func:`certbot_nginx.parser.get_best_match`, in the order of
+            :meth:`vhosts`
+        :rtype: list
+
+        """
+        # The type of each matching name, by decreasing precedence
+        types = {}
+        for name in (target_name, '.' + target_name):
+            if name in self._keys_by_name:
+                types.setdefault(name, 'exact')
+        labels = target_name.split('.')
+        for name in self._wildcard_start.find(labels[::-1]):
+            types.setdefault(name, 'wildcard_start')
+        if '*' in self._keys_by_name:
+            types.setdefault('*', 'wildcard_start')
+        for name in self._wildcard_end.find(labels):
+            types.setdefault(name, 'wildcard_end')
+        for name, regex in six.iteritems(self._regexes):
+            if regex.match(target_name):
+                types.setdefault(name, 'regex')
+
+        keys = set()
+        for name in types:
+            keys.update(self._keys_by_name[name])
+        matches = []
+        for key in sorted(keys, key=self._sort_keys.get):
+            by_type = dict((name_type, []) for name_type in _NAME_TYPES)
+            for name in self._names[key]:
+                if name in types:
+                    by_type[types[name]].append(name)
+            name_type, name = select_best_match(*[
+                by_type[name_type] for name_type in _NAME_TYPES])
+            matches.append((self._vhosts[key], name_type, name))
+        return matches
+
+    def _add_name(self, name):
+        first, _, rest = name.partition('.')
+        if first in ('*', '') and name != '*':
+            self._wildcard_start.add(rest.split('.')[::-1], name)
+        rest, _, last = name.rpartition('.')
+        if last in ('*', '') and name != '*':
+            self._wildcard_end.add(rest.split('.'), name)
+        if len(name) >= 2 and name[0] == '~':
+            # After tilde is a perl-compatible regex
+            try:
+                self._regexes[name] = re.compile(name[1:])
+            except re.error:  # pragma: no cover
+                # perl-compatible regexes are sometimes not recognized by python
+                pass
+
+    def _remove_name(self, name):
+        first, _, rest = name.partition('.')
+        if first in ('*', '') and name != '*':
+            self._wildcard_start.remove(rest.split('.')[::-1], name)
+        rest, _, last = name.rpartition('.')
+        if last in ('*', '') and name != '*':
+            self._wildcard_end.remove(rest.split('.'), name)
+        self._regexes.pop(name, None)
+
+
+class AddrSslIndex(object):
+    """Whether each address listens with ssl in any server block.
+
+    The addresses of each server block are recorded by file and path, so
+    that the server blocks of a modified file or a modified server block
+    are replaced without looking at the other server blocks.
+
+    """
+    def __init__(self):
+        self._servers = {}
+        self._ssl_counts = {}
+
+    def is_ssl(self, addr_tuple):
+        """Does any server block listen with ssl on the address?
+
+        :param tuple addr_tuple: normalized tuple of the address
+
+        :rtype: bool
+
+        """
+        return addr_tuple in self._ssl_counts
+
+    def set_server(self, filep, path, addrs):
+        """Records the addresses of a server block, replacing those
+        previously recorded for it.
+
+        :param str filep: file of the server block
+        :param list path: path of the server block in its file
+        :param set addrs: :class:`~certbot_nginx.obj.Addr` of the server
+            block, whose ssl attribute ignores the other server blocks
+
+        :returns: normalized tuples of the addresses whose sslishness
+            changed
+        :rtype: set
+
+        """
+        ssl_addrs = tuple(addr.normalized_tuple() for addr in addrs
+                          if addr.ssl)
+        servers = self._servers.setdefault(filep, {})
+        changed = self._remove(servers.pop(tuple(path), ()))
+        if ssl_addrs:
+            servers[tuple(path)] = ssl_addrs
+        for addr_tuple in ssl_addrs:
+            count = self._ssl_counts.get(addr_tuple, 0)
+            self._ssl_counts[addr_tuple] = count + 1
+            if not count:
+                changed.symmetric_difference_update([addr_tuple])
+        return changed
+
+    def remove_file(self, filep):
+        """Forgets the addresses of the server blocks of a file.
+
+        :param str filep: file of the server blocks
+
+        :returns: normalized tuples of the addresses whose sslishness
+            changed
+        :rtype: set
+
+        """
+        changed = set()
+        for ssl_addrs in six.itervalues(self._servers.pop(filep, {})):
+            changed.update(self._remove(ssl_addrs))
+        return changed
+
+    def _remove(self, ssl_addrs):
+        changed = set()
+        for addr_tuple in ssl_addrs:
+            self._ssl_counts[addr_tuple] -= 1
+            if not self._ssl_counts[addr_tuple]:
+                del self._ssl_counts[addr_tuple]
+                changed.add(addr_tuple)
+        return changed
+
+
+_NAME_TYPES = ('exact', 'wildcard_start', 'wildcard_end', 'regex')
+
+
+def select_best_match(exact, wildcard_start, wildcard_end, regex):
+    """Selects the best of the server names matching a target name using
+    the Nginx name-matching rules (exact > longest wildcard starting with
+    * > longest wildcard ending with * > regex).
+
+    :param list exact: names matching exactly
+    :param list wildcard_start: wildcard names starting with * matching
+    :param list wildcard_end: wildcard names ending with * matching
+    :param list regex: regex names matching
+    :returns: Tuple of (type of match, the name that matched)
+    :rtype: tuple
+
+    """
+    if len(exact) > 0:
+        # There can be more than one exact match; e.g. eff.org, .eff.org
+        match = min(exact, key=len)
+        return ('exact', match)
+    if len(wildcard_start) > 0:
+        # Return the longest wildcard
+        match = max(wildcard_start, key=len)
+        return ('wildcard_start', match)
+    if len(wildcard_end) > 0:
+        # Return the longest wildcard
+        match = max(wildcard_end, key=len)
+        return ('wildcard_end', match)
+    if len(regex) > 0:
+        # Just return the first one for now
+        match = regex[0]
+        return ('regex', match)
+
+    return (None, None)
+
+
+def _key(vhost):
+    return (vhost.filep, tuple(vhost.path))
+
+
+class _LabelTrie(object):
+    """Names stored under sequences of labels.
+
+    A name stored under labels matches a target whose labels start with
+    them and have at least one more label, which is what the wildcard
+    replaces.
+
+    """
+    def __init__(self):
+        self._root = {}
+
+    def add(self, labels, name):
+        """Stores name under labels."""
+        node = self._root
+        for label in labels:
+            node = node.setdefault(label, {})
+        node.setdefault(None, set()).add(name)
+
+    def remove(self, labels, name):
+        """Removes name from under labels."""
+        node = self._root
+        for label in labels:
+            node = node[label]
+        node[None].discard(name)
+
+    def find(self, labels):
+        """Returns the names matching a target name.
+
+        :param list labels: labels of the target name
+
+        :returns: names stored under the proper prefixes of labels
+        :rtype: list
+
+        """
+        names = []
+        node = self._root
+        for label in labels[:-1]:
+            node = node.get(label)
+            if node is None:
+                break
+            names.extend(node.get(None, ()))
+        return names
@@ -0,0 +1,80 @@
+"""Benchmark for deploying many certificates into a large nginx configuration.
+
+A configuration with many server blocks is generated and certificates
+for some of their names are deployed into it by the nginx installer,
+as when renewing many certificates at once.
+
+"""
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+import mock
+
+from certbot_nginx.tests import util
+
+import parser_benchmark
+
+
+logger = logging.getLogger(__name__)
+
+
+def main(args=None):
+    """Run the deploy benchmark."""
+    logging.basicConfig(format='%(message)s', level=logging.INFO)
+    logging.getLogger('certbot_nginx').setLevel(logging.WARNING)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--servers', type=int, default=5000,
+                        help='number of server blocks to generate')
+    parser.add_argument('--certs', type=int, default=500,
+                        help='number of certificates to deploy')
+    parsed_args = parser.parse_args(args)
+
+    logger.info('Deploying %d certificates into %d server blocks',
+                parsed_args.certs, parsed_args.servers)
+    duration = time_deploy(parsed_args.servers, parsed_args.certs)
+    logger.info('deploy: %.3fs (%.1fms per certificate)',
+                duration, 1000 * duration / parsed_args.certs)
+
+
+def time_deploy(servers, certs):
+    """Times deploying certificates into a generated configuration.
+
+    :param int servers: number of server blocks
+    :param int certs: number of certificates, each deployed into its own
+        server block
+
+    :returns: duration in seconds of choosing the server blocks of all
+        the certificates and deploying them, without saving
+    :rtype: float
+
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        config_path = os.path.join(temp_dir, 'etc_nginx')
+        os.mkdir(config_path)
+        with open(os.path.join(config_path, 'nginx.conf'), 'w') as f:
+            f.write(parser_benchmark.generate_config(servers))
+        dirs = [os.path.join(temp_dir, name) for name in ('config', 'work', 'logs')]
+        for directory in dirs:
+            os.mkdir(directory)
+        with mock.patch('certbot_nginx.configurator.NginxConfigurator.'
+                        'config_test'):
+            configurator = util.get_nginx_configurator(config_path, *dirs)
+
+        start = time.time()
+        for i in range(0, servers, max(servers // certs, 1))[:certs]:
+            path = os.path.join(temp_dir, 'site{0}'.format(i))
+            configurator.deploy_cert(
+                'site{0}.example.com'.format(i), path + '-cert.pem',
+                path + '-key.pem', path + '-chain.pem', path + '-fullchain.pem')
+        return time.time() - start
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""Benchmarks for parsing large nginx configurations.
+
+Configurations with many server blocks are generated and parsed both by
+certbot_nginx.nginxparser and by the pyparsing grammar it replaced, which
+must produce the same tree. Loading the configuration file with and
+without certbot_nginx.parse_cache is timed as well.
+
+"""
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from certbot_nginx import nginxparser
+from certbot_nginx import parse_cache
+from certbot_nginx.tests.pyparsing_nginxparser import PyparsingNginxParser
+
+
+logger = logging.getLogger(__name__)
+
+
+def main(args=None):
+    """Run the parser benchmarks."""
+    logging.basicConfig(format='%(message)s', level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--servers', type=int, default=3000,
+                        help='number of server blocks to generate')
+    parser.add_argument('--runs', type=int, default=3,
+                        help='number of times each parser is timed')
+    parsed_args = parser.parse_args(args)
+
+    source = generate_config(parsed_args.servers)
+    logger.info('Parsing %d server blocks (%d bytes)',
+                parsed_args.servers, len(source))
+    trees = {}
+    durations = {}
+    for name, parse in (('nginxparser', nginxparser.RawNginxParser),
+                        ('pyparsing', PyparsingNginxParser),):
+        durations[name] = time_parse(parse, source, parsed_args.runs)
+        trees[name] = parse(source).as_list()
+        logger.info('%s: %.3fs', name, durations[name])
+    if trees['nginxparser'] != trees['pyparsing']:
+        sys.exit('The parsers produced different trees!')
+    logger.info('nginxparser is %.1f times faster',
+                durations['pyparsing'] / durations['nginxparser'])
+    time_load(source, parsed_args.runs)
+
+
+def generate_config(servers):
+    """Generates an nginx configuration.
+
+    :param int servers: number of server blocks
+
+    :returns: configuration with an http block holding the server blocks
+    :rtype: str
+
+    """
+    lines = ['user www-data;', 'events {', '    worker_connections 1024;',
+             '}', '', 'http {', '    include mime.types;']
+    for i in range(servers):
+        lines.extend((
+            '',
+            '    # site {0}'.format(i),
+            '    server {',
+            '        listen 80;',
+            '        listen [::]:80;',
+            '        server_name site{0}.example.com www.site{0}.example.com;'
+            .format(i),
+            '        root /var/www/site{0};'.format(i),
+            '        location / {',
+            '            try_files $uri $uri/ =404;',
+            '        }',
+            '        location ~* \\.(?:gif|jpe?g|png)$ {',
+            '            add_header Cache-Control "public, max-age=3600";',
+            '        }',
+            '    }',
+        ))
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+def time_parse(parser_class, source, runs):
+    """Times the fastest of several parses of source.
+
+    :param type parser_class: class parsing source with `as_list`
+    :param str source: nginx configuration
+    :param int runs: number of times source is parsed
+
+    :returns: duration of the fastest parse in seconds
+    :rtype: float
+
+    """
+    durations = []
+    for _ in range(runs):
+        start = time.time()
+        parser_class(source).as_list()
+        durations.append(time.time() - start)
+    return min(durations)
+
+
+def time_load(source, runs):
+    """Times loading source from a file with and without a parse cache.
+
+    :param str source: nginx configuration
+    :param int runs: number of times each load is timed
+
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(temp_dir, 'nginx.conf')
+        with open(filename, 'w') as f:
+            f.write(source)
+        cache = parse_cache.ParseCache(os.path.join(temp_dir, 'cache'))
+
+        def load_uncached():  # pylint: disable=missing-docstring
+            with open(filename) as f:
+                return nginxparser.load(f)
+
+        loads = (
+            ('uncached load', load_uncached),
+            ('cached load', lambda: cache.load(filename)),
+        )
+        cache.load(filename)
+        for name, load in loads:
+            durations = []
+            for _ in range(runs):
+                start = time.time()
+                load()
+                durations.append(time.time() - start)
+            logger.info('%s: %.3fs', name, min(durations))
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
 """ACME AuthHandler."""
 import collections
+import datetime
 import logging
 import time
 
@@ -79,7 +80,7 @@ class AuthHandler(object):
                        'Pass "-v" for more info about challenges.', pause=True)
 
             # Send all Responses - this modifies achalls
-            self._respond(resp, best_effort)
+            self._respond(resp, best_effort, orderr.uri)
 
         # Just make sure all decisions are complete.
         self.verify_authzr_complete()
@@ -142,11 +143,14 @@ class AuthHandler(object):
 
         return all_achalls
 
-    def _respond(self, resp, best_effort):
+    def _respond(self, resp, best_effort, order_uri=None):
         """Send/Receive confirmation of all challenges.
 
         .. note:: This method also cleans up the auth_handler state.
 
+        :param str order_uri: URI of the order the challenges belong to,
+            used to count the polls made for it
+
         """
         # TODO: chall_update is a dirty hack to get around acme-spec #105
         chall_update = dict()
@@ -154,7 +158,7 @@ class AuthHandler(object):
 
         # Check for updated status...
         try:
-            self._poll_challenges(chall_update, best_effort)
+            self._poll_challenges(chall_update, best_effort, order_uri)
         finally:
             self._cleanup_challenges(active_achalls)
 
@@ -185,54 +189,87 @@ class AuthHandler(object):
         return active_achalls
 
     def _poll_challenges(
-            self, chall_update, best_effort, min_sleep=3, max_rounds=15):
-        """Wait for all challenge results to be determined."""
+            self, chall_update, best_effort, order_uri=None, max_rounds=15):
+        """Wait for all challenge results to be determined.
+
+        Polls are scheduled by the polling policy of the ACME client, each
+        round waiting for the latest time requested for any authorization
+        polled in the previous round.
+
+        """
+        policy = self.acme.polling_policy
         indices_to_check = set(chall_update.keys())
-        comp_indices = set()
         rounds = 0
+        next_poll = policy.next_poll(rounds)
 
         while indices_to_check and rounds < max_rounds:
-            # TODO: Use retry-after...
-            time.sleep(min_sleep)
-            all_failed_achalls = set()
-            for index in indices_to_check:
-                comp_achalls, failed_achalls = self._handle_check(
-                    index, chall_update[index])
-
-                if len(comp_achalls) == len(chall_update[index]):
-                    comp_indices.add(index)
-                elif not failed_achalls:
-                    for achall, _ in comp_achalls:
-                        chall_update[index].remove(achall)
-                # We failed some challenges... damage control
-                else:
-                    if best_effort:
-                        comp_indices.add(index)
-                        logger.warning(
-                            "Challenge failed for domain %s",
-                            self.aauthzrs[index].authzr.body.identifier.value)
-                    else:
-                        all_failed_achalls.update(
-                            updated for _, updated in failed_achalls)
-
-            if all_failed_achalls:
-                _report_failed_challs(all_failed_achalls)
-                raise errors.FailedChallenges(all_failed_achalls)
+            seconds = (next_poll - datetime.datetime.now()).total_seconds()
+            if seconds > 0:
+                time.sleep(seconds)
+            try:
+                comp_indices, responses = self._poll_round(
+                    indices_to_check, chall_update, best_effort, order_uri)
+            except errors.FailedChallenges:
+                policy.forget(order_uri)
+                raise
 
             indices_to_check -= comp_indices
-            comp_indices.clear()
             rounds += 1
+            next_poll = max(policy.next_poll(rounds, response)
+                            for response in responses)
+
+    def _poll_round(self, indices_to_check, chall_update, best_effort,
+                    order_uri):
+        """Poll each authorization that is still being checked once.
+
+        :returns: indices of the authorizations whose results are
+            determined, and the responses to the polls
+        :rtype: tuple
+
+        :raises errors.FailedChallenges: if some challenge failed and
+            ``best_effort`` is not set
+
+        """
+        comp_indices = set()
+        all_failed_achalls = set()
+        responses = []
+        for index in indices_to_check:
+            comp_achalls, failed_achalls, response = self._handle_check(
+                index, chall_update[index])
+            self.acme.polling_policy.record_poll(order_uri)
+            responses.append(response)
+
+            if len(comp_achalls) == len(chall_update[index]):
+                comp_indices.add(index)
+            elif not failed_achalls:
+                for achall, _ in comp_achalls:
+                    chall_update[index].remove(achall)
+            # We failed some challenges... damage control
+            else:
+                if best_effort:
+                    comp_indices.add(index)
+                    logger.warning(
+                        "Challenge failed for domain %s",
+                        self.aauthzrs[index].authzr.body.identifier.value)
+                else:
+                    all_failed_achalls.update(
+                        updated for _, updated in failed_achalls)
+
+        if all_failed_achalls:
+            _report_failed_challs(all_failed_achalls)
+            raise errors.FailedChallenges(all_failed_achalls)
+        return comp_indices, responses
 
     def _handle_check(self, index, achalls):
-        """Returns tuple of ('completed', 'failed')."""
+        """Returns tuple of ('completed', 'failed', 'response')."""
         completed = []
         failed = []
 
         original_aauthzr = self.aauthzrs[index]
-        updated_authzr, _ = self.acme.poll(original_aauthzr.authzr)
+        updated_authzr, response = self.acme.poll(original_aauthzr.authzr)
         self.aauthzrs[index] = AnnotatedAuthzr(updated_authzr, original_aauthzr.achalls)
         if updated_authzr.body.status == messages.STATUS_VALID:
-            return achalls, []
+            return achalls, [], response
 
         # Note: if the whole authorization is invalid, the individual failed
         #     challenges will be determined here...
@@ -246,7 +283,7 @@ class AuthHandler(object):
             elif updated_achall.status == messages.STATUS_INVALID:
                 failed.append((achall, updated_achall))
 
-        return completed, failed
+        return completed, failed, response
 
     def _find_updated_challb(self, authzr, achall):  # pylint: disable=no-self-use
         """Find updated challenge body within Authorization Resource.
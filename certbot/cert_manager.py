@@ -245,29 +245,44 @@ def match_and_check_overlaps(cli_config, acceptable_matches, match_func, rv_func
     else:
         return matched
 
-def human_readable_cert_info(config, cert, skip_filter_checks=False):
-    """ Returns a human readable description of info about a RenewableCert object"""
-    certinfo = []
-    checker = ocsp.RevocationChecker()
-
+def _matches_filters(config, cert, skip_filter_checks=False):
+    """Is cert selected by the --cert-name and --domains of config?"""
     if config.certname and cert.lineagename != config.certname and not skip_filter_checks:
-        return ""
+        return False
     if config.domains and not set(config.domains).issubset(cert.names()):
+        return False
+    return True
+
+def human_readable_cert_info(config, cert, skip_filter_checks=False, revoked=None):
+    """ Returns a human readable description of info about a RenewableCert object
+
+    :param bool revoked: the revocation status of cert if it is already
+        known, otherwise it is checked
+
+    """
+    certinfo = []
+
+    if not _matches_filters(config, cert, skip_filter_checks):
         return ""
+    names = cert.names()
+    if revoked is None:
+        revoked = ocsp.RevocationChecker.from_config(config).ocsp_revoked(
+            cert.cert, cert.chain)
     now = pytz.UTC.fromutc(datetime.datetime.utcnow())
+    expiry = cert.target_expiry
 
     reasons = []
     if cert.is_test_cert:
         reasons.append('TEST_CERT')
-    if cert.target_expiry <= now:
+    if expiry <= now:
         reasons.append('EXPIRED')
-    if checker.ocsp_revoked(cert.cert, cert.chain):
+    if revoked:
         reasons.append('REVOKED')
 
     if reasons:
         status = "INVALID: " + ", ".join(reasons)
     else:
-        diff = cert.target_expiry - now
+        diff = expiry - now
         if diff.days == 1:
             status = "VALID: 1 day"
         elif diff.days < 1:
@@ -275,14 +290,14 @@ def human_readable_cert_info(config, cert, skip_filter_checks=False):
         else:
             status = "VALID: {0} days".format(diff.days)
 
-    valid_string = "{0} ({1})".format(cert.target_expiry, status)
+    valid_string = "{0} ({1})".format(expiry, status)
     certinfo.append("  Certificate Name: {0}\n"
                     "    Domains: {1}\n"
                     "    Expiry Date: {2}\n"
                     "    Certificate Path: {3}\n"
                     "    Private Key Path: {4}".format(
                          cert.lineagename,
-                         " ".join(cert.names()),
+                         " ".join(names),
                          valid_string,
                          cert.fullchain,
                          cert.privkey))
@@ -327,9 +342,15 @@ def _report_lines(msgs):
 
 def _report_human_readable(config, parsed_certs):
     """Format a results report for a parsed cert"""
+    # Check the revocation status of all reported certs at once
+    reported = [cert for cert in parsed_certs if _matches_filters(config, cert)]
+    statuses = ocsp.RevocationChecker.from_config(config).ocsp_revoked_all(
+        (cert.cert, cert.chain) for cert in reported)
+    revoked = dict(zip((cert.lineagename for cert in reported), statuses))
     certinfo = []
     for cert in parsed_certs:
-        certinfo.append(human_readable_cert_info(config, cert))
+        certinfo.append(human_readable_cert_info(
+            config, cert, revoked=revoked.get(cert.lineagename, False)))
     return "\n".join(certinfo)
 
 def _describe_certs(config, parsed_certs, parse_failures):
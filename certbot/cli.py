@@ -24,6 +24,7 @@ from certbot import crypto_util
 from certbot import errors
 from certbot import hooks
 from certbot import interfaces
+from certbot import startup_profile
 from certbot import util
 
 from certbot.display import util as display_util
@@ -125,6 +126,14 @@ ZERO_ARG_ACTIONS = set(("store_const", "store_true",
                         "store_false", "append_const", "count",))
 
 
+# Subcommands that never use plugins or their options. Their parsers only
+# get the options of every plugin if one of them is set on the command line
+# or in a configuration file, which saves importing every plugin. Commands
+# talking to the ACME server are not included as the user agent mentions
+# the manual plugin's hooks.
+PLUGINLESS_VERBS = set(("certificates", "delete", "update_symlinks",))
+
+
 # Maps a config option to a set of config options that may have modified it.
 # This dictionary is used recursively, so if A modifies B and B modifies C,
 # it is determined that C was modified by the user if A was modified.
@@ -197,30 +206,46 @@ def set_by_cli(var):
     """
     detector = set_by_cli.detector
     if detector is None:
-        # Setup on first run: `detector` is a weird version of config in which
-        # the default value of every attribute is wrangled to be boolean-false
-        plugins = plugins_disco.PluginsRegistry.find_all()
-        # reconstructed_args == sys.argv[1:], or whatever was passed to main()
-        reconstructed_args = helpful_parser.args + [helpful_parser.verb]
-        detector = set_by_cli.detector = prepare_and_parse_args(
-            plugins, reconstructed_args, detect_defaults=True)
-        # propagate plugin requests: eg --standalone modifies config.authenticator
-        detector.authenticator, detector.installer = (
-            plugin_selection.cli_plugin_requests(detector))
+        # Setup on first run; afterwards, this is a set lookup
+        detector = set_by_cli.detector = _vars_set_by_user()
+    return var in detector
+# static housekeeping var: names of the variables set by the user
+set_by_cli.detector = None  # type: ignore
 
-    if not isinstance(getattr(detector, var), _Default):
-        logger.debug("Var %s=%s (set by user).", var, getattr(detector, var))
-        return True
 
-    for modifier in VAR_MODIFIERS.get(var, []):
-        if set_by_cli(modifier):
-            logger.debug("Var %s=%s (set by user).",
-                var, VAR_MODIFIERS.get(var, []))
-            return True
+def _vars_set_by_user():
+    """Determines which config variables have been set by the user.
 
-    return False
-# static housekeeping var
-set_by_cli.detector = None  # type: ignore
+    :returns: names of the variables set on the command line or in a
+        config file, plus those modified by them according to
+        `VAR_MODIFIERS`
+    :rtype: frozenset
+
+    """
+    # `detector` is a weird version of config in which the default
+    # value of every attribute is wrangled to be boolean-false
+    plugins = plugins_disco.PluginsRegistry.find_all()
+    # reconstructed_args == sys.argv[1:], or whatever was passed to main()
+    reconstructed_args = helpful_parser.args + [helpful_parser.verb]
+    with startup_profile.phase("default detection (total)"):
+        detector = prepare_and_parse_args(
+            plugins, reconstructed_args, detect_defaults=True)
+    # propagate plugin requests: eg --standalone modifies config.authenticator
+    detector.authenticator, detector.installer = (
+        plugin_selection.cli_plugin_requests(detector))
+
+    user_set = set(var for var, value in six.iteritems(vars(detector))
+                   if not isinstance(value, _Default))
+    # VAR_MODIFIERS is applied recursively, so repeat until nothing changes
+    changed = True
+    while changed:
+        changed = False
+        for var, modifiers in six.iteritems(VAR_MODIFIERS):
+            if var not in user_set and not user_set.isdisjoint(modifiers):
+                user_set.add(var)
+                changed = True
+    logger.debug("Vars set by user: %s", ", ".join(sorted(user_set)))
+    return frozenset(user_set)
 
 
 def has_default_value(option, value):
@@ -254,11 +279,7 @@ def option_was_set(option, value):
 
 def argparse_type(variable):
     "Return our argparse type function for a config variable (default: str)"
-    # pylint: disable=protected-access
-    for action in helpful_parser.parser._actions:
-        if action.type is not None and action.dest == variable:
-            return action.type
-    return str
+    return helpful_parser.argparse_types().get(variable, str)
 
 def read_file(filename, mode="rb"):
     """Returns the given file's contents.
@@ -431,7 +452,8 @@ class HelpfulArgumentParser(object):
     """
 
 
-    def __init__(self, args, plugins, detect_defaults=False):
+    def __init__(self, args, plugins, detect_defaults=False,
+                 scope_to_verb=False):
         from certbot import main
         self.VERBS = {
             "auth": main.certonly,
@@ -483,9 +505,14 @@ class HelpfulArgumentParser(object):
 
         short_usage = self._usage_string(plugins, self.help_arg)
 
+        # --version exits before plugin options could matter
+        self.plugin_options_skipped = scope_to_verb and not self.help_arg and (
+            self.verb in PLUGINLESS_VERBS or "--version" in self.args)
+
         self.visible_topics = self.determine_help_topics(self.help_arg)
         self.groups = {}       # elements are added by .add_group()
         self.defaults = {}     # elements are added by .parse_args()
+        self._types = None     # computed by .argparse_types()
 
         self.parser = configargparse.ArgParser(
             prog="certbot",
@@ -608,6 +635,35 @@ class HelpfulArgumentParser(object):
 
         return parsed_args
 
+    def argparse_types(self):
+        """Returns the type functions of the arguments.
+
+        :returns: the type function of the first argument of each
+            destination that has one
+        :rtype: dict
+
+        """
+        if self._types is None:
+            # pylint: disable=protected-access
+            self._types = dict(
+                (action.dest, action.type)
+                for action in reversed(self.parser._actions)
+                if action.type is not None)
+        return self._types
+
+    def plugin_options_needed(self):
+        """Were plugin options skipped even though the user set some?
+
+        :returns: True if the arguments have to be parsed again by a
+            parser knowing the options of every plugin
+        :rtype: bool
+
+        """
+        if not self.plugin_options_skipped:
+            return False
+        _, unknown_args = self.parser.parse_known_args(self.args)
+        return bool(unknown_args)
+
     def set_test_server(self, parsed_args):
         """We have --staging/--dry-run; perform sanity check and set config.server"""
 
@@ -807,10 +863,15 @@ class HelpfulArgumentParser(object):
         may or may not be displayed as help topics.
 
         """
+        if self.plugin_options_skipped:
+            return
         for name, plugin_ep in six.iteritems(plugins):
-            parser_or_group = self.add_group(name,
-                                             description=plugin_ep.long_description)
-            plugin_ep.plugin_cls.inject_parser_options(parser_or_group, name)
+            if not plugin_ep.is_factory:
+                continue
+            with startup_profile.phase("plugin options: " + name):
+                parser_or_group = self.add_group(
+                    name, description=plugin_ep.long_description)
+                plugin_ep.plugin_cls.inject_parser_options(parser_or_group, name)
 
     def determine_help_topics(self, chosen_topic):
         """
@@ -850,20 +911,64 @@ def _add_all_groups(helpful):
         helpful.add_group(name, description=docs["opts"])
 
 
-def prepare_and_parse_args(plugins, args, detect_defaults=False):  # pylint: disable=too-many-statements
+def prepare_and_parse_args(plugins, args, detect_defaults=False):
     """Returns parsed command line arguments.
 
+    The options of plugins are only added to the parser when the
+    subcommand may use them, see `PLUGINLESS_VERBS`.
+
     :param .PluginsRegistry plugins: available plugins
     :param list args: command line arguments with the program name removed
 
     :returns: parsed command line arguments
     :rtype: argparse.Namespace
 
+    """
+    helpful = _prepare_parser(plugins, args, detect_defaults)
+    if not detect_defaults:
+        global helpful_parser # pylint: disable=global-statement
+        helpful_parser = helpful
+    with startup_profile.phase("argument parsing"):
+        return helpful.parse_args()
+
+
+def _prepare_parser(plugins, args, detect_defaults):
+    """Builds the smallest parser able to parse args.
+
+    :param .PluginsRegistry plugins: available plugins
+    :param list args: command line arguments with the program name removed
+    :param bool detect_defaults: whether the parser detects defaults
+
+    :returns: parser ready to parse args
+    :rtype: HelpfulArgumentParser
+
+    """
+    helpful = _build_parser(plugins, list(args), detect_defaults,
+                            scope_to_verb=True)
+    if helpful.plugin_options_needed():
+        helpful = _build_parser(plugins, list(args), detect_defaults)
+    return helpful
+
+
+def _build_parser(plugins, args, detect_defaults, scope_to_verb=False):  # pylint: disable=too-many-statements
+    """Adds every option to a new parser.
+
+    :param .PluginsRegistry plugins: available plugins
+    :param list args: command line arguments with the program name
+        removed, which are modified to leave out the subcommand
+    :param bool detect_defaults: whether the parser detects defaults
+    :param bool scope_to_verb: whether options of plugins are left out
+        if the subcommand does not use plugins
+
+    :returns: parser ready to parse args
+    :rtype: HelpfulArgumentParser
+
     """
 
     # pylint: disable=too-many-statements
 
-    helpful = HelpfulArgumentParser(args, plugins, detect_defaults)
+    helpful = HelpfulArgumentParser(args, plugins, detect_defaults,
+                                    scope_to_verb)
     _add_all_groups(helpful)
 
     # --help is automatically provided by argparse
@@ -978,6 +1083,13 @@ def prepare_and_parse_args(plugins, args, detect_defaults=False):  # pylint: dis
         "automation", "--version", action="version",
         version="%(prog)s {0}".format(certbot.__version__),
         help="show program's version number and exit")
+    helpful.add(
+        "testing", startup_profile.FLAG, action="store_true",
+        default=flag_default("profile_startup"),
+        help="When Certbot exits, report how long importing its modules and"
+        " parsing the command line took. Imports are timed in a new Python"
+        " process so they are measured cold. Only recognized on the"
+        " command line, not in configuration files.")
     helpful.add(
         ["automation", "renew"],
         "--force-renewal", "--renew-by-default", dest="renew_by_default",
@@ -1080,6 +1192,24 @@ def prepare_and_parse_args(plugins, args, detect_defaults=False):  # pylint: dis
     helpful.add(
         "security", "--rsa-key-size", type=int, metavar="N",
         default=flag_default("rsa_key_size"), help=config_help("rsa_key_size"))
+    helpful.add(
+        "security", "--key-type", choices=["rsa", "ecdsa"],
+        default=flag_default("key_type"), help=config_help("key_type"))
+    helpful.add(
+        "security", "--elliptic-curve", choices=constants.ELLIPTIC_CURVES,
+        default=flag_default("elliptic_curve"),
+        help=config_help("elliptic_curve"))
+    helpful.add(
+        "security", "--key-pool-size", type=nonnegative_int, metavar="N",
+        default=flag_default("key_pool_size"),
+        help="Keep N private keys of each size generated ahead of time in"
+        " the background, so new certificates do not wait for their key to"
+        " be generated. The keys are kept in the configuration directory,"
+        " readable only by their owner, and encrypted with a passphrase"
+        " kept in the work directory, so the pooled keys are only usable"
+        " together with both directories. The pool is not used by dry"
+        " runs. 0 disables the pool."
+        " (default: %(default)s)")
     helpful.add(
         "security", "--must-staple", action="store_true",
         dest="must_staple", default=flag_default("must_staple"),
@@ -1135,6 +1265,18 @@ def prepare_and_parse_args(plugins, args, detect_defaults=False):  # pylint: dis
              'ACME Challenges are versioned, but if you pick "http" rather '
              'than "http-01", Certbot will select the latest version '
              'automatically.')
+    helpful.add(
+        "renew", "--parallel-renewals", type=nonnegative_int, metavar="N",
+        default=flag_default("parallel_renewals"),
+        help="Process up to N lineages at once when renewing. Each lineage"
+        " is still renewed with its own configuration and pre- and"
+        " post-hooks are still run only once. Challenges of DNS plugins"
+        " run concurrently, but challenges of other authenticators are"
+        " performed for one lineage using that authenticator at a time,"
+        " and installers, which share the server configuration, are"
+        " prepared and used as authenticators for one lineage at a time."
+        " Values of 0 and 1 process lineages one at a time."
+        " (default: %(default)s)")
     helpful.add(
         "renew", "--pre-hook",
         help="Command to be run in a shell before obtaining any certificates."
@@ -1188,12 +1330,10 @@ def prepare_and_parse_args(plugins, args, detect_defaults=False):  # pylint: dis
     _paths_parser(helpful)
     # _plugins_parsing should be the last thing to act upon the main
     # parser (--help should display plugin-specific options last)
-    _plugins_parsing(helpful, plugins)
+    with startup_profile.phase("plugin options (total)"):
+        _plugins_parsing(helpful, plugins)
 
-    if not detect_defaults:
-        global helpful_parser # pylint: disable=global-statement
-        helpful_parser = helpful
-    return helpful.parse_args()
+    return helpful
 
 
 def _create_subparsers(helpful):
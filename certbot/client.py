@@ -26,6 +26,7 @@ from certbot import eff
 from certbot import error_handler
 from certbot import errors
 from certbot import interfaces
+from certbot import key_pool
 from certbot import reverter
 from certbot import storage
 from certbot import util
@@ -280,14 +281,21 @@ class Client(object):
         """
         # Create CSR from names
         if self.config.dry_run:
-            key = util.Key(file=None,
-                           pem=crypto_util.make_key(self.config.rsa_key_size))
+            # Pooled keys are kept for real certificates
+            key = util.Key(file=None, pem=crypto_util.make_key(
+                self.config.rsa_key_size, self.config.key_type,
+                self.config.elliptic_curve))
             csr = util.CSR(file=None, form="pem",
                            data=acme_crypto_util.make_csr(
                                key.pem, domains, self.config.must_staple))
         else:
+            # Only RSA keys are slow enough to generate to be worth pooling
+            pool = (key_pool.get(self.config)
+                    if self.config.key_type == "rsa" else None)
             key = crypto_util.init_save_key(
-                self.config.rsa_key_size, self.config.key_dir)
+                self.config.rsa_key_size, self.config.key_dir, key_pool=pool,
+                key_type=self.config.key_type,
+                elliptic_curve=self.config.elliptic_curve)
             csr = crypto_util.init_save_csr(key, domains, self.config.csr_dir)
 
         orderr = self._get_order_and_authorizations(csr.data, self.config.allow_subset_of_names)
@@ -2,6 +2,7 @@
 import copy
 import os
 
+import six
 from six.moves.urllib import parse  # pylint: disable=import-error
 import zope.interface
 
@@ -89,6 +90,23 @@ class NamespaceConfig(object):
         return os.path.join(
             self.namespace.work_dir, constants.TEMP_CHECKPOINT_DIR)
 
+    def overlay(self):
+        """Returns a copy-on-write copy of this configuration.
+
+        Values set on the copy are stored in a layer of its own, leaving
+        this configuration untouched, while other values are read from
+        this configuration. This is much cheaper than a deep copy when
+        only a few values are changed, e.g. when restoring the renewal
+        parameters of a lineage.
+
+        :returns: layered configuration
+        :rtype: NamespaceConfig
+
+        """
+        config = object.__new__(type(self))
+        object.__setattr__(config, 'namespace', _NamespaceLayer(self.namespace))
+        return config
+
     def __deepcopy__(self, _memo):
         # Work around https://bugs.python.org/issue1515 for py26 tests :( :(
         # https://travis-ci.org/letsencrypt/letsencrypt/jobs/106900743#L3276
@@ -133,6 +151,49 @@ class NamespaceConfig(object):
                             constants.RENEWAL_POST_HOOKS_DIR)
 
 
+class _NamespaceLayer(object):
+    """Namespace holding changes made on top of another namespace.
+
+    Attributes that were not set on the layer are read from the base
+    namespace. Lists, dicts and sets are copied into the layer the first
+    time they are read, so changing them in place does not affect the
+    base namespace either.
+
+    """
+    _MUTABLE_TYPES = (dict, list, set,)
+
+    def __init__(self, base):
+        self._base = base
+
+    def __getattr__(self, name):
+        # Only called for attributes missing from the layer
+        if name.startswith('__') or name == '_base':
+            raise AttributeError(name)
+        value = getattr(self._base, name)
+        if isinstance(value, self._MUTABLE_TYPES):
+            value = copy.deepcopy(value)
+            setattr(self, name, value)
+        return value
+
+
+def namespace_vars(namespace):
+    """Returns the attributes of namespace, like `vars`.
+
+    :param namespace: namespace of a `NamespaceConfig`, possibly layered
+        by `NamespaceConfig.overlay`
+
+    :returns: attribute names mapped to their values
+    :rtype: dict
+
+    """
+    if not isinstance(namespace, _NamespaceLayer):
+        return vars(namespace)
+    values = dict(namespace_vars(namespace._base))  # pylint: disable=protected-access
+    values.update((name, value) for name, value in six.iteritems(vars(namespace))
+                  if name != '_base')
+    return values
+
+
 def check_config_sanity(config):
     """Validate command line options and display error message if
     requirements are not met.
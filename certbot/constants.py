@@ -55,6 +55,8 @@ CLI_DEFAULTS = dict(
     http01_address="",
     break_my_certs=False,
     rsa_key_size=2048,
+    key_type="rsa",
+    elliptic_curve="secp256r1",
     must_staple=False,
     redirect=None,
     hsts=None,
@@ -64,6 +66,9 @@ CLI_DEFAULTS = dict(
     pref_challs=[],
     validate_hooks=True,
     directory_hooks=True,
+    parallel_renewals=1,
+    key_pool_size=0,
+    profile_startup=False,
 
     # Subparsers
     num=None,
@@ -169,15 +174,35 @@ IN_PROGRESS_DIR = "IN_PROGRESS"
 KEY_DIR = "keys"
 """Directory (relative to `IConfig.config_dir`) where keys are saved."""
 
+ELLIPTIC_CURVES = ["secp256r1", "secp384r1", "secp521r1"]
+"""Elliptic curves that can be used for ECDSA keys."""
+
+KEY_POOL_DIR = "key-pool"
+"""Directory (relative to `IConfig.config_dir`) where pre-generated keys
+are kept."""
+
+KEY_POOL_PASSPHRASE = "key-pool-passphrase"
+"""File (relative to `IConfig.work_dir`) holding the passphrase encrypting
+the keys of the key pool."""
+
 LIVE_DIR = "live"
 """Live directory, relative to `IConfig.config_dir`."""
 
 TEMP_CHECKPOINT_DIR = "temp_checkpoint"
 """Temporary checkpoint directory (relative to `IConfig.work_dir`)."""
 
+DNS_ZONE_CACHE = "dns-zone-cache.json"
+"""Cache of DNS zone lookups (relative to `IConfig.work_dir`)."""
+
+OCSP_CACHE_DIR = "ocsp"
+"""Cache of OCSP responses (relative to `IConfig.work_dir`)."""
+
 RENEWAL_CONFIGS_DIR = "renewal"
 """Renewal configs directory, relative to `IConfig.config_dir`."""
 
+RENEWAL_INDEX = "renewal-index.json"
+"""Index of previously examined lineages, relative to `IConfig.config_dir`."""
+
 RENEWAL_HOOKS_DIR = "renewal-hooks"
 """Basename of directory containing hooks to run with the renew command."""
 
@@ -4,6 +4,7 @@
     is capable of handling the signatures.
 
 """
+import collections
 import hashlib
 import logging
 import os
@@ -13,10 +14,13 @@ import pyrfc3339
 import six
 import zope.component
 from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography import x509
 
 from acme import crypto_util as acme_crypto_util
 
+from certbot import constants
 from certbot import errors
 from certbot import interfaces
 from certbot import util
@@ -24,9 +28,14 @@ from certbot import util
 
 logger = logging.getLogger(__name__)
 
+CertInfo = collections.namedtuple(
+    "CertInfo", "names not_before not_after serial fingerprint")
+"""Facts parsed from a certificate by :func:`get_cert_info`."""
+
 
 # High level functions
-def init_save_key(key_size, key_dir, keyname="key-certbot.pem"):
+def init_save_key(key_size, key_dir, keyname="key-certbot.pem", key_pool=None,
+                  key_type="rsa", elliptic_curve="secp256r1"):
     """Initializes and saves a privkey.
 
     Inits key and saves it in PEM format on the filesystem.
@@ -37,6 +46,10 @@ def init_save_key(key_size, key_dir, keyname="key-certbot.pem"):
     :param int key_size: RSA key size in bits
     :param str key_dir: Key save directory.
     :param str keyname: Filename of key
+    :param key_pool: Pool to take RSA keys from instead of generating them
+    :type key_pool: `certbot.key_pool.KeyPool` or None
+    :param str key_type: "rsa" or "ecdsa"
+    :param str elliptic_curve: Name of the curve of an ECDSA key
 
     :returns: Key
     :rtype: :class:`certbot.util.Key`
@@ -45,7 +58,10 @@ def init_save_key(key_size, key_dir, keyname="key-certbot.pem"):
 
     """
     try:
-        key_pem = make_key(key_size)
+        if key_pool is None or key_type != "rsa":
+            key_pem = make_key(key_size, key_type, elliptic_curve)
+        else:
+            key_pem = key_pool.take(key_size)
     except ValueError as err:
         logger.exception(err)
         raise err
@@ -58,7 +74,10 @@ def init_save_key(key_size, key_dir, keyname="key-certbot.pem"):
         os.path.join(key_dir, keyname), 0o600, "wb")
     with key_f:
         key_f.write(key_pem)
-    logger.debug("Generating key (%d bits): %s", key_size, key_path)
+    if key_type == "rsa":
+        logger.debug("Generating key (%d bits): %s", key_size, key_path)
+    else:
+        logger.debug("Generating key (%s): %s", elliptic_curve, key_path)
 
     return util.Key(key_path, key_pem)
 
@@ -168,23 +187,41 @@ def import_csr_file(csrfile, data):
     return PEM, util.CSR(file=csrfile, data=data_pem, form="pem"), domains
 
 
-def make_key(bits):
-    """Generate PEM encoded RSA key.
+def make_key(bits, key_type="rsa", elliptic_curve="secp256r1"):
+    """Generate PEM encoded RSA or ECDSA key.
 
-    :param int bits: Number of bits, at least 1024.
+    :param int bits: Number of bits of an RSA key, at least 1024.
+    :param str key_type: "rsa" or "ecdsa"
+    :param str elliptic_curve: Name of the curve of an ECDSA key, one
+        of `certbot.constants.ELLIPTIC_CURVES`
 
-    :returns: new RSA key in PEM form with specified number of bits
+    :returns: new key in PEM form
     :rtype: str
 
+    :raises errors.Error: If key_type or elliptic_curve is not supported.
+
     """
-    assert bits >= 1024  # XXX
-    key = OpenSSL.crypto.PKey()
-    key.generate_key(OpenSSL.crypto.TYPE_RSA, bits)
-    return OpenSSL.crypto.dump_privatekey(OpenSSL.crypto.FILETYPE_PEM, key)
+    if key_type == "rsa":
+        assert bits >= 1024  # XXX
+        key = OpenSSL.crypto.PKey()
+        key.generate_key(OpenSSL.crypto.TYPE_RSA, bits)
+        return OpenSSL.crypto.dump_privatekey(OpenSSL.crypto.FILETYPE_PEM, key)
+    elif key_type == "ecdsa":
+        if elliptic_curve not in constants.ELLIPTIC_CURVES:
+            raise errors.Error(
+                "Unsupported elliptic curve: {0}".format(elliptic_curve))
+        curve = getattr(ec, elliptic_curve.upper())
+        key = ec.generate_private_key(curve(), default_backend())
+        return key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.TraditionalOpenSSL,
+            encryption_algorithm=serialization.NoEncryption())
+    else:
+        raise errors.Error("Unsupported key type: {0}".format(key_type))
 
 
 def valid_privkey(privkey):
-    """Is valid RSA private key?
+    """Is valid RSA or ECDSA private key?
 
     :param str privkey: Private key file contents in PEM
 
@@ -193,9 +230,14 @@ def valid_privkey(privkey):
 
     """
     try:
-        return OpenSSL.crypto.load_privatekey(
-            OpenSSL.crypto.FILETYPE_PEM, privkey).check()
-    except (TypeError, OpenSSL.crypto.Error):
+        key = OpenSSL.crypto.load_privatekey(
+            OpenSSL.crypto.FILETYPE_PEM, privkey)
+        if key.type() == OpenSSL.crypto.TYPE_RSA:
+            return key.check()
+        # The public point of EC keys is checked to be on their curve
+        return isinstance(serialization.load_pem_private_key(
+            privkey, None, default_backend()), ec.EllipticCurvePrivateKey)
+    except (TypeError, ValueError, OpenSSL.crypto.Error):
         return False
 
 
@@ -408,8 +450,18 @@ def _notAfterBefore(cert_path, method):
     with open(cert_path) as f:
         x509 = OpenSSL.crypto.load_certificate(OpenSSL.crypto.FILETYPE_PEM,
                                                f.read())
+    return _parse_asn1_time(method(x509))
+
+
+def _parse_asn1_time(timestamp):
+    """Converts a timestamp returned by pyOpenSSL to a datetime.
+
+    :param bytes timestamp: ASN.1 GENERALIZEDTIME timestamp
+
+    :rtype: :class:`datetime.datetime`
+
+    """
     # pyopenssl always returns bytes
-    timestamp = method(x509)
     reformatted_timestamp = [timestamp[0:4], b"-", timestamp[4:6], b"-",
                              timestamp[6:8], b"T", timestamp[8:10], b":",
                              timestamp[10:12], b":", timestamp[12:]]
@@ -421,6 +473,29 @@ def _notAfterBefore(cert_path, method):
     return pyrfc3339.parse(timestamp_str)
 
 
+def get_cert_info(cert_path):
+    """Parses the facts used to manage the cert at cert_path.
+
+    This loads the certificate once rather than once per fact as
+    :func:`get_names_from_cert`, :func:`notBefore` and :func:`notAfter` do.
+
+    :param str cert_path: path to a cert in PEM format
+
+    :returns: the names, notBefore, notAfter, serial number and SHA-256
+        fingerprint, in hexadecimal, of the cert at cert_path
+    :rtype: `CertInfo`
+
+    """
+    with open(cert_path) as f:
+        cert = _load_cert_or_req(f.read(), OpenSSL.crypto.load_certificate)
+    return CertInfo(
+        names=_get_names_from_loaded_cert_or_req(cert),
+        not_before=_parse_asn1_time(cert.get_notBefore()),
+        not_after=_parse_asn1_time(cert.get_notAfter()),
+        serial=cert.get_serial_number(),
+        fingerprint=cert.digest("sha256").decode("ascii").replace(":", "").lower())
+
+
 def sha256sum(filename):
     """Compute a sha256sum of a file.
 
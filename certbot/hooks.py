@@ -3,6 +3,7 @@ from __future__ import print_function
 
 import logging
 import os
+import threading
 
 from subprocess import Popen, PIPE
 
@@ -13,6 +14,10 @@ from certbot.plugins import util as plug_util
 
 logger = logging.getLogger(__name__)
 
+# Serializes hook bookkeeping and the environment variables set for
+# deploy-hooks when lineages are renewed concurrently
+_hook_lock = threading.RLock()
+
 
 def validate_hooks(config):
     """Check hook commands are executable."""
@@ -88,12 +93,13 @@ def _run_pre_hook_if_necessary(command):
     :param str command: pre-hook to be run
 
     """
-    if command in pre_hook.already:
-        logger.info("Pre-hook command already run, skipping: %s", command)
-    else:
-        logger.info("Running pre-hook command: %s", command)
-        _run_hook(command)
-        pre_hook.already.add(command)
+    with _hook_lock:
+        if command in pre_hook.already:
+            logger.info("Pre-hook command already run, skipping: %s", command)
+        else:
+            logger.info("Running pre-hook command: %s", command)
+            _run_hook(command)
+            pre_hook.already.add(command)
 
 
 def post_hook(config):
@@ -139,8 +145,9 @@ def _run_eventually(command):
     :param str command: post-hook to register to be run
 
     """
-    if command not in post_hook.eventually:
-        post_hook.eventually.append(command)
+    with _hook_lock:
+        if command not in post_hook.eventually:
+            post_hook.eventually.append(command)
 
 
 def run_saved_post_hooks():
@@ -215,10 +222,11 @@ def _run_deploy_hook(command, domains, lineage_path, dry_run):
                        command)
         return
 
-    os.environ["RENEWED_DOMAINS"] = " ".join(domains)
-    os.environ["RENEWED_LINEAGE"] = lineage_path
-    logger.info("Running deploy-hook command: %s", command)
-    _run_hook(command)
+    with _hook_lock:
+        os.environ["RENEWED_DOMAINS"] = " ".join(domains)
+        os.environ["RENEWED_LINEAGE"] = lineage_path
+        logger.info("Running deploy-hook command: %s", command)
+        _run_hook(command)
 
 
 def _run_hook(shell_cmd):
@@ -203,6 +203,10 @@ class IConfig(zope.interface.Interface):
     email = zope.interface.Attribute(
         "Email used for registration and recovery contact. (default: Ask)")
     rsa_key_size = zope.interface.Attribute("Size of the RSA key.")
+    key_type = zope.interface.Attribute(
+        "Type of the private key, either rsa or ecdsa.")
+    elliptic_curve = zope.interface.Attribute(
+        "Elliptic curve of the private key when --key-type is ecdsa.")
     must_staple = zope.interface.Attribute(
         "Adds the OCSP Must Staple extension to the certificate. "
         "Autoconfigures OCSP Stapling for supported setups "
@@ -0,0 +1,212 @@
+"""Pool of private keys generated ahead of time."""
+import binascii
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import uuid
+
+from multiprocessing.pool import ThreadPool
+
+import OpenSSL
+
+from certbot import constants
+from certbot import crypto_util
+from certbot import util
+
+logger = logging.getLogger(__name__)
+
+_CIPHER = "aes256"
+"""Cipher encrypting the keys stored in the pool."""
+
+_POOLS = {}
+"""Maps the directory of each pool to the pool used in this process."""
+
+_POOLS_LOCK = threading.Lock()
+
+
+def get(config):
+    """Returns the key pool of config, if it is enabled.
+
+    The pool is shared by everything using the same configuration
+    directory in this process and starts filling up with keys of
+    `IConfig.rsa_key_size` bits as soon as it is created.
+
+    :param certbot.interfaces.IConfig config: Configuration object
+
+    :returns: the key pool or `None` if ``--key-pool-size`` is 0
+    :rtype: `KeyPool` or None
+
+    """
+    if not config.key_pool_size:
+        return None
+    directory = os.path.join(config.config_dir, constants.KEY_POOL_DIR)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(directory)
+        if pool is None:
+            pool = _POOLS[directory] = KeyPool(
+                directory, config.key_pool_size, os.path.join(
+                    config.work_dir, constants.KEY_POOL_PASSPHRASE))
+        else:
+            pool.size = config.key_pool_size
+    pool.fill(config.rsa_key_size)
+    return pool
+
+
+class KeyPool(object):
+    """Keys generated in background threads, ready for new certificates.
+
+    Each key is kept in its own file in a subdirectory named after the
+    key size, readable only by its owner. Keys are encrypted at rest
+    with a passphrase stored outside of the pool directory, in the work
+    directory, so that a copy of the configuration directory does not
+    hold usable pooled keys. Keys that cannot be decrypted, e.g. after
+    the passphrase was removed, are discarded. Keys are taken by
+    renaming their file, which only succeeds for one taker, so many
+    threads and processes can share a pool.
+
+    Keys are generated in daemon threads, so Certbot does not wait for
+    them when it exits; keys still being generated are then abandoned.
+
+    :ivar str directory: Directory holding the keys
+    :ivar int size: Number of keys of each size to keep in the pool
+    :ivar str passphrase_path: File holding the passphrase of the keys
+
+    """
+    def __init__(self, directory, size, passphrase_path, workers=None):
+        self.directory = directory
+        self.size = size
+        self.passphrase_path = passphrase_path
+        self._workers = workers or multiprocessing.cpu_count()
+        self._thread_pool = None
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._passphrase = None
+
+    def take(self, bits):
+        """Takes a key of the given size from the pool.
+
+        A key is generated right away if the pool has none, and the
+        pool is refilled in the background.
+
+        :param int bits: RSA key size
+
+        :returns: the key in PEM form
+        :rtype: str
+
+        """
+        key_pem = self._take(bits)
+        self.fill(bits)
+        if key_pem is None:
+            logger.debug("Key pool has no %d bit key, generating one", bits)
+            key_pem = crypto_util.make_key(bits)
+        return key_pem
+
+    def fill(self, bits):
+        """Generates keys of the given size until the pool is full.
+
+        :param int bits: RSA key size
+
+        """
+        try:
+            available = len(self._key_files(bits))
+        except OSError:
+            available = 0
+        with self._lock:
+            missing = self.size - available - self._pending.get(bits, 0)
+            if missing <= 0:
+                return
+            self._pending[bits] = self._pending.get(bits, 0) + missing
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPool(self._workers)
+            for _ in range(missing):
+                self._thread_pool.apply_async(self._generate, (bits,))
+
+    def _size_dir(self, bits):
+        return os.path.join(self.directory, "rsa{0}".format(bits))
+
+    def _key_files(self, bits):
+        size_dir = self._size_dir(bits)
+        return [os.path.join(size_dir, name) for name in os.listdir(size_dir)
+                if name.endswith(".pem") and not name.startswith(".")]
+
+    def _take(self, bits):
+        """Removes a key from the pool.
+
+        :returns: the key in PEM form, or `None` if the pool has none
+        :rtype: str or None
+
+        """
+        try:
+            key_files = self._key_files(bits)
+            passphrase = self._get_passphrase() if key_files else None
+        except (IOError, OSError):
+            return None
+        for key_file in key_files:
+            claimed = os.path.join(os.path.dirname(key_file),
+                                   ".taken-" + uuid.uuid4().hex)
+            try:
+                os.rename(key_file, claimed)
+            except OSError:
+                # Taken by someone else in the meantime
+                continue
+            try:
+                with open(claimed, "rb") as f:
+                    key = OpenSSL.crypto.load_privatekey(
+                        OpenSSL.crypto.FILETYPE_PEM, f.read(), passphrase)
+            except (IOError, OSError, OpenSSL.crypto.Error) as error:
+                logger.warning("Discarding unusable key %s from the key "
+                               "pool: %s", key_file, error)
+                continue
+            finally:
+                util.safely_remove(claimed)
+            logger.debug("Took a %d bit key from the key pool", bits)
+            return OpenSSL.crypto.dump_privatekey(
+                OpenSSL.crypto.FILETYPE_PEM, key)
+        return None
+
+    def _generate(self, bits):
+        """Generates a key and adds it to the pool."""
+        try:
+            key = OpenSSL.crypto.PKey()
+            key.generate_key(OpenSSL.crypto.TYPE_RSA, bits)
+            key_pem = OpenSSL.crypto.dump_privatekey(
+                OpenSSL.crypto.FILETYPE_PEM, key, _CIPHER,
+                self._get_passphrase())
+            util.make_or_verify_dir(self.directory, 0o700, os.geteuid())
+            size_dir = self._size_dir(bits)
+            util.make_or_verify_dir(size_dir, 0o700, os.geteuid())
+            fd, temp_path = tempfile.mkstemp(dir=size_dir, prefix=".new-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(key_pem)
+            os.rename(temp_path, os.path.join(
+                size_dir, uuid.uuid4().hex + ".pem"))
+        except Exception as error:  # pylint: disable=broad-except
+            logger.warning("Unable to add a %d bit key to the key pool: %s",
+                           bits, error)
+        finally:
+            with self._lock:
+                self._pending[bits] -= 1
+
+    def _get_passphrase(self):
+        """Returns the passphrase of the pool, creating it if needed."""
+        with self._lock:
+            if self._passphrase is None:
+                path = self.passphrase_path
+                if not os.path.exists(path):
+                    fd, temp_path = tempfile.mkstemp(
+                        dir=os.path.dirname(path), prefix=".passphrase-")
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(binascii.hexlify(os.urandom(32)))
+                    try:
+                        # Unlike a rename, this keeps the passphrase
+                        # created by another process in the meantime
+                        os.link(temp_path, path)
+                    except OSError:
+                        pass
+                    finally:
+                        os.remove(temp_path)
+                with open(path, "rb") as f:
+                    self._passphrase = f.read().strip()
+            return self._passphrase
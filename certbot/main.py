@@ -28,6 +28,7 @@ from certbot import interfaces
 from certbot import log
 from certbot import renewal
 from certbot import reporter
+from certbot import startup_profile
 from certbot import storage
 from certbot import util
 
@@ -1072,7 +1073,7 @@ def _csr_get_and_save_cert(config, le_client):
             cert, chain, config.cert_path, config.chain_path, config.fullchain_path)
     return cert_path, fullchain_path
 
-def renew_cert(config, plugins, lineage):
+def renew_cert(config, plugins, lineage, reloads=None, plugin_locks=None):
     """Renew & save an existing cert. Do not install it.
 
     :param config: Configuration object
@@ -1084,6 +1085,15 @@ def renew_cert(config, plugins, lineage):
     :param lineage: Certificate lineage object
     :type lineage: storage.RenewableCert
 
+    :param reloads: if given, the installer is added to it to reload the
+        server once all lineages are renewed, instead of reloading it now
+    :type reloads: renewal.DeferredReloads
+
+    :param plugin_locks: if given, the plugins are chosen through it so
+        that the steps using state shared with the lineages renewed
+        concurrently are locked
+    :type plugin_locks: renewal._LineageLocks
+
     :returns: `None`
     :rtype: None
 
@@ -1092,7 +1102,12 @@ def renew_cert(config, plugins, lineage):
     """
     try:
         # installers are used in auth mode to determine domain names
-        installer, auth = plug_sel.choose_configurator_plugins(config, plugins, "certonly")
+        if plugin_locks is None:
+            installer, auth = plug_sel.choose_configurator_plugins(
+                config, plugins, "certonly")
+        else:
+            installer, auth = plugin_locks.choose_configurator_plugins(
+                config, plugins)
     except errors.PluginSelectionError as e:
         logger.info("Could not choose appropriate plugin: %s", e)
         raise
@@ -1105,6 +1120,11 @@ def renew_cert(config, plugins, lineage):
     if installer is None:
         notify("new certificate deployed without reload, fullchain is {0}".format(
                lineage.fullchain), pause=False)
+    elif reloads is not None:
+        reloads.add(config, installer, lineage.fullchain)
+        notify("new certificate deployed, {0} server will be reloaded once "
+               "renewals are done; fullchain is {1}".format(
+                   config.installer, lineage.fullchain), pause=False)
     else:
         # In case of a renewal, reload server to pick up new certificate.
         # In principle we could have a configuration option to inhibit this
@@ -1237,14 +1257,20 @@ def main(cli_args=sys.argv[1:]):
     """
     log.pre_arg_parse_setup()
 
-    plugins = plugins_disco.PluginsRegistry.find_all()
+    if startup_profile.FLAG in cli_args:
+        startup_profile.enable()
+        util.atexit_register(startup_profile.print_report)
+
+    with startup_profile.phase("plugin discovery"):
+        plugins = plugins_disco.PluginsRegistry.find_all()
     logger.debug("certbot version: %s", certbot.__version__)
     # do not log `config`, as it contains sensitive data (e.g. revoke --key)!
     logger.debug("Arguments: %r", cli_args)
     logger.debug("Discovered plugins: %r", plugins)
 
     # note: arg parser internally handles --help (and exits afterwards)
-    args = cli.prepare_and_parse_args(plugins, cli_args)
+    with startup_profile.phase("command line parsing (total)"):
+        args = cli.prepare_and_parse_args(plugins, cli_args)
     config = configuration.NamespaceConfig(args)
     zope.component.provideUtility(config)
 
@@ -1,40 +1,98 @@
 """Tools for checking certificate revocation."""
+import binascii
+import datetime
 import logging
+import os
 import re
-
+import tempfile
+from multiprocessing.pool import ThreadPool
 from subprocess import Popen, PIPE
 
+import requests
+from cryptography import x509
+from cryptography.exceptions import InvalidSignature, UnsupportedAlgorithm
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, padding, rsa
+
+try:
+    # Only cryptography>=2.5 has the ocsp module with the
+    # signature_hash_algorithm attribute needed to verify responses
+    from cryptography.x509 import ocsp
+    getattr(ocsp.OCSPResponse, 'signature_hash_algorithm')
+except (ImportError, AttributeError):  # pragma: no cover
+    ocsp = None  # type: ignore
+
+from certbot import constants
 from certbot import errors
 from certbot import util
 
 logger = logging.getLogger(__name__)
 
+OCSP_TIMEOUT = 10
+"""Seconds to wait for the answer of an OCSP responder."""
+
+MAX_WORKERS = 10
+"""Number of certificates checked at the same time by
+:meth:`RevocationChecker.ocsp_revoked_all`."""
+
+# Tolerance for clock differences with OCSP responders, as used by OpenSSL
+_CLOCK_SKEW = datetime.timedelta(minutes=5)
+
+
 class RevocationChecker(object):
-    "This class figures out OCSP checking on this system, and performs it."
+    """This class figures out OCSP checking on this system, and performs it.
 
-    def __init__(self):
+    OCSP requests are built and responses verified in process when the
+    installed version of cryptography supports OCSP, otherwise the
+    openssl binary is used.
+
+    :ivar str cache_dir: Directory where verified OCSP responses are kept
+        until their nextUpdate, or `None` not to keep them.
+
+    """
+
+    def __init__(self, enforce_openssl_binary_usage=False, cache_dir=None):
         self.broken = False
+        self.use_openssl_binary = enforce_openssl_binary_usage or not ocsp
+        self.cache_dir = cache_dir
 
-        if not util.exe_exists("openssl"):
-            logger.info("openssl not installed, can't check revocation")
-            self.broken = True
-            return
+        if self.use_openssl_binary:
+            if not util.exe_exists("openssl"):
+                logger.info("openssl not installed, can't check revocation")
+                self.broken = True
+                return
 
-       # New versions of openssl want -header var=val, old ones want -header var val
-        test_host_format = Popen(["openssl", "ocsp", "-header", "var", "val"],
-                                 stdout=PIPE, stderr=PIPE, universal_newlines=True)
-        _out, err = test_host_format.communicate()
-        if "Missing =" in err:
-            self.host_args = lambda host: ["Host=" + host]
+            # New versions of openssl want -header var=val, old ones want -header var val
+            test_host_format = Popen(["openssl", "ocsp", "-header", "var", "val"],
+                                     stdout=PIPE, stderr=PIPE, universal_newlines=True)
+            _out, err = test_host_format.communicate()
+            if "Missing =" in err:
+                self.host_args = lambda host: ["Host=" + host]
+            else:
+                self.host_args = lambda host: ["Host", host]
         else:
-            self.host_args = lambda host: ["Host", host]
+            # Connections are kept alive and reused for each responder host
+            self._session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=MAX_WORKERS)
+            self._session.mount("http://", adapter)
+            self._session.mount("https://", adapter)
+
+    @classmethod
+    def from_config(cls, config):
+        """Returns a checker caching OCSP responses in config.work_dir.
+
+        :param config: Configuration.
+        :type config: :class:`certbot.configuration.NamespaceConfig`
 
+        :rtype: `RevocationChecker`
+
+        """
+        return cls(cache_dir=os.path.join(config.work_dir, constants.OCSP_CACHE_DIR))
 
     def ocsp_revoked(self, cert_path, chain_path):
         """Get revoked status for a particular cert version.
 
-        .. todo:: Make this a non-blocking call
-
         :param str cert_path: Path to certificate
         :param str chain_path: Path to intermediate cert
         :rtype bool or None:
@@ -44,10 +102,71 @@ class RevocationChecker(object):
         if self.broken:
             return False
 
-
         url, host = self.determine_ocsp_server(cert_path)
         if not host:
             return False
+        if self.use_openssl_binary:
+            return self._check_ocsp_openssl_bin(cert_path, chain_path, host, url)
+        return self._check_ocsp_cryptography(cert_path, chain_path, url)
+
+    def ocsp_revoked_all(self, paths):
+        """Get revoked status for many cert versions, concurrently.
+
+        Up to `MAX_WORKERS` certificates are checked at the same time.
+
+        :param list paths: `tuple` of the paths to the certificate and to
+            its intermediate cert, for each certificate to check
+        :returns: the result of :meth:`ocsp_revoked` for each certificate,
+            in the same order as paths
+        :rtype: `list` of `bool`
+
+        """
+        paths = list(paths)
+
+        def check(cert_and_chain_paths):
+            """Checks the status of a single certificate."""
+            cert_path, chain_path = cert_and_chain_paths
+            return self.ocsp_revoked(cert_path, chain_path)
+
+        workers = min(MAX_WORKERS, len(paths))
+        if workers > 1:
+            pool = ThreadPool(workers)
+            try:
+                return pool.map(check, paths)
+            finally:
+                pool.close()
+                pool.join()
+        return [check(cert_and_chain_paths) for cert_and_chain_paths in paths]
+
+    def determine_ocsp_server(self, cert_path):  # pylint: disable=no-self-use
+        """Extract the OCSP server host from a certificate.
+
+        :param str cert_path: Path to the cert we're checking OCSP for
+        :rtype tuple:
+        :returns: (OCSP server URL or None, OCSP server host or None)
+
+        """
+        try:
+            cert = _load_cert(cert_path)
+            extension = cert.extensions.get_extension_for_class(
+                x509.AuthorityInformationAccess)
+            url = next(description.access_location.value
+                       for description in extension.value
+                       if description.access_method ==
+                       x509.oid.AuthorityInformationAccessOID.OCSP)
+        except (IOError, ValueError, x509.ExtensionNotFound, StopIteration):
+            logger.info("Cannot extract OCSP URI from %s", cert_path)
+            return None, None
+
+        url = url.rstrip()
+        host = url.partition("://")[2].rstrip("/")
+        if host:
+            return url, host
+        else:
+            logger.info("Cannot process OCSP host from URL (%s) in cert at %s", url, cert_path)
+            return None, None
+
+    def _check_ocsp_openssl_bin(self, cert_path, chain_path, host, url):
         # jdkasten thanks "Bulletproof SSL and TLS - Ivan Ristic" for documenting this!
         cmd = ["openssl", "ocsp",
                "-no_nonce",
@@ -68,30 +187,206 @@ class RevocationChecker(object):
 
         return _translate_ocsp_query(cert_path, output, err)
 
+    def _check_ocsp_cryptography(self, cert_path, chain_path, url):
+        try:
+            cert = _load_cert(cert_path)
+            issuer = _load_cert(chain_path)
+        except (IOError, ValueError) as error:
+            logger.info("Cannot load certificates to check OCSP for %s: %s",
+                        cert_path, error)
+            return False
+        request = ocsp.OCSPRequestBuilder().add_certificate(
+            cert, issuer, hashes.SHA1()).build()
 
-    def determine_ocsp_server(self, cert_path):
-        """Extract the OCSP server host from a certificate.
+        response = self._load_cached_response(request)
+        cached = response is not None
+        if not cached:
+            response = self._query_responder(cert_path, url, request)
+            if response is None:
+                return False
 
-        :param str cert_path: Path to the cert we're checking OCSP for
-        :rtype tuple:
-        :returns: (OCSP server URL or None, OCSP server host or None)
+        try:
+            _check_ocsp_response(response, request, issuer)
+        except errors.Error as error:
+            logger.info("Invalid OCSP response for %s: %s", cert_path, error)
+            return False
+
+        if not cached:
+            self._save_cached_response(request, response)
+        logger.debug("OCSP certificate status for %s is: %s",
+                     cert_path, response.certificate_status)
+        return response.certificate_status == ocsp.OCSPCertStatus.REVOKED
+
+    def _query_responder(self, cert_path, url, request):
+        """Sends request to the OCSP responder at url.
+
+        :returns: the successful response of the responder, or `None`
+        :rtype: `cryptography.x509.ocsp.OCSPResponse` or None
 
         """
+        logger.debug("Querying OCSP for %s at %s", cert_path, url)
         try:
-            url, _err = util.run_script(
-                ["openssl", "x509", "-in", cert_path, "-noout", "-ocsp_uri"],
-                log=logger.debug)
-        except errors.SubprocessError:
-            logger.info("Cannot extract OCSP URI from %s", cert_path)
-            return None, None
+            http_response = self._session.post(
+                url, data=request.public_bytes(serialization.Encoding.DER),
+                headers={"Content-Type": "application/ocsp-request"},
+                timeout=OCSP_TIMEOUT)
+        except requests.exceptions.RequestException:
+            logger.info("OCSP check failed for %s (are we offline?)", cert_path,
+                        exc_info=True)
+            return None
+        if http_response.status_code != 200:
+            logger.info("OCSP check failed for %s (HTTP status: %d)",
+                        cert_path, http_response.status_code)
+            return None
+
+        try:
+            response = ocsp.load_der_ocsp_response(http_response.content)
+        except ValueError:
+            logger.info("Unable to parse OCSP response for %s", cert_path)
+            return None
+        if response.response_status != ocsp.OCSPResponseStatus.SUCCESSFUL:
+            logger.info("Invalid OCSP response status for %s: %s",
+                        cert_path, response.response_status)
+            return None
+        return response
+
+    def _cache_path(self, request):
+        """Path of the cached response to request, named after its
+        issuer key hash and serial number."""
+        return os.path.join(self.cache_dir, "{0}-{1:x}.der".format(
+            binascii.hexlify(request.issuer_key_hash).decode("ascii"),
+            request.serial_number))
+
+    def _load_cached_response(self, request):
+        """Loads the cached response to request, if any.
+
+        :returns: the cached response if it is valid until its nextUpdate
+        :rtype: `cryptography.x509.ocsp.OCSPResponse` or None
+
+        """
+        if self.cache_dir is None:
+            return None
+        path = self._cache_path(request)
+        try:
+            with open(path, "rb") as response_file:
+                response = ocsp.load_der_ocsp_response(response_file.read())
+            if (response.response_status != ocsp.OCSPResponseStatus.SUCCESSFUL or
+                    response.next_update is None or
+                    response.next_update <= datetime.datetime.utcnow()):
+                return None
+        except (IOError, OSError, ValueError):
+            return None
+        logger.debug("Using cached OCSP response %s", path)
+        return response
+
+    def _save_cached_response(self, request, response):
+        """Caches response to request until its nextUpdate.
+
+        Failing to cache the response is not fatal as the cache is only
+        used to avoid network requests on later checks.
+
+        """
+        if self.cache_dir is None or response.next_update is None:
+            return
+        try:
+            util.make_or_verify_dir(self.cache_dir, 0o755, os.geteuid())
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".ocsp")
+            with os.fdopen(fd, "wb") as response_file:
+                response_file.write(response.public_bytes(serialization.Encoding.DER))
+            os.chmod(temp_path, 0o644)
+            os.rename(temp_path, self._cache_path(request))
+        except (IOError, OSError, errors.Error) as error:
+            logger.debug("Unable to cache OCSP response in %s: %s",
+                         self.cache_dir, error)
+
+
+def _load_cert(path):
+    with open(path, "rb") as cert_file:
+        return x509.load_pem_x509_certificate(cert_file.read(), default_backend())
+
+
+def _check_ocsp_response(response, request, issuer):
+    """Verifies that response is a valid, current answer to request.
+
+    :param cryptography.x509.ocsp.OCSPResponse response: the response
+    :param cryptography.x509.ocsp.OCSPRequest request: the request
+    :param cryptography.x509.Certificate issuer: the issuer of the
+        certificate in request
+
+    :raises .errors.Error: if response cannot be trusted
+
+    """
+    if response.serial_number != request.serial_number:
+        raise errors.Error("the certificate in the response does not "
+                           "correspond to the certificate in the request")
+    if (not isinstance(response.hash_algorithm, type(request.hash_algorithm)) or
+            response.issuer_key_hash != request.issuer_key_hash or
+            response.issuer_name_hash != request.issuer_name_hash):
+        raise errors.Error("the issuer in the response does not correspond "
+                           "to the issuer of the certificate")
+
+    try:
+        _check_ocsp_response_signature(response, issuer)
+    except UnsupportedAlgorithm as error:
+        raise errors.Error("unsupported signature algorithm: {0}".format(error))
+    except InvalidSignature:
+        raise errors.Error("invalid signature")
+
+    # thisUpdate and nextUpdate are naive datetimes in UTC. As in OpenSSL,
+    # thisUpdate being too old is not checked.
+    now = datetime.datetime.utcnow()
+    if response.this_update > now + _CLOCK_SKEW:
+        raise errors.Error("thisUpdate is in the future")
+    if response.next_update and response.next_update < now - _CLOCK_SKEW:
+        raise errors.Error("nextUpdate is in the past")
+
+
+def _check_ocsp_response_signature(response, issuer):
+    """Verifies the signature of response.
+
+    The response is either signed by the issuer itself or by a responder
+    whose certificate, included in the response, is signed by the issuer
+    and authorized to sign OCSP responses.
+
+    :raises .errors.Error: if the responder is not authorized
+    :raises cryptography.exceptions.InvalidSignature: if a signature is invalid
+    :raises cryptography.exceptions.UnsupportedAlgorithm: if a signature
+        algorithm is not supported
+
+    """
+    if response.certificates:
+        responder = response.certificates[0]
+        if responder.issuer != issuer.subject:
+            raise errors.Error("the responder certificate is not issued "
+                               "by the issuer of the certificate")
+        try:
+            extension = responder.extensions.get_extension_for_class(
+                x509.ExtendedKeyUsage)
+        except x509.ExtensionNotFound:
+            extension = None
+        if (extension is None or
+                x509.oid.ExtendedKeyUsageOID.OCSP_SIGNING not in extension.value):
+            raise errors.Error("the responder is not authorized to sign "
+                               "OCSP responses")
+        _verify_signature(issuer.public_key(), responder.signature,
+                          responder.tbs_certificate_bytes,
+                          responder.signature_hash_algorithm)
+        signer = responder
+    else:
+        signer = issuer
+    _verify_signature(signer.public_key(), response.signature,
+                      response.tbs_response_bytes,
+                      response.signature_hash_algorithm)
+
+
+def _verify_signature(public_key, signature, data, hash_algorithm):
+    if isinstance(public_key, rsa.RSAPublicKey):
+        public_key.verify(signature, data, padding.PKCS1v15(), hash_algorithm)
+    elif isinstance(public_key, ec.EllipticCurvePublicKey):
+        public_key.verify(signature, data, ec.ECDSA(hash_algorithm))
+    else:
+        raise UnsupportedAlgorithm("unsupported public key type")
 
-        url = url.rstrip()
-        host = url.partition("://")[2].rstrip("/")
-        if host:
-            return url, host
-        else:
-            logger.info("Cannot process OCSP host from URL (%s) in cert at %s", url, cert_path)
-            return None, None
 
 def _translate_ocsp_query(cert_path, ocsp_output, ocsp_errors):
     """Parse openssl's weird output to work out what it means."""
@@ -117,4 +412,3 @@ def _translate_ocsp_query(cert_path, ocsp_output, ocsp_errors):
         logger.warn("Unable to properly parse OCSP output: %s\nstderr:%s",
                     ocsp_output, ocsp_errors)
         return False
-
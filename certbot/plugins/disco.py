@@ -4,6 +4,7 @@ import itertools
 import logging
 import pkg_resources
 import six
+import threading
 
 from collections import OrderedDict
 
@@ -43,11 +44,34 @@ class PluginEntryPoint(object):
 
     def __init__(self, entry_point):
         self.name = self.entry_point_to_plugin_name(entry_point)
-        self.plugin_cls = entry_point.load()
         self.entry_point = entry_point
+        self._plugin_cls = None
         self._initialized = None
         self._prepared = None
 
+    @property
+    def plugin_cls(self):
+        """Plugin class, imported on first use."""
+        if self._plugin_cls is None:
+            self._plugin_cls = _load_plugin_cls(self.entry_point)
+        return self._plugin_cls
+
+    @plugin_cls.setter
+    def plugin_cls(self, plugin_cls):
+        """Sets the plugin class, bypassing the import."""
+        self._plugin_cls = plugin_cls
+
+    @property
+    def is_factory(self):
+        """Does the plugin class provide `.IPluginFactory`?
+
+        Plugins that do not are skipped by `PluginsRegistry`, once their
+        class is imported.
+
+        """
+        # providedBy | pylint: disable=no-member
+        return interfaces.IPluginFactory.providedBy(self.plugin_cls)
+
     @classmethod
     def entry_point_to_plugin_name(cls, entry_point):
         """Unique plugin name for an ``entry_point``"""
@@ -94,6 +118,7 @@ class PluginEntryPoint(object):
         """Memoized plugin initialization."""
         if not self.initialized:
             self.entry_point.require()  # fetch extras!
+            # pylint: disable=not-callable
             self._initialized = self.plugin_cls(config, self.name)
         return self._initialized
 
@@ -176,6 +201,42 @@ class PluginEntryPoint(object):
         return "\n".join(lines)
 
 
+_ENTRY_POINTS = None
+"""Plugin entry points found by :func:`_find_entry_points`."""
+
+_PLUGIN_CLASSES = {}
+"""Maps plugin entry points to their imported class."""
+
+# Reentrant as importing a plugin may look for other plugins
+_LOCK = threading.RLock()
+
+
+def _find_entry_points():
+    """Returns the plugin entry points, enumerating them on first call."""
+    global _ENTRY_POINTS  # pylint: disable=global-statement
+    with _LOCK:
+        if _ENTRY_POINTS is None:
+            _ENTRY_POINTS = list(itertools.chain(
+                pkg_resources.iter_entry_points(
+                    constants.SETUPTOOLS_PLUGINS_ENTRY_POINT),
+                pkg_resources.iter_entry_points(
+                    constants.OLD_SETUPTOOLS_PLUGINS_ENTRY_POINT),))
+        return _ENTRY_POINTS
+
+
+def _load_plugin_cls(entry_point):
+    """Imports the plugin class of entry_point, once per process."""
+    with _LOCK:
+        if entry_point not in _PLUGIN_CLASSES:
+            plugin_cls = entry_point.load()
+            # providedBy | pylint: disable=no-member
+            if not interfaces.IPluginFactory.providedBy(plugin_cls):
+                logger.warning(
+                    "%s does not provide IPluginFactory, skipping", entry_point)
+            _PLUGIN_CLASSES[entry_point] = plugin_cls
+        return _PLUGIN_CLASSES[entry_point]
+
+
 class PluginsRegistry(collections.Mapping):
     """Plugins registry."""
 
@@ -188,23 +249,25 @@ class PluginsRegistry(collections.Mapping):
 
     @classmethod
     def find_all(cls):
-        """Find plugins using setuptools entry points."""
+        """Find plugins using setuptools entry points.
+
+        The registry is built from the metadata of the entry points,
+        which are only enumerated once per process. Plugin classes are
+        only imported when they are first used, e.g. when the plugins
+        are filtered by `visible` or `ifaces`, or one of them is
+        selected or initialized, and then reused by later calls. A
+        plugin whose class does not provide `.IPluginFactory` is then
+        skipped with a warning. A new registry is still returned by each
+        call, as registries hold plugins initialized with a particular
+        configuration.
+
+        """
         plugins = {}
-        entry_points = itertools.chain(
-            pkg_resources.iter_entry_points(
-                constants.SETUPTOOLS_PLUGINS_ENTRY_POINT),
-            pkg_resources.iter_entry_points(
-                constants.OLD_SETUPTOOLS_PLUGINS_ENTRY_POINT),)
-        for entry_point in entry_points:
+        for entry_point in _find_entry_points():
             plugin_ep = PluginEntryPoint(entry_point)
             assert plugin_ep.name not in plugins, (
                 "PREFIX_FREE_DISTRIBUTIONS messed up")
-            # providedBy | pylint: disable=no-member
-            if interfaces.IPluginFactory.providedBy(plugin_ep.plugin_cls):
-                plugins[plugin_ep.name] = plugin_ep
-            else:  # pragma: no cover
-                logger.warning(
-                    "%r does not provide IPluginFactory, skipping", plugin_ep)
+            plugins[plugin_ep.name] = plugin_ep
         return cls(plugins)
 
     def __getitem__(self, name):
@@ -216,15 +279,19 @@ class PluginsRegistry(collections.Mapping):
     def __len__(self):
         return len(self._plugins)
 
+    def _factories(self):
+        """Plugins of the registry whose class provides IPluginFactory."""
+        return [(name, plugin_ep) for name, plugin_ep
+                in six.iteritems(self._plugins) if plugin_ep.is_factory]
+
     def init(self, config):
         """Initialize all plugins in the registry."""
-        return [plugin_ep.init(config) for plugin_ep
-                in six.itervalues(self._plugins)]
+        return [plugin_ep.init(config) for _, plugin_ep in self._factories()]
 
     def filter(self, pred):
         """Filter plugins based on predicate."""
         return type(self)(dict((name, plugin_ep) for name, plugin_ep
-                               in six.iteritems(self._plugins) if pred(plugin_ep)))
+                               in self._factories() if pred(plugin_ep)))
 
     def visible(self):
         """Filter plugins based on visibility."""
@@ -241,7 +308,7 @@ class PluginsRegistry(collections.Mapping):
 
     def prepare(self):
         """Prepare all plugins in the registry."""
-        return [plugin_ep.prepare() for plugin_ep in six.itervalues(self._plugins)]
+        return [plugin_ep.prepare() for _, plugin_ep in self._factories()]
 
     def available(self):
         """Filter plugins based on availability."""
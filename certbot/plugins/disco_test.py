@@ -196,16 +196,53 @@ class PluginsRegistryTest(unittest.TestCase):
         self.plugins = {self.plugin_ep.name: self.plugin_ep}
         self.reg = self._create_new_registry(self.plugins)
 
+    @mock.patch("certbot.plugins.disco._ENTRY_POINTS", None)
     def test_find_all(self):
         from certbot.plugins.disco import PluginsRegistry
         with mock.patch("certbot.plugins.disco.pkg_resources") as mock_pkg:
             mock_pkg.iter_entry_points.side_effect = [iter([EP_SA]),
                                                       iter([EP_WR])]
             plugins = PluginsRegistry.find_all()
+            self.assertTrue(plugins["sa"].entry_point is EP_SA)
+            self.assertTrue(plugins["wr"].entry_point is EP_WR)
+
+            # Entry points are enumerated once, but registries are not shared
+            plugins_again = PluginsRegistry.find_all()
+            self.assertEqual(mock_pkg.iter_entry_points.call_count, 2)
+        self.assertEqual(list(plugins_again), ["sa", "wr"])
+        self.assertFalse(plugins_again["sa"] is plugins["sa"])
         self.assertTrue(plugins["sa"].plugin_cls is standalone.Authenticator)
-        self.assertTrue(plugins["sa"].entry_point is EP_SA)
         self.assertTrue(plugins["wr"].plugin_cls is webroot.Authenticator)
-        self.assertTrue(plugins["wr"].entry_point is EP_WR)
+
+    @mock.patch("certbot.plugins.disco._PLUGIN_CLASSES", {})
+    def test_find_all_lazy(self):
+        from certbot.plugins.disco import PluginEntryPoint
+        entry_point = mock.MagicMock(dist=mock.MagicMock(key="certbot"))
+        entry_point.name = "lazy"
+        entry_point.load.return_value = standalone.Authenticator
+        plugin_ep = PluginEntryPoint(entry_point)
+        self.assertFalse(entry_point.load.called)
+        self.assertTrue(plugin_ep.plugin_cls is standalone.Authenticator)
+        self.assertTrue(PluginEntryPoint(entry_point).plugin_cls
+                        is standalone.Authenticator)
+        self.assertEqual(entry_point.load.call_count, 1)
+
+    @mock.patch("certbot.plugins.disco.logger")
+    @mock.patch("certbot.plugins.disco._PLUGIN_CLASSES", {})
+    def test_not_a_factory(self, mock_logger):
+        from certbot.plugins.disco import PluginEntryPoint
+        entry_point = mock.MagicMock(dist=mock.MagicMock(key="certbot"))
+        entry_point.name = "object"
+        entry_point.load.return_value = object
+        plugin_ep = PluginEntryPoint(entry_point)
+        reg = self._create_new_registry({plugin_ep.name: plugin_ep})
+        self.assertFalse(mock_logger.warning.called)
+
+        self.assertEqual(list(reg), ["object"])
+        self.assertEqual(list(reg.filter(lambda p_ep: True)), [])
+        self.assertEqual(reg.init(mock.MagicMock()), [])
+        self.assertEqual(reg.prepare(), [])
+        self.assertEqual(mock_logger.warning.call_count, 1)
 
     def test_getitem(self):
         self.assertEqual(self.plugin_ep, self.reg["mock"])
@@ -1,20 +1,27 @@
 """Common code for DNS Authenticator Plugins."""
 
 import abc
+import json
 import logging
 import os
 import stat
+import tempfile
+import threading
+import time
+from multiprocessing.pool import ThreadPool
 from time import sleep
 
 import configobj
 import zope.interface
 from acme import challenges
 
+from certbot import constants
 from certbot import errors
 from certbot import interfaces
 from certbot.display import ops
 from certbot.display import util as display_util
 from certbot.plugins import common
+from certbot.plugins import dns_propagation
 
 logger = logging.getLogger(__name__)
 
@@ -24,10 +31,24 @@ logger = logging.getLogger(__name__)
 class DNSAuthenticator(common.Plugin):
     """Base class for DNS  Authenticators"""
 
+    max_concurrency = 10
+    """Maximum number of `_perform` or `_cleanup` calls made at the same time.
+
+    Plugins whose `_perform` and `_cleanup` are not safe to call from
+    several threads at once must set this to 1.
+    """
+
+    uses_zone_cache = False
+    """Whether the plugin looks zones up through `_get_zone_cache`.
+
+    Such plugins get a ``zone-cache-ttl`` option.
+    """
+
     def __init__(self, config, name):
         super(DNSAuthenticator, self).__init__(config, name)
 
         self._attempt_cleanup = False
+        self._zone_cache = None
 
     @classmethod
     def add_parser_arguments(cls, add, default_propagation_seconds=10):  # pylint: disable=arguments-differ
@@ -36,6 +57,18 @@ class DNSAuthenticator(common.Plugin):
             type=int,
             help='The number of seconds to wait for DNS to propagate before asking the ACME server '
                  'to verify the DNS record.')
+        add('propagation-check',
+            action='store_true',
+            default=False,
+            help='Query the authoritative nameservers of the zone until they all serve the DNS '
+                 'record, instead of always waiting for the number of seconds given by '
+                 'propagation-seconds, which becomes the maximum. Requires dnspython.')
+        if cls.uses_zone_cache:
+            add('zone-cache-ttl',
+                default=0,
+                type=int,
+                help='The number of seconds for which the DNS zones found for domains are saved '
+                     'and reused by later runs. 0 only reuses them within a single run.')
 
     def get_chall_pref(self, unused_domain): # pylint: disable=missing-docstring,no-self-use
         return [challenges.DNS01]
@@ -48,32 +81,147 @@ class DNSAuthenticator(common.Plugin):
 
         self._attempt_cleanup = True
 
-        responses = []
-        for achall in achalls:
-            domain = achall.domain
-            validation_domain_name = achall.validation_domain_name(domain)
-            validation = achall.validation(achall.account_key)
-
-            self._perform(domain, validation_domain_name, validation)
-            responses.append(achall.response(achall.account_key))
+        try:
+            self._perform_achalls(achalls)
+        finally:
+            self._save_zone_cache()
+        responses = [achall.response(achall.account_key) for achall in achalls]
 
         # DNS updates take time to propagate and checking to see if the update has occurred is not
         # reliable (the machine this code is running on might be able to see an update before
-        # the ACME server). So: we sleep for a short amount of time we believe to be long enough.
-        logger.info("Waiting %d seconds for DNS changes to propagate",
-                    self.conf('propagation-seconds'))
-        sleep(self.conf('propagation-seconds'))
+        # the ACME server). So: we sleep for a short amount of time we believe to be long enough,
+        # unless asked to check for the update on the authoritative nameservers themselves.
+        propagation_seconds = self.conf('propagation-seconds')
+        if self.conf('propagation-check') and propagation_seconds > 0:
+            self._wait_for_propagation(achalls, propagation_seconds)
+        else:
+            logger.info("Waiting %d seconds for DNS changes to propagate", propagation_seconds)
+            sleep(propagation_seconds)
 
         return responses
 
+    def _wait_for_propagation(self, achalls, timeout):  # pylint: disable=no-self-use
+        """
+        Wait until the authoritative nameservers serve the TXT records of achalls.
+
+        If the nameservers cannot be queried, wait for timeout instead.
+
+        :param list achalls: The challenges being performed.
+        :param int timeout: The maximum number of seconds to wait.
+        """
+        records = {}
+        for achall in achalls:
+            records.setdefault(achall.validation_domain_name(achall.domain), set()).add(
+                achall.validation(achall.account_key))
+
+        logger.info("Waiting up to %d seconds for DNS changes to propagate", timeout)
+        deadline = time.time() + timeout
+        try:
+            if dns_propagation.wait_for_txt_records(records, timeout):
+                logger.info("DNS changes have propagated to all authoritative nameservers")
+            else:
+                logger.warning("DNS changes have not propagated to all authoritative "
+                               "nameservers after %d seconds", timeout)
+        except errors.PluginError as e:
+            logger.warning("Unable to check DNS propagation: %s", e)
+            sleep(max(0, deadline - time.time()))
+
     def cleanup(self, achalls):  # pylint: disable=missing-docstring
         if self._attempt_cleanup:
-            for achall in achalls:
-                domain = achall.domain
-                validation_domain_name = achall.validation_domain_name(domain)
-                validation = achall.validation(achall.account_key)
+            try:
+                self._cleanup_achalls(achalls)
+            finally:
+                self._save_zone_cache()
+
+    def _perform_achalls(self, achalls):
+        """
+        Performs dns-01 challenges by creating DNS TXT records.
+
+        By default, `_perform` is called for each challenge. Plugins that can
+        create several records at once may override this instead.
+
+        :param list achalls: The challenges to perform.
+        :raises errors.PluginError: If the challenges cannot be performed
+        """
+        self._call_for_achalls(self._perform, achalls)
+
+    def _cleanup_achalls(self, achalls):
+        """
+        Deletes the DNS TXT records created by `_perform_achalls`.
+
+        By default, `_cleanup` is called for each challenge. Plugins that can
+        delete several records at once may override this instead.
+
+        :param list achalls: The challenges to clean up.
+        """
+        self._call_for_achalls(self._cleanup, achalls)
+
+    def _call_for_achalls(self, method, achalls):
+        """
+        Call `_perform` or `_cleanup` for each challenge, concurrently.
+
+        Up to `max_concurrency` calls are made at the same time. Every call
+        is made even if some of them fail.
+
+        :param callable method: `_perform` or `_cleanup`.
+        :param list achalls: The challenges to call method for.
+        :raises errors.PluginError: If method failed for more than one domain,
+            listing the error for each domain. The error itself is raised if
+            method failed for a single domain.
+        """
+
+        def call(achall):
+            """Calls method for achall, returning the error it raised."""
+            domain = achall.domain
+            validation_domain_name = achall.validation_domain_name(domain)
+            validation = achall.validation(achall.account_key)
+            try:
+                method(domain, validation_domain_name, validation)
+            except errors.Error as e:
+                logger.debug('Error for domain %s: %s', domain, e, exc_info=True)
+                return domain, e
+            return None
+
+        workers = min(self.max_concurrency, len(achalls))
+        if workers > 1:
+            pool = ThreadPool(workers)
+            try:
+                results = pool.map(call, achalls)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [call(achall) for achall in achalls]
+
+        failures = [result for result in results if result is not None]
+        if len(failures) == 1:
+            raise failures[0][1]
+        elif failures:
+            raise errors.PluginError("\n".join(
+                "{0}: {1}".format(domain, e) for domain, e in failures))
+
+    def _get_zone_cache(self):
+        """
+        Get the cache of DNS zone lookups of this plugin.
+
+        The cache is shared with the other DNS plugins of this process, and also saved in
+        `IConfig.work_dir` if ``zone-cache-ttl`` is set.
 
-                self._cleanup(domain, validation_domain_name, validation)
+        :returns: The zone cache.
+        :rtype: ZoneCache
+        """
+        if self._zone_cache is None:
+            ttl = self.conf('zone-cache-ttl')
+            if ttl:
+                self._zone_cache = get_zone_cache(
+                    os.path.join(self.config.work_dir, constants.DNS_ZONE_CACHE), ttl)
+            else:
+                self._zone_cache = get_zone_cache()
+        return self._zone_cache
+
+    def _save_zone_cache(self):
+        if self._zone_cache is not None:
+            self._zone_cache.save()
 
     @abc.abstractmethod
     def _setup_credentials(self):  # pragma: no cover
@@ -333,3 +481,149 @@ def base_domain_name_guesses(domain):
 
     fragments = domain.split('.')
     return ['.'.join(fragments[i:]) for i in range(0, len(fragments))]
+
+
+DEFAULT_ZONE_CACHE_TTL = 3600
+"""Seconds for which zone lookups are kept by a `ZoneCache` that is not saved."""
+
+ZONE_CACHE_VERSION = 1
+"""Version of the format of saved zone caches, caches in other formats are ignored."""
+
+
+class ZoneCache(object):
+    """
+    Cache of the zones found for domain names by DNS plugins.
+
+    Entries are kept separately for each namespace, which plugins should derive from the
+    provider and the account used, and expire after ``ttl`` seconds. Two kinds of entries
+    are stored: the zone id found (or not) when trying a single candidate zone name, for
+    providers that are queried once per guess, and the complete list of zones for
+    providers that list all of them at once.
+
+    This class is thread-safe.
+    """
+
+    def __init__(self, path=None, ttl=DEFAULT_ZONE_CACHE_TTL):
+        """
+        :param str path: Where the cache is saved, or `None` if it is not saved.
+        :param int ttl: The number of seconds after which entries expire.
+        """
+        self.path = path
+        self.ttl = ttl
+        self._namespaces = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        if path is not None:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get('version') == ZONE_CACHE_VERSION:
+                self._namespaces = data['namespaces']
+        except (IOError, OSError, ValueError, KeyError, AttributeError) as e:
+            logger.debug('Not using DNS zone cache %s: %s', self.path, e)
+
+    def _get(self, namespace, key):
+        entry = self._namespaces.get(namespace, {}).get(key)
+        if entry is None or entry[1] < time.time():
+            return None
+        return entry
+
+    def _set(self, namespace, key, value):
+        self._namespaces.setdefault(namespace, {})[key] = [value, time.time() + self.ttl]
+        self._dirty = True
+
+    def find_zone_id(self, namespace, domain, query):
+        """
+        Find the id of the zone containing a domain, querying the provider if needed.
+
+        Candidate zone names are tried from the most to the least specific, and ``query`` is
+        only called for the candidates whose result is not in the cache.
+
+        :param str namespace: The namespace of the provider.
+        :param str domain: The domain for which to find the zone.
+        :param callable query: Called with a candidate zone name, returns the id of the zone
+            with that name or `None` if there is no such zone.
+        :returns: The zone id, or `None` if no zone was found.
+        """
+        for zone_name in base_domain_name_guesses(domain):
+            key = 'name:' + zone_name.lower()
+            with self._lock:
+                entry = self._get(namespace, key)
+            if entry is not None:
+                zone_id = entry[0]
+            else:
+                zone_id = query(zone_name)
+                with self._lock:
+                    self._set(namespace, key, zone_id)
+            if zone_id is not None:
+                return zone_id
+        return None
+
+    def get_zones(self, namespace):
+        """
+        Get the complete list of zones of a provider.
+
+        :param str namespace: The namespace of the provider.
+        :returns: The zones stored by `set_zones`, or `None` if they are not in the cache.
+        """
+        with self._lock:
+            entry = self._get(namespace, 'zones')
+        return None if entry is None else entry[0]
+
+    def set_zones(self, namespace, zones):
+        """
+        Store the complete list of zones of a provider.
+
+        :param str namespace: The namespace of the provider.
+        :param zones: The zones, which must be serializable to JSON.
+        """
+        with self._lock:
+            self._set(namespace, 'zones', zones)
+
+    def save(self):
+        """
+        Save the cache, if it has a path and was modified.
+
+        Failing to save the cache only logs a warning.
+        """
+        with self._lock:
+            if self.path is None or not self._dirty:
+                return
+            now = time.time()
+            namespaces = dict(
+                (namespace, dict((key, entry) for key, entry in entries.items()
+                                 if entry[1] >= now))
+                for namespace, entries in self._namespaces.items())
+            try:
+                fd, temp_path = tempfile.mkstemp(
+                    dir=os.path.dirname(self.path), prefix='.dns-zone-cache')
+                with os.fdopen(fd, 'w') as f:
+                    json.dump({'version': ZONE_CACHE_VERSION, 'namespaces': namespaces}, f)
+                os.rename(temp_path, self.path)
+            except (IOError, OSError) as e:
+                logger.warning('Unable to save DNS zone cache %s: %s', self.path, e)
+            else:
+                self._dirty = False
+
+
+_zone_caches = {}
+_zone_caches_lock = threading.Lock()
+
+
+def get_zone_cache(path=None, ttl=DEFAULT_ZONE_CACHE_TTL):
+    """Get the `ZoneCache` of this process for a path.
+
+    :param str path: Where the cache is saved, or `None` for a cache that is not saved.
+    :param int ttl: The number of seconds after which entries expire.
+    :returns: The same cache for all calls with the same arguments.
+    :rtype: ZoneCache
+    """
+
+    with _zone_caches_lock:
+        cache = _zone_caches.get((path, ttl))
+        if cache is None:
+            cache = _zone_caches[(path, ttl)] = ZoneCache(path, ttl)
+        return cache
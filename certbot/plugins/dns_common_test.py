@@ -1,16 +1,20 @@
 """Tests for certbot.plugins.dns_common."""
 
 import collections
+import json
 import logging
 import os
+import threading
 import unittest
 
 import mock
 
+from certbot import achallenges
 from certbot import errors
 from certbot.display import util as display_util
 from certbot.plugins import dns_common
 from certbot.plugins import dns_test_common
+from certbot.tests import acme_util
 from certbot.tests import util
 
 
@@ -31,14 +35,18 @@ class DNSAuthenticatorTest(util.TempDirTestCase, dns_test_common.BaseAuthenticat
 
     class _FakeConfig(object):
         fake_propagation_seconds = 0
+        fake_propagation_check = False
         fake_config_key = 1
         fake_other_key = None
         fake_file_path = None
+        fake_zone_cache_ttl = 0
+        work_dir = None
 
     def setUp(self):
         super(DNSAuthenticatorTest, self).setUp()
 
         self.config = DNSAuthenticatorTest._FakeConfig()
+        self.config.work_dir = self.tempdir
 
         self.auth = DNSAuthenticatorTest._FakeDNSAuthenticator(self.config, "fake")
 
@@ -47,6 +55,32 @@ class DNSAuthenticatorTest(util.TempDirTestCase, dns_test_common.BaseAuthenticat
 
         self.auth._perform.assert_called_once_with(dns_test_common.DOMAIN, mock.ANY, mock.ANY)
 
+    @mock.patch('certbot.plugins.dns_common.sleep')
+    @mock.patch('certbot.plugins.dns_propagation.wait_for_txt_records')
+    def test_perform_propagation_check(self, mock_wait, mock_sleep):
+        self.config.fake_propagation_seconds = 60
+        self.config.fake_propagation_check = True
+        mock_wait.return_value = True
+
+        self.auth.perform([self.achall])
+
+        records = {self.achall.validation_domain_name(dns_test_common.DOMAIN):
+                   set([self.achall.validation(self.achall.account_key)])}
+        mock_wait.assert_called_once_with(records, 60)
+        self.assertFalse(mock_sleep.called)
+
+    @mock.patch('certbot.plugins.dns_common.sleep')
+    @mock.patch('certbot.plugins.dns_propagation.wait_for_txt_records')
+    def test_perform_propagation_check_error(self, mock_wait, mock_sleep):
+        self.config.fake_propagation_seconds = 60
+        self.config.fake_propagation_check = True
+        mock_wait.side_effect = errors.PluginError('no nameservers')
+
+        self.auth.perform([self.achall])
+
+        self.assertTrue(mock_sleep.called)
+        self.assertTrue(0 < mock_sleep.call_args[0][0] <= 60)
+
     def test_cleanup(self):
         self.auth._attempt_cleanup = True
 
@@ -54,6 +88,91 @@ class DNSAuthenticatorTest(util.TempDirTestCase, dns_test_common.BaseAuthenticat
 
         self.auth._cleanup.assert_called_once_with(dns_test_common.DOMAIN, mock.ANY, mock.ANY)
 
+    @staticmethod
+    def _achalls(count):
+        return [achallenges.KeyAuthorizationAnnotatedChallenge(
+            challb=acme_util.DNS01, domain='{0}.example.com'.format(i),
+            account_key=dns_test_common.KEY) for i in range(count)]
+
+    def test_perform_concurrent(self):
+        self.auth.max_concurrency = 3
+        lock = threading.Lock()
+        active = []
+        calls = collections.Counter()
+
+        def _perform(domain, unused_name, unused_validation):
+            with lock:
+                active.append(domain)
+                calls['max'] = max(calls['max'], len(active))
+            threading.Event().wait(0.01)
+            with lock:
+                active.remove(domain)
+        self.auth._perform = mock.MagicMock(side_effect=_perform)
+
+        achalls = self._achalls(10)
+        responses = self.auth.perform(achalls)
+
+        self.assertEqual(len(responses), 10)
+        self.assertEqual(self.auth._perform.call_count, 10)
+        self.assertTrue(1 < calls['max'] <= 3)
+
+    def test_perform_one_error(self):
+        error = errors.PluginError('boom')
+
+        def _perform(domain, unused_name, unused_validation):
+            if domain == '1.example.com':
+                raise error
+        self.auth._perform = mock.MagicMock(side_effect=_perform)
+
+        try:
+            self.auth.perform(self._achalls(3))
+        except errors.PluginError as e:
+            self.assertTrue(e is error)
+        else:  # pragma: no cover
+            self.fail('PluginError not raised')
+        self.assertEqual(self.auth._perform.call_count, 3)
+
+    def test_cleanup_errors_per_domain(self):
+        self.auth._attempt_cleanup = True
+        self.auth._cleanup = mock.MagicMock(side_effect=[
+            errors.PluginError('first'), None, errors.PluginError('second')])
+        self.auth.max_concurrency = 1
+
+        try:
+            self.auth.cleanup(self._achalls(3))
+        except errors.PluginError as e:
+            self.assertEqual(str(e), '0.example.com: first\n2.example.com: second')
+        else:  # pragma: no cover
+            self.fail('PluginError not raised')
+
+    def test_perform_unexpected_error(self):
+        self.auth._perform = mock.MagicMock(side_effect=ValueError)
+        self.assertRaises(ValueError, self.auth.perform, self._achalls(2))
+
+    def test_parser_arguments_zone_cache(self):
+        m = mock.MagicMock()
+        self.auth.add_parser_arguments(m)
+        self.assertFalse(mock.call('zone-cache-ttl', default=0, type=int, help=mock.ANY)
+                         in m.call_args_list)
+
+        with mock.patch.object(self._FakeDNSAuthenticator, 'uses_zone_cache', True):
+            self.auth.add_parser_arguments(m)
+        m.assert_any_call('zone-cache-ttl', default=0, type=int, help=mock.ANY)
+
+    def test_zone_cache(self):
+        self.assertTrue(self.auth._get_zone_cache() is dns_common.get_zone_cache())
+        self.assertTrue(self.auth._zone_cache.path is None)
+
+    def test_zone_cache_saved(self):
+        self.config.fake_zone_cache_ttl = 60
+        zone_cache = self.auth._get_zone_cache()
+        self.assertEqual(zone_cache.path, os.path.join(self.tempdir, 'dns-zone-cache.json'))
+        self.assertEqual(zone_cache.ttl, 60)
+
+        zone_cache.set_zones('fake', [])
+        self.auth.perform([self.achall])
+        self.assertTrue(os.path.exists(zone_cache.path))
+
     @util.patch_get_utility()
     def test_prompt(self, mock_get_utility):
         mock_display = mock_get_utility()
@@ -229,5 +348,116 @@ class DomainNameGuessTest(unittest.TestCase):
         )
 
 
+class ZoneCacheTest(util.TempDirTestCase):
+    """Tests for certbot.plugins.dns_common.ZoneCache."""
+
+    def setUp(self):
+        super(ZoneCacheTest, self).setUp()
+        self.path = os.path.join(self.tempdir, 'cache.json')
+        self.cache = dns_common.ZoneCache(self.path, ttl=60)
+        self.zones = {'example.com': 'EXAMPLE', 'foo.example.com': 'FOO'}
+        self.query = mock.MagicMock(side_effect=self.zones.get)
+
+    def _find(self, domain, cache=None):
+        return (cache or self.cache).find_zone_id('fake', domain, self.query)
+
+    def test_find_zone_id(self):
+        self.assertEqual(self._find('www.example.com'), 'EXAMPLE')
+        self.assertEqual(self.query.call_count, 2)
+        self.assertEqual(self._find('www.example.com'), 'EXAMPLE')
+        self.assertEqual(self.query.call_count, 2)
+
+        self.assertEqual(self._find('a.www.example.com'), 'EXAMPLE')
+        self.assertEqual(self.query.call_count, 3)
+        self.assertEqual(self._find('bar.foo.example.com'), 'FOO')
+        self.assertEqual(self.query.call_count, 5)
+
+    def test_find_zone_id_not_found(self):
+        self.assertTrue(self._find('example.net') is None)
+        self.assertTrue(self._find('example.net') is None)
+        self.assertEqual(self.query.call_count, 2)
+
+    def test_find_zone_id_error(self):
+        self.query.side_effect = errors.PluginError
+        self.assertRaises(errors.PluginError, self._find, 'example.com')
+        self.query.side_effect = self.zones.get
+        self.assertEqual(self._find('example.com'), 'EXAMPLE')
+
+    def test_namespaces(self):
+        self._find('example.com')
+        self.cache.find_zone_id('other', 'example.com', self.query)
+        self.assertEqual(self.query.call_count, 2)
+
+    @mock.patch('certbot.plugins.dns_common.time')
+    def test_expiry(self, mock_time):
+        mock_time.time.return_value = 1000
+        self._find('example.com')
+        self.cache.set_zones('fake', [['example.com', 'EXAMPLE']])
+        mock_time.time.return_value = 1060
+        self._find('example.com')
+        self.assertEqual(self.query.call_count, 1)
+        self.assertEqual(self.cache.get_zones('fake'), [['example.com', 'EXAMPLE']])
+        mock_time.time.return_value = 1061
+        self._find('example.com')
+        self.assertEqual(self.query.call_count, 2)
+        self.assertTrue(self.cache.get_zones('fake') is None)
+
+    def test_zones(self):
+        self.assertTrue(self.cache.get_zones('fake') is None)
+        self.cache.set_zones('fake', [['example.com', 'EXAMPLE']])
+        self.assertEqual(self.cache.get_zones('fake'), [['example.com', 'EXAMPLE']])
+        self.assertTrue(self.cache.get_zones('other') is None)
+
+    def test_save_and_load(self):
+        self._find('www.example.com')
+        self.cache.set_zones('fake', [['example.com', 'EXAMPLE']])
+        self.cache.save()
+
+        cache = dns_common.ZoneCache(self.path, ttl=60)
+        self.assertEqual(self._find('www.example.com', cache), 'EXAMPLE')
+        self.assertEqual(self.query.call_count, 2)
+        self.assertEqual(cache.get_zones('fake'), [['example.com', 'EXAMPLE']])
+
+    def test_save_unmodified(self):
+        self.cache.save()
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_save_without_path(self):
+        cache = dns_common.ZoneCache()
+        self._find('example.com', cache)
+        cache.save()
+        self.assertEqual(os.listdir(self.tempdir), [])
+
+    @mock.patch('certbot.plugins.dns_common.logger')
+    def test_save_failure(self, mock_logger):
+        self.cache.path = os.path.join(self.tempdir, 'missing', 'cache.json')
+        self._find('example.com')
+        self.cache.save()
+        self.assertTrue(mock_logger.warning.called)
+
+    def test_load_corrupt(self):
+        with open(self.path, 'w') as f:
+            f.write('{"version": 1, "namespaces"')
+        self._find('example.com', dns_common.ZoneCache(self.path))
+        self.assertEqual(self.query.call_count, 1)
+
+    def test_load_other_version(self):
+        self._find('example.com')
+        self.cache.save()
+        with open(self.path) as f:
+            data = json.load(f)
+        data['version'] = 0
+        with open(self.path, 'w') as f:
+            json.dump(data, f)
+        self._find('example.com', dns_common.ZoneCache(self.path))
+        self.assertEqual(self.query.call_count, 2)
+
+    def test_get_zone_cache(self):
+        self.assertTrue(dns_common.get_zone_cache(self.path, 60) is
+                        dns_common.get_zone_cache(self.path, 60))
+        self.assertFalse(dns_common.get_zone_cache(self.path, 60) is
+                         dns_common.get_zone_cache())
+
+
 if __name__ == "__main__":
     unittest.main()  # pragma: no cover
@@ -0,0 +1,122 @@
+"""Checks that DNS records are served by the authoritative nameservers of their zone.
+
+This module requires dnspython, which is not a dependency of Certbot itself.
+
+"""
+import logging
+import socket
+import time
+
+try:
+    import dns.exception
+    import dns.flags
+    import dns.message
+    import dns.query
+    import dns.rdatatype
+    import dns.resolver
+except ImportError:  # pragma: no cover
+    dns = None  # type: ignore
+
+from certbot import errors
+
+logger = logging.getLogger(__name__)
+
+QUERY_TIMEOUT = 5
+"""Seconds to wait for the response of a nameserver to a single query."""
+
+POLL_INTERVAL = 2
+"""Seconds between two checks of the records that have not propagated yet."""
+
+
+def _resolve(qname, rdtype):
+    resolver = dns.resolver.get_default_resolver()
+    # dnspython 2.0 renamed query to resolve
+    resolve = getattr(resolver, 'resolve', resolver.query)
+    return resolve(qname, rdtype)
+
+
+def authoritative_servers(name):
+    """Finds the authoritative nameservers of the zone containing a name.
+
+    :param str name: The domain name.
+    :returns: The IP addresses of the nameservers.
+    :rtype: list
+    :raises certbot.errors.PluginError: If the nameservers cannot be found.
+    """
+    if dns is None:
+        raise errors.PluginError('dnspython is required to check DNS propagation')
+
+    try:
+        zone = dns.resolver.zone_for_name(name)
+        nameservers = [rdata.target for rdata in _resolve(zone, 'NS')]
+    except dns.exception.DNSException as e:
+        raise errors.PluginError(
+            'Unable to find the nameservers of {0}: {1}'.format(name, e))
+
+    addresses = set()
+    for nameserver in nameservers:
+        for rdtype in ('A', 'AAAA'):
+            try:
+                addresses.update(rdata.address for rdata in _resolve(nameserver, rdtype))
+            except dns.exception.DNSException as e:
+                logger.debug('No %s record for nameserver %s: %s', rdtype, nameserver, e)
+    if not addresses:
+        raise errors.PluginError(
+            'Unable to find the addresses of the nameservers of {0}'.format(name))
+    return sorted(addresses)
+
+
+def txt_values(name, server):
+    """Queries a nameserver for the TXT records of a name.
+
+    :param str name: The domain name.
+    :param str server: The IP address of the nameserver.
+    :returns: The values of the TXT records.
+    :rtype: set
+    :raises dns.exception.DNSException: If the query failed.
+    """
+    request = dns.message.make_query(name, dns.rdatatype.TXT)
+    # Turn off Recursion Desired bit in query
+    request.flags &= ~dns.flags.RD
+    response = dns.query.udp(request, server, timeout=QUERY_TIMEOUT)
+    values = set()
+    for rrset in response.answer:
+        if rrset.rdtype == dns.rdatatype.TXT:
+            for rdata in rrset:
+                values.add(b''.join(rdata.strings).decode('utf-8'))
+    return values
+
+
+def wait_for_txt_records(records, timeout):
+    """Waits until all authoritative nameservers serve the given TXT records.
+
+    :param dict records: Mapping of domain names to the set of values that
+        their TXT records must include.
+    :param float timeout: The maximum number of seconds to wait.
+    :returns: `True` if all records propagated within timeout.
+    :rtype: bool
+    :raises certbot.errors.PluginError: If the nameservers cannot be found.
+    """
+    deadline = time.time() + timeout
+    pending = {}
+    for name, values in records.items():
+        for server in authoritative_servers(name):
+            pending[(name, server)] = set(values)
+
+    while True:
+        for (name, server), values in list(pending.items()):
+            try:
+                if values.issubset(txt_values(name, server)):
+                    logger.debug('TXT records for %s found on %s', name, server)
+                    del pending[(name, server)]
+            except (dns.exception.DNSException, socket.error) as e:
+                logger.debug('Error querying %s for %s: %s', server, name, e)
+        if not pending:
+            return True
+
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            logger.debug('TXT records not propagated to: %s', ', '.join(
+                '{0} ({1})'.format(name, server) for name, server in sorted(pending)))
+            return False
+        time.sleep(min(POLL_INTERVAL, remaining))
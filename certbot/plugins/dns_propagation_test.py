@@ -0,0 +1,143 @@
+"""Tests for certbot.plugins.dns_propagation."""
+import socket
+import unittest
+
+import mock
+
+try:
+    import dns.exception
+    import dns.flags
+    import dns.resolver
+    import dns.rrset
+except ImportError:  # pragma: no cover
+    dns = None  # type: ignore
+
+from certbot import errors
+from certbot.plugins import dns_propagation
+
+NAME = '_acme-challenge.example.com'
+SERVER = '192.0.2.1'
+
+
+def _response(*values):
+    response = mock.MagicMock()
+    response.answer = [dns.rrset.from_text_list(
+        NAME + '.', 300, 'IN', 'TXT', ['"{0}"'.format(value) for value in values])]
+    return response
+
+
+class _Rdata(object):
+    # pylint: disable=too-few-public-methods
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+@unittest.skipIf(dns is None, reason='dnspython is not installed')
+class AuthoritativeServersTest(unittest.TestCase):
+    def setUp(self):
+        self.resolver = mock.MagicMock(spec=['query'])
+        self.records = {}
+        self.resolver.query.side_effect = self._query
+
+    def _query(self, qname, rdtype):
+        try:
+            return self.records[(str(qname), rdtype)]
+        except KeyError:
+            raise dns.resolver.NoAnswer()
+
+    def _call(self, name):
+        with mock.patch('dns.resolver.get_default_resolver') as mock_resolver:
+            with mock.patch('dns.resolver.zone_for_name') as mock_zone_for_name:
+                mock_resolver.return_value = self.resolver
+                mock_zone_for_name.return_value = 'example.com.'
+                return dns_propagation.authoritative_servers(name)
+
+    def test_servers(self):
+        self.records[('example.com.', 'NS')] = [_Rdata(target='ns1.example.com.'),
+                                                _Rdata(target='ns2.example.com.')]
+        self.records[('ns1.example.com.', 'A')] = [_Rdata(address='192.0.2.1')]
+        self.records[('ns1.example.com.', 'AAAA')] = [_Rdata(address='2001:db8::1')]
+        self.records[('ns2.example.com.', 'A')] = [_Rdata(address='192.0.2.2')]
+
+        self.assertEqual(self._call(NAME), ['192.0.2.1', '192.0.2.2', '2001:db8::1'])
+
+    def test_no_nameservers(self):
+        self.assertRaises(errors.PluginError, self._call, NAME)
+
+    def test_no_addresses(self):
+        self.records[('example.com.', 'NS')] = [_Rdata(target='ns1.example.com.')]
+
+        self.assertRaises(errors.PluginError, self._call, NAME)
+
+
+@unittest.skipIf(dns is None, reason='dnspython is not installed')
+class TxtValuesTest(unittest.TestCase):
+    @mock.patch('dns.query.udp')
+    def test_values(self, mock_udp):
+        mock_udp.return_value = _response('foo', 'bar')
+
+        self.assertEqual(dns_propagation.txt_values(NAME, SERVER), set(['foo', 'bar']))
+
+        request = mock_udp.call_args[0][0]
+        self.assertFalse(request.flags & dns.flags.RD)
+        self.assertEqual(mock_udp.call_args[0][1], SERVER)
+
+
+@unittest.skipIf(dns is None, reason='dnspython is not installed')
+class WaitForTxtRecordsTest(unittest.TestCase):
+    def setUp(self):
+        self.time = mock.MagicMock(spec=['time', 'sleep'])
+        mock.patch('certbot.plugins.dns_propagation.time', self.time).start()
+        self.time.time.return_value = 0
+        self.time.sleep.side_effect = self._sleep
+        self.servers = mock.patch(
+            'certbot.plugins.dns_propagation.authoritative_servers').start()
+        self.servers.return_value = ['192.0.2.1', '192.0.2.2']
+        self.values = mock.patch('certbot.plugins.dns_propagation.txt_values').start()
+
+    def tearDown(self):
+        mock.patch.stopall()
+
+    def _sleep(self, seconds):
+        self.time.time.return_value += seconds
+
+    @classmethod
+    def _call(cls, timeout=10):
+        return dns_propagation.wait_for_txt_records({NAME: set(['foo'])}, timeout)
+
+    def test_propagated(self):
+        self.values.return_value = set(['foo', 'other'])
+
+        self.assertTrue(self._call())
+        self.assertEqual(self.values.call_count, 2)
+        self.assertFalse(self.time.sleep.called)
+
+    def test_propagated_after_retries(self):
+        responses = {'192.0.2.1': [set(), set(['foo'])],
+                     '192.0.2.2': [dns.exception.Timeout(), socket.error(), set(['foo'])]}
+
+        def _txt_values(unused_name, server):
+            response = responses[server].pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+        self.values.side_effect = _txt_values
+
+        self.assertTrue(self._call())
+        self.assertEqual(self.values.call_count, 5)
+        self.assertEqual(self.time.sleep.call_count, 2)
+
+    def test_timeout(self):
+        self.values.return_value = set()
+
+        self.assertFalse(self._call(timeout=5))
+        self.assertEqual(self.time.time.return_value, 5)
+
+    def test_no_servers(self):
+        self.servers.side_effect = errors.PluginError()
+
+        self.assertRaises(errors.PluginError, self._call)
+
+
+if __name__ == "__main__":
+    unittest.main()  # pragma: no cover
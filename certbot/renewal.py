@@ -1,25 +1,37 @@
 """Functionality for autorenewal and associated juggling of configurations"""
 from __future__ import print_function
-import copy
+import collections
+import contextlib
+import functools
 import itertools
 import logging
 import os
+import threading
 import traceback
 
+from multiprocessing.pool import ThreadPool
+
+import configobj
 import six
 import zope.component
+import zope.component.hooks
+import zope.interface.registry
 
 import OpenSSL
 
 from certbot import cli
 
-from certbot import crypto_util
+from certbot import configuration
 from certbot import errors
 from certbot import interfaces
 from certbot import util
 from certbot import hooks
+from certbot import ocsp
+from certbot import renewal_index
 from certbot import storage
+from certbot.plugins import common as plugins_common
 from certbot.plugins import disco as plugins_disco
+from certbot.plugins import selection as plug_sel
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +43,7 @@ STR_CONFIG_ITEMS = ["config_dir", "logs_dir", "work_dir", "user_agent",
                     "server", "account", "authenticator", "installer",
                     "standalone_supported_challenges", "renew_hook",
                     "pre_hook", "post_hook", "tls_sni_01_address",
-                    "http01_address"]
+                    "http01_address", "key_type", "elliptic_curve"]
 INT_CONFIG_ITEMS = ["rsa_key_size", "tls_sni_01_port", "http01_port"]
 BOOL_CONFIG_ITEMS = ["must_staple", "allow_subset_of_names"]
 
@@ -252,12 +264,17 @@ def _restore_str(unused_name, value):
     return None if value == "None" else value
 
 
-def should_renew(config, lineage):
-    "Return true if any of the circumstances for automatic renewal apply."
+def should_renew(config, lineage, checker=None):
+    """Return true if any of the circumstances for automatic renewal apply.
+
+    :param ocsp.RevocationChecker checker: checker shared by the lineages
+        of the current run, or `None` to create one for the lineage
+
+    """
     if config.renew_by_default:
         logger.debug("Auto-renewal forced with --force-renewal...")
         return True
-    if lineage.should_autorenew(interactive=True):
+    if lineage.should_autorenew(interactive=True, checker=checker):
         logger.info("Cert is due for renewal, auto-renewing...")
         return True
     if config.dry_run:
@@ -362,6 +379,491 @@ def _renew_describe_results(config, renew_successes, renew_failures,
     disp.notification("\n".join(out), wrap=False)
 
 
+class _LineageSite(object):
+    """Minimal zope site holding the IConfig utility of a single lineage.
+
+    Installed with :func:`zope.component.hooks.setSite`, which is
+    thread-local, so lineages renewed concurrently each see their own
+    configuration while every other utility (e.g. IDisplay and
+    IReporter) is still looked up in the global registry.
+
+    """
+    def __init__(self, config):
+        self._site_manager = zope.interface.registry.Components(
+            bases=(zope.component.getGlobalSiteManager(),))
+        self._site_manager.registerUtility(config, interfaces.IConfig)
+
+    def getSiteManager(self):  # pylint: disable=invalid-name
+        """Returns the registry of this site."""
+        return self._site_manager
+
+
+class _PluginLocks(object):
+    """Locks the steps of concurrent renewals that use shared plugin state.
+
+    Each lineage gets its own plugin instances and configuration, so
+    ACME orders, challenge propagation and polling run concurrently.
+    Some plugins still share state outside of their instances though:
+
+    - installers parse, edit, checkpoint and reload the same server
+      configuration and all share the Reverter's directories in the
+      work directory, so installers are prepared, and their challenges
+      performed, one lineage at a time across all installers;
+    - standalone binds the same ports, and webroot and manual share
+      challenge directories and hooks, so the challenges of lineages
+      using one of them are performed one lineage at a time;
+    - DNS authenticators only change records with their provider, so
+      their challenges are never locked.
+
+    A challenge lock is held from :meth:`~.IAuthenticator.perform` until
+    the challenges are cleaned up, or the lineage is renewed.
+
+    """
+    _INSTALLERS = "installers"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locks = {}
+
+    def get(self, name):
+        """Returns the lock named name, creating it on first use."""
+        with self._lock:
+            return self._locks.setdefault(name, threading.Lock())
+
+    def prepare_lock_name(self, config, plugins):
+        """Name of the lock to hold while choosing the plugins of config.
+
+        :param configuration.NamespaceConfig config: configuration of
+            the lineage
+        :param plugins_disco.PluginsRegistry plugins: available plugins
+
+        :returns: name of the installers' lock if an installer could be
+            prepared, otherwise `None`
+        :rtype: str or None
+
+        """
+        req_auth, req_inst = plug_sel.cli_plugin_requests(config)
+        if req_auth is None:
+            # Every authenticator, installers included, may be prepared
+            return self._INSTALLERS
+        for name in (req_auth, req_inst):
+            # implementedBy | pylint: disable=no-member
+            if name in plugins and interfaces.IInstaller.implementedBy(
+                    plugins[name].plugin_cls):
+                return self._INSTALLERS
+        return None
+
+    def challenge_lock_name(self, config, plugins):
+        """Name of the lock to hold while performing challenges.
+
+        :param configuration.NamespaceConfig config: configuration of
+            the lineage, with the chosen plugins recorded
+        :param plugins_disco.PluginsRegistry plugins: available plugins
+
+        :returns: name of the lock, or `None` if none is needed
+        :rtype: str or None
+
+        """
+        # Imported here as dnspython, which it may import, is slow to import
+        from certbot.plugins import dns_common
+        name = config.authenticator
+        if name in plugins:
+            plugin_cls = plugins[name].plugin_cls
+            # implementedBy | pylint: disable=no-member
+            if interfaces.IInstaller.implementedBy(plugin_cls):
+                return self._INSTALLERS
+            if issubclass(plugin_cls, dns_common.DNSAuthenticator):
+                return None
+        return name
+
+    @contextlib.contextmanager
+    def lineage(self):
+        """Locks held while renewing a single lineage.
+
+        :returns: context manager releasing any lock still held by the
+            lineage on exit
+        :rtype: _LineageLocks
+
+        """
+        lineage_locks = _LineageLocks(self)
+        try:
+            yield lineage_locks
+        finally:
+            lineage_locks.release()
+
+
+class _LineageLocks(object):
+    """Plugin locks of a lineage renewed concurrently with others.
+
+    Passed to :func:`certbot.main.renew_cert`, which then chooses the
+    plugins through :meth:`choose_configurator_plugins`.
+
+    """
+    def __init__(self, plugin_locks):
+        self._plugin_locks = plugin_locks
+        self._held = None
+        self._outstanding = 0
+
+    def choose_configurator_plugins(self, config, plugins):
+        """Chooses the plugins of the lineage for renewal.
+
+        Like :func:`.plugins.selection.choose_configurator_plugins` with
+        the "certonly" verb, but installers are prepared holding their
+        lock and the authenticator returned holds its challenge lock, if
+        any, while it performs challenges.
+
+        :param configuration.NamespaceConfig config: configuration of
+            the lineage
+        :param plugins_disco.PluginsRegistry plugins: available plugins
+
+        :returns: (an `IInstaller` or None, an `IAuthenticator` or None)
+        :rtype: tuple
+
+        """
+        name = self._plugin_locks.prepare_lock_name(config, plugins)
+        if name is None:
+            installer, auth = plug_sel.choose_configurator_plugins(
+                config, plugins, "certonly")
+        else:
+            with self._plugin_locks.get(name):
+                installer, auth = plug_sel.choose_configurator_plugins(
+                    config, plugins, "certonly")
+        if auth is not None:
+            name = self._plugin_locks.challenge_lock_name(config, plugins)
+            if name is not None:
+                auth = _LockedAuthenticator(auth, self, name)
+        return installer, auth
+
+    def acquire(self, name, count):
+        """Holds the lock named name for count more challenges."""
+        if self._held is None:
+            self._held = self._plugin_locks.get(name)
+            self._held.acquire()
+        self._outstanding += count
+
+    def done(self, count):
+        """Releases the lock held once count more challenges are done."""
+        self._outstanding -= count
+        if self._outstanding <= 0:
+            self.release()
+
+    def release(self):
+        """Releases the lock held, if any."""
+        self._outstanding = 0
+        if self._held is not None:
+            self._held.release()
+            self._held = None
+
+
+class _LockedAuthenticator(object):
+    """Authenticator holding a lineage's challenge lock while it is in use.
+
+    The lock is acquired when challenges are performed, and released
+    once they are all cleaned up. Everything else is delegated to the
+    wrapped authenticator.
+
+    """
+    def __init__(self, auth, lineage_locks, name):
+        self._auth = auth
+        self._lineage_locks = lineage_locks
+        self._name = name
+
+    def __getattr__(self, name):
+        return getattr(self._auth, name)
+
+    def perform(self, achalls):
+        """Performs achalls holding the challenge lock."""
+        self._lineage_locks.acquire(self._name, len(achalls))
+        return self._auth.perform(achalls)
+
+    def cleanup(self, achalls):
+        """Cleans achalls up, then releases the lock if they were the last."""
+        try:
+            self._auth.cleanup(achalls)
+        finally:
+            self._lineage_locks.done(len(achalls))
+
+
+class DeferredReloads(object):
+    """Servers to reload once all the lineages of a run are renewed.
+
+    Lineages renewed with the same installer and installer options share
+    a single configuration test and reload of their server, rather than
+    reloading it after each certificate.
+
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._servers = collections.OrderedDict()
+
+    def add(self, config, installer, description):
+        """Defers reloading the server of a renewed lineage.
+
+        :param configuration.NamespaceConfig config: configuration of
+            the lineage
+        :param installer: installer chosen for the lineage
+        :type installer: interfaces.IInstaller
+        :param str description: description of the lineage to report it
+            with if its server cannot be reloaded
+
+        """
+        prefix = plugins_common.dest_namespace(config.installer)
+        key = (config.installer, tuple(sorted(
+            (name, repr(value)) for name, value in
+            six.iteritems(configuration.namespace_vars(config.namespace))
+            if name.startswith(prefix))))
+        with self._lock:
+            if key not in self._servers:
+                self._servers[key] = (config.installer, installer, [])
+            self._servers[key][2].append(description)
+
+    def reload(self):
+        """Tests the configuration of each server and reloads it, once.
+
+        :returns: descriptions of the lineages whose server could not be
+            reloaded
+        :rtype: list
+
+        """
+        failed = []
+        notify = zope.component.getUtility(interfaces.IDisplay).notification
+        for name, installer, descriptions in six.itervalues(self._servers):
+            try:
+                installer.config_test()
+                installer.restart()
+            except errors.Error as e:
+                logger.warning("Unable to reload the %s server after "
+                               "renewing %s: %s", name, ", ".join(descriptions), e)
+                logger.debug("Traceback was:\n%s", traceback.format_exc())
+                failed.extend(descriptions)
+            else:
+                notify("{0} new certificate(s) deployed with reload of {1} "
+                       "server".format(len(descriptions), name), pause=False)
+        self._servers.clear()
+        return failed
+
+
+@contextlib.contextmanager
+def _provide_lineage_config(lineage_config, isolated):
+    """Make lineage_config the IConfig utility while renewing a lineage.
+
+    :param configuration.NamespaceConfig lineage_config: configuration
+        for the current lineage
+    :param bool isolated: whether the utility should only be visible to
+        the current thread rather than replacing the global one
+
+    """
+    if not isolated:
+        # XXX: ensure that each call here replaces the previous one
+        zope.component.provideUtility(lineage_config)
+        yield
+        return
+
+    zope.component.hooks.setSite(_LineageSite(lineage_config))
+    try:
+        yield
+    finally:
+        zope.component.hooks.setSite()
+
+
+def _skip_indexed_lineage(config, renewal_file, index):
+    """Determine from the renewal index whether a lineage is not due.
+
+    :param configuration.NamespaceConfig config: configuration for the
+        current run
+    :param str renewal_file: path to the renewal configuration file
+    :param renewal_index.RenewalIndex index: index of known lineages
+
+    :returns: description of the skipped lineage if the index shows that
+        it is not due for renewal, otherwise `None`
+    :rtype: str or None
+
+    """
+    if config.renew_by_default or config.dry_run:
+        return None
+    entry = index.lookup(renewal_file)
+    if entry is None or renewal_index.is_due(entry):
+        return None
+    logger.info("Cert not yet due for renewal according to the renewal index")
+    return "%s expires on %s" % (entry["fullchain"], entry["not_after"][:10])
+
+
+def _revoked_lineages(config, conf_files, index, checker):
+    """Check the revocation status of all lineages in one concurrent pass.
+
+    The OCSP responses are cached in the work directory, so the checks
+    later made by :meth:`storage.RenewableCert.should_autorenew` for each
+    lineage do not query the OCSP responders again. Responses obtained
+    with the openssl binary are not cached, so no lineage is checked
+    here when checker has to use it.
+
+    :param configuration.NamespaceConfig config: configuration for the
+        current run
+    :param list conf_files: paths to renewal configuration files
+    :param renewal_index.RenewalIndex index: index of known lineages
+    :param ocsp.RevocationChecker checker: checker for the current run
+
+    :returns: paths to the renewal configuration files of the lineages
+        whose certificate is revoked
+    :rtype: set
+
+    """
+    if config.renew_by_default or config.dry_run or checker.use_openssl_binary:
+        return set()
+    lineages = []
+    for renewal_file in conf_files:
+        entry = index.lookup(renewal_file)
+        if entry is not None:
+            lineages.append((renewal_file, (entry["cert"], entry["chain"])))
+            continue
+        # Lineages that fail to parse here are reported by _renew_lineage
+        try:
+            renewal_config = configobj.ConfigObj(renewal_file)
+            lineages.append((renewal_file, (renewal_config["cert"],
+                                            renewal_config["chain"])))
+        except (configobj.ConfigObjError, KeyError, IOError):
+            continue
+
+    statuses = checker.ocsp_revoked_all([paths for _, paths in lineages])
+    revoked = set(renewal_file for (renewal_file, _), status
+                  in zip(lineages, statuses) if status)
+    if revoked:
+        logger.warning("The certificates of the following lineages are "
+                       "revoked: %s", ", ".join(sorted(
+                           storage.lineagename_for_filename(renewal_file)
+                           for renewal_file in revoked)))
+    return revoked
+
+
+def _renew_lineage(config, renewal_file, index=None, revoked=frozenset(),
+                   reloads=None, plugin_locks=None, checker=None):
+    # pylint: disable=too-many-arguments,too-many-locals
+    """Reconstitute the lineage in renewal_file and renew it if it is due.
+
+    :param configuration.NamespaceConfig config: configuration for the
+        current run, which is copied rather than modified
+    :param str renewal_file: path to the renewal configuration file
+    :param renewal_index.RenewalIndex index: index used to skip lineages
+        that are known not to be due without reconstituting them
+    :param set revoked: paths to the renewal configuration files of
+        lineages known to be revoked, which are never skipped by index
+    :param ocsp.RevocationChecker checker: checker shared by the lineages
+        of the current run
+    :param DeferredReloads reloads: if given, the server of a renewed
+        lineage is added to it rather than reloaded right away
+    :param _PluginLocks plugin_locks: locks shared with the lineages
+        renewed concurrently, in which case the lineage's configuration
+        is only provided as the IConfig utility to the current thread and
+        the steps of its renewal using shared plugin state are locked
+
+    :returns: the outcome of the renewal attempt, which is one of
+        "success", "failure", "skipped" or "parsefail", and the
+        description of the lineage to report it with
+    :rtype: `tuple` of `str`
+
+    """
+    zope.component.getUtility(interfaces.IDisplay).notification(
+        "Processing " + renewal_file, pause=False)
+    if index is not None and renewal_file not in revoked:
+        skipped = _skip_indexed_lineage(config, renewal_file, index)
+        if skipped is not None:
+            return "skipped", skipped
+
+    lineage_config = config.overlay()
+    lineagename = storage.lineagename_for_filename(renewal_file)
+
+    # Note that this modifies config (to add back the configuration
+    # elements from within the renewal configuration file).
+    try:
+        renewal_candidate = _reconstitute(lineage_config, renewal_file)
+    except Exception as e:  # pylint: disable=broad-except
+        logger.warning("Renewal configuration file %s (cert: %s) "
+                       "produced an unexpected error: %s. Skipping.",
+                       renewal_file, lineagename, e)
+        logger.debug("Traceback was:\n%s", traceback.format_exc())
+        return "parsefail", renewal_file
+
+    if renewal_candidate is None:
+        return "parsefail", renewal_file
+
+    try:
+        with _provide_lineage_config(lineage_config,
+                                     isolated=plugin_locks is not None):
+            renewal_candidate.ensure_deployed()
+            if should_renew(lineage_config, renewal_candidate, checker):
+                plugins = plugins_disco.PluginsRegistry.find_all()
+                from certbot import main
+                # domains have been restored into lineage_config by reconstitute
+                # but they're unnecessary anyway because renew_cert here
+                # will just grab them from the certificate
+                # we already know it's time to renew based on should_renew
+                # and we have a lineage in renewal_candidate
+                if plugin_locks is None:
+                    main.renew_cert(lineage_config, plugins,
+                                    renewal_candidate, reloads)
+                else:
+                    with plugin_locks.lineage() as lineage_locks:
+                        main.renew_cert(lineage_config, plugins,
+                                        renewal_candidate, reloads,
+                                        lineage_locks)
+                return "success", renewal_candidate.fullchain
+            else:
+                expiry = renewal_candidate.cert_info(
+                    renewal_candidate.latest_common_version()).not_after
+                if index is not None:
+                    index.record(renewal_file, renewal_candidate, expiry)
+                return "skipped", "%s expires on %s" % (
+                    renewal_candidate.fullchain, expiry.strftime("%Y-%m-%d"))
+    except Exception as e:  # pylint: disable=broad-except
+        # obtain_cert (presumably) encountered an unanticipated problem.
+        logger.warning("Attempting to renew cert (%s) from %s produced an "
+                       "unexpected error: %s. Skipping.", lineagename,
+                           renewal_file, e)
+        logger.debug("Traceback was:\n%s", traceback.format_exc())
+        return "failure", renewal_candidate.fullchain
+
+
+def _renew_lineages_in_parallel(config, conf_files, index, revoked, reloads,
+                                checker):
+    # pylint: disable=too-many-arguments
+    """Run :func:`_renew_lineage` for conf_files in a pool of threads.
+
+    The steps of the renewals that use state shared by plugins are still
+    run one lineage at a time, see :class:`_PluginLocks`.
+
+    :param configuration.NamespaceConfig config: configuration for the
+        current run
+    :param list conf_files: paths to renewal configuration files
+    :param renewal_index.RenewalIndex index: index of known lineages
+    :param set revoked: renewal configuration files of revoked lineages
+    :param DeferredReloads reloads: servers to reload after the renewals
+    :param ocsp.RevocationChecker checker: checker shared by the lineages
+
+    :returns: the results of :func:`_renew_lineage` in the order of
+        conf_files
+    :rtype: `list` of `tuple`
+
+    """
+    # The option provenance detector is built lazily on first use;
+    # do it once here rather than racing to build it in every worker
+    cli.set_by_cli("authenticator")
+
+    # Make IConfig lookups respect the thread-local site of each worker
+    zope.component.hooks.setHooks()
+    pool = ThreadPool(min(config.parallel_renewals, len(conf_files)))
+    try:
+        return pool.map(
+            functools.partial(_renew_lineage, config,
+                              index=index, revoked=revoked,
+                              reloads=reloads, plugin_locks=_PluginLocks(),
+                              checker=checker),
+            conf_files)
+    finally:
+        pool.close()
+        pool.join()
+        zope.component.hooks.resetHooks()
+
+
 def handle_renewal_request(config):
     """Examine each lineage; renew if due and report results"""
 
@@ -382,61 +884,39 @@ def handle_renewal_request(config):
     else:
         conf_files = storage.renewal_conf_files(config)
 
-    renew_successes = []
-    renew_failures = []
-    renew_skipped = []
-    parse_failures = []
-    for renewal_file in conf_files:
-        disp = zope.component.getUtility(interfaces.IDisplay)
-        disp.notification("Processing " + renewal_file, pause=False)
-        lineage_config = copy.deepcopy(config)
-        lineagename = storage.lineagename_for_filename(renewal_file)
-
-        # Note that this modifies config (to add back the configuration
-        # elements from within the renewal configuration file).
-        try:
-            renewal_candidate = _reconstitute(lineage_config, renewal_file)
-        except Exception as e:  # pylint: disable=broad-except
-            logger.warning("Renewal configuration file %s (cert: %s) "
-                           "produced an unexpected error: %s. Skipping.",
-                           renewal_file, lineagename, e)
-            logger.debug("Traceback was:\n%s", traceback.format_exc())
-            parse_failures.append(renewal_file)
-            continue
-
-        try:
-            if renewal_candidate is None:
-                parse_failures.append(renewal_file)
-            else:
-                # XXX: ensure that each call here replaces the previous one
-                zope.component.provideUtility(lineage_config)
-                renewal_candidate.ensure_deployed()
-                if should_renew(lineage_config, renewal_candidate):
-                    plugins = plugins_disco.PluginsRegistry.find_all()
-                    from certbot import main
-                    # domains have been restored into lineage_config by reconstitute
-                    # but they're unnecessary anyway because renew_cert here
-                    # will just grab them from the certificate
-                    # we already know it's time to renew based on should_renew
-                    # and we have a lineage in renewal_candidate
-                    main.renew_cert(lineage_config, plugins, renewal_candidate)
-                    renew_successes.append(renewal_candidate.fullchain)
-                else:
-                    expiry = crypto_util.notAfter(renewal_candidate.version(
-                        "cert", renewal_candidate.latest_common_version()))
-                    renew_skipped.append("%s expires on %s" % (renewal_candidate.fullchain,
-                                         expiry.strftime("%Y-%m-%d")))
-        except Exception as e:  # pylint: disable=broad-except
-            # obtain_cert (presumably) encountered an unanticipated problem.
-            logger.warning("Attempting to renew cert (%s) from %s produced an "
-                           "unexpected error: %s. Skipping.", lineagename,
-                               renewal_file, e)
-            logger.debug("Traceback was:\n%s", traceback.format_exc())
-            renew_failures.append(renewal_candidate.fullchain)
+    index = renewal_index.RenewalIndex.from_config(config)
+    checker = ocsp.RevocationChecker.from_config(config)
+    revoked = _revoked_lineages(config, conf_files, index, checker)
+    reloads = DeferredReloads()
+    try:
+        if config.parallel_renewals > 1 and len(conf_files) > 1:
+            results = _renew_lineages_in_parallel(
+                config, conf_files, index, revoked, reloads, checker)
+        else:
+            results = [_renew_lineage(config, renewal_file, index=index,
+                                      revoked=revoked, reloads=reloads,
+                                      checker=checker)
+                       for renewal_file in conf_files]
+    finally:
+        index.save()
+    # The certificates are saved even if their server fails to reload
+    reload_failures = set(reloads.reload())
+    results = [("failure", description)
+               if category == "success" and description in reload_failures
+               else (category, description)
+               for category, description in results]
+
+    outcomes = dict((category, []) for category in
+                    ("success", "failure", "skipped", "parsefail"))
+    for category, description in results:
+        outcomes[category].append(description)
+    renew_successes = outcomes["success"]
+    renew_failures = outcomes["failure"]
+    parse_failures = outcomes["parsefail"]
 
     # Describe all the results
     _renew_describe_results(config, renew_successes, renew_failures,
-                            renew_skipped, parse_failures)
+                            outcomes["skipped"], parse_failures)
 
     if renew_failures or parse_failures:
         raise errors.Error("{0} renew failure(s), {1} parse failure(s)".format(
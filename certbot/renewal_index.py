@@ -0,0 +1,182 @@
+"""Persistent index of lineage facts used to skip renewal checks."""
+import datetime
+import json
+import logging
+import os
+import tempfile
+import threading
+
+import pyrfc3339
+import pytz
+
+from certbot import constants
+from certbot import storage
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 2
+"""Version of the on-disk format, entries in other formats are discarded."""
+
+
+def _signature(paths):
+    """Cheaply summarizes the state of the files at paths.
+
+    :param list paths: paths to files or directories
+
+    :returns: inode, size and modification time of each path or `None`
+        if one of the paths cannot be examined
+    :rtype: `list` of `list` or None
+
+    """
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        signature.append([st.st_ino, st.st_size, st.st_mtime])
+    return signature
+
+
+class RenewalIndex(object):
+    """Index of facts about each lineage known from a previous run.
+
+    Entries record the paths, notAfter date, names and version of the
+    most recent certificate of a lineage along with a signature of the files
+    they were computed from. An entry is only returned by :meth:`lookup`
+    while the renewal configuration file, the archive and live
+    directories and the certificate file are unchanged, so that any
+    modification of a lineage causes it to be fully reconstituted again.
+
+    """
+    def __init__(self, path):
+        """Loads the index stored at path.
+
+        :param str path: path to the index file
+
+        """
+        self.path = path
+        self._entries = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        try:
+            with open(path) as index_file:
+                data = json.load(index_file)
+            if data.get("version") == FORMAT_VERSION:
+                self._entries = data["lineages"]
+        except (IOError, OSError, ValueError, KeyError, AttributeError) as error:
+            logger.debug("Not using renewal index %s: %s", path, error)
+
+    @classmethod
+    def from_config(cls, config):
+        """Loads the index of the lineages in config.
+
+        :param certbot.interfaces.IConfig config: Configuration object
+
+        :rtype: `RenewalIndex`
+
+        """
+        return cls(os.path.join(config.config_dir, constants.RENEWAL_INDEX))
+
+    @staticmethod
+    def _paths(renewal_file, entry):
+        return (renewal_file, entry["archive_dir"], entry["live_dir"],
+                entry["cert"])
+
+    def lookup(self, renewal_file):
+        """Returns the entry for renewal_file if it is still valid.
+
+        :param str renewal_file: path to a renewal configuration file
+
+        :returns: the recorded facts about the lineage, or `None` if there
+            are none or the lineage has changed since they were recorded
+        :rtype: dict or None
+
+        """
+        entry = self._entries.get(os.path.abspath(renewal_file))
+        if entry is None:
+            return None
+        try:
+            signature = _signature(self._paths(renewal_file, entry))
+        except (KeyError, TypeError):
+            signature = None
+        if signature is None or signature != entry.get("signature"):
+            logger.debug("Renewal index entry for %s is stale", renewal_file)
+            return None
+        return entry
+
+    def record(self, renewal_file, lineage, not_after):
+        """Records the current state of lineage.
+
+        :param str renewal_file: path to the renewal configuration file
+            that defines lineage
+        :param storage.RenewableCert lineage: lineage that was examined
+        :param datetime.datetime not_after: expiry of the most recent
+            certificate in lineage
+
+        """
+        version = lineage.latest_common_version()
+        cert = lineage.version("cert", version)
+        entry = {
+            "archive_dir": lineage.archive_dir,
+            "live_dir": lineage.live_dir,
+            "cert": cert,
+            "chain": lineage.version("chain", version),
+            "fullchain": lineage.fullchain,
+            "version": version,
+            "names": lineage.names(version),
+            "not_after": pyrfc3339.generate(not_after, accept_naive=True),
+            "renew_before_expiry": lineage.configuration.get(
+                "renew_before_expiry",
+                constants.RENEWER_DEFAULTS["renew_before_expiry"]),
+        }
+        entry["signature"] = _signature(self._paths(renewal_file, entry))
+        if entry["signature"] is None:
+            return
+        with self._lock:
+            self._entries[os.path.abspath(renewal_file)] = entry
+            self._dirty = True
+
+    def save(self):
+        """Writes the index back to disk if it was modified.
+
+        Failing to write the index is not fatal as it is only used to
+        avoid work on later runs.
+
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = dict((path, entry) for path, entry
+                           in self._entries.items() if os.path.exists(path))
+            try:
+                fd, temp_path = tempfile.mkstemp(
+                    dir=os.path.dirname(self.path), prefix=".renewal-index")
+                with os.fdopen(fd, "w") as index_file:
+                    json.dump({"version": FORMAT_VERSION, "lineages": entries},
+                              index_file)
+                os.chmod(temp_path, 0o644)
+                os.rename(temp_path, self.path)
+            except (IOError, OSError) as error:
+                logger.warning("Unable to save renewal index %s: %s",
+                               self.path, error)
+            else:
+                self._entries = entries
+                self._dirty = False
+
+
+def is_due(entry):
+    """Is the lineage described by entry due for renewal?
+
+    This mirrors the expiry check of
+    :meth:`certbot.storage.RenewableCert.should_autorenew`.
+
+    :param dict entry: entry returned by :meth:`RenewalIndex.lookup`
+
+    :rtype: bool
+
+    """
+    expiry = pyrfc3339.parse(entry["not_after"])
+    now = pytz.UTC.fromutc(datetime.datetime.utcnow())
+    return expiry < storage.add_time_interval(
+        now, entry["renew_before_expiry"])
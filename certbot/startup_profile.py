@@ -0,0 +1,140 @@
+"""Measurement of the time Certbot takes to start up.
+
+This backs the ``--profile-startup`` diagnostic. Imports are timed in a
+fresh interpreter, so they are measured cold whatever was already
+imported by the running process, while the phases of command line
+parsing are timed in process with :func:`phase`.
+
+"""
+from __future__ import print_function
+import contextlib
+import re
+import subprocess
+import sys
+import time
+
+FLAG = "--profile-startup"
+"""Command line flag enabling the diagnostic."""
+
+MAX_REPORTED_IMPORTS = 20
+"""Number of slowest imports included in the report."""
+
+_PHASES = []
+"""Name and duration in seconds of the phases timed so far."""
+
+_enabled = False
+
+
+def enable():
+    """Starts recording the duration of startup phases."""
+    global _enabled  # pylint: disable=global-statement
+    _enabled = True
+
+
+def enabled():
+    """Is the duration of startup phases being recorded?
+
+    :rtype: bool
+
+    """
+    return _enabled
+
+
+@contextlib.contextmanager
+def phase(name):
+    """Records how long the enclosed block takes if profiling is enabled.
+
+    :param str name: description of the phase
+
+    """
+    if not _enabled:
+        yield
+        return
+    start = time.time()
+    try:
+        yield
+    finally:
+        _PHASES.append((name, time.time() - start))
+
+
+def phases():
+    """Returns the phases recorded so far.
+
+    :returns: name and duration in seconds of each phase, in the order
+        they ended
+    :rtype: `list` of `tuple`
+
+    """
+    return list(_PHASES)
+
+
+def import_times(module="certbot.main"):
+    """Measures how long importing module takes in a new interpreter.
+
+    On Python 3.7 and later, the cumulative time of every module imported
+    along the way is reported by ``-X importtime``. On older versions,
+    only the total is known.
+
+    :param str module: name of the module to import
+
+    :returns: name and cumulative import time in seconds of each
+        imported module, slowest first
+    :rtype: `list` of `tuple`
+
+    """
+    code = "import {0}".format(module)
+    if sys.version_info >= (3, 7):
+        process = subprocess.Popen(
+            [sys.executable, "-X", "importtime", "-c", code],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True)
+        _out, err = process.communicate()
+        return _parse_importtime(err)
+    start = time.time()
+    subprocess.call([sys.executable, "-c", code])
+    return [(module, time.time() - start)]
+
+
+def _parse_importtime(output):
+    """Parses the output of ``python -X importtime``.
+
+    :param str output: lines like
+        ``import time:  self [us] | cumulative | imported package``
+
+    :returns: name and cumulative time in seconds of each module, slowest
+        first
+    :rtype: `list` of `tuple`
+
+    """
+    times = []
+    for line in output.splitlines():
+        match = re.match(r"import time:\s*(\d+) \|\s*(\d+) \| (\s*)(\S+)", line)
+        if match:
+            times.append((match.group(4), int(match.group(2)) / 1e6))
+    return sorted(times, key=lambda module_time: -module_time[1])
+
+
+def report(imports=None):
+    """Formats the startup profile.
+
+    :param list imports: result of :func:`import_times`, which is
+        measured if not given
+
+    :returns: human readable report
+    :rtype: str
+
+    """
+    if imports is None:
+        imports = import_times()
+    lines = ["Startup profile", "", "Slowest imports (cumulative, cold):"]
+    lines.extend("  {0:8.3f}s  {1}".format(seconds, module)
+                 for module, seconds in imports[:MAX_REPORTED_IMPORTS])
+    lines.extend(["", "Command line parsing phases:"])
+    lines.extend("  {0:8.3f}s  {1}".format(seconds, name)
+                 for name, seconds in _PHASES)
+    return "\n".join(lines)
+
+
+def print_report():
+    """Prints the startup profile, e.g. when Certbot exits."""
+    print(report())
@@ -14,10 +14,12 @@ import six
 
 import certbot
 from certbot import cli
+from certbot import configuration
 from certbot import constants
 from certbot import crypto_util
 from certbot import errors
 from certbot import error_handler
+from certbot import ocsp
 from certbot import util
 
 from certbot.plugins import common as plugins_common
@@ -186,7 +188,8 @@ def update_configuration(lineagename, archive_dir, target, cli_config):
         os.unlink(temp_filename)
 
     # Save only the config items that are relevant to renewal
-    values = relevant_values(vars(cli_config.namespace))
+    values = relevant_values(
+        configuration.namespace_vars(cli_config.namespace))
     write_renewal_config(config_filename, temp_filename, archive_dir, target, values)
     os.rename(temp_filename, config_filename)
 
@@ -427,6 +430,8 @@ class RenewableCert(object):
         self.chain = self.configuration["chain"]
         self.fullchain = self.configuration["fullchain"]
         self.live_dir = os.path.dirname(self.cert)
+        # Parsed certificates by path, see cert_info()
+        self._cert_info = {}
 
         self._fix_symlinks()
         if update_symlinks:
@@ -460,7 +465,7 @@ class RenewableCert(object):
         :returns: Expiration datetime of the current target certificate
         :rtype: :class:`datetime.datetime`
         """
-        return crypto_util.notAfter(self.current_target("cert"))
+        return self.cert_info().not_after
 
     @property
     def archive_dir(self):
@@ -829,6 +834,7 @@ class RenewableCert(object):
 
             for _, link in previous_links:
                 os.unlink(link)
+        self._cert_info.clear()
 
     def names(self, version=None):
         """What are the subject names of this certificate?
@@ -840,6 +846,23 @@ class RenewableCert(object):
         :rtype: `list` of `str`
         :raises .CertStorageError: if could not find cert file.
 
+        """
+        return list(self.cert_info(version).names)
+
+    def cert_info(self, version=None):
+        """Facts parsed from the specified cert version.
+
+        (If no version is specified, use the current version.)
+
+        Certificates are only parsed once per version, until the
+        certificate file changes or this lineage is modified.
+
+        :param int version: the desired version number
+        :returns: the names, notBefore, notAfter, serial number and
+            fingerprint of the certificate
+        :rtype: `certbot.crypto_util.CertInfo`
+        :raises .CertStorageError: if could not find cert file.
+
         """
         if version is None:
             target = self.current_target("cert")
@@ -847,8 +870,16 @@ class RenewableCert(object):
             target = self.version("cert", version)
         if target is None:
             raise errors.CertStorageError("could not find cert file")
-        with open(target) as f:
-            return crypto_util.get_names_from_cert(f.read())
+        try:
+            st = os.stat(target)
+        except OSError:
+            raise errors.CertStorageError("could not find cert file")
+        signature = (st.st_ino, st.st_size, st.st_mtime)
+        cached = self._cert_info.get(target)
+        if cached is None or cached[0] != signature:
+            cached = (signature, crypto_util.get_cert_info(target))
+            self._cert_info[target] = cached
+        return cached[1]
 
     def autodeployment_is_enabled(self):
         """Is automatic deployment enabled for this cert?
@@ -889,27 +920,29 @@ class RenewableCert(object):
                     return True
         return False
 
-    def ocsp_revoked(self, version=None):
-        # pylint: disable=no-self-use,unused-argument
+    def ocsp_revoked(self, version=None, checker=None):
         """Is the specified cert version revoked according to OCSP?
 
-        Also returns True if the cert version is declared as intended
-        to be revoked according to Let's Encrypt OCSP extensions.
-        (If no version is specified, uses the current version.)
-
-        This method is not yet implemented and currently always returns
-        False.
+        OCSP responses are cached in the work directory, keyed by issuer
+        and serial number, until their nextUpdate so repeated checks do
+        not query the OCSP responder again. (If no version is specified,
+        uses the current version.)
 
         :param int version: the desired version number
+        :param ocsp.RevocationChecker checker: checker to use, so that
+            it is not set up again for each lineage. A checker caching
+            responses in the work directory is created if not provided.
 
-        :returns: whether the certificate is or will be revoked
+        :returns: whether the certificate is revoked
         :rtype: bool
 
         """
-        # XXX: This query and its associated network service aren't
-        # implemented yet, so we currently return False (indicating that the
-        # certificate is not revoked).
-        return False
+        if version is None:
+            version = self.current_version("cert")
+        if checker is None:
+            checker = ocsp.RevocationChecker.from_config(self.cli_config)
+        return checker.ocsp_revoked(self.version("cert", version),
+                                    self.version("chain", version))
 
     def autorenewal_is_enabled(self):
         """Is automatic renewal enabled for this cert?
@@ -923,7 +956,7 @@ class RenewableCert(object):
         return ("autorenew" not in self.configuration or
                 self.configuration.as_bool("autorenew"))
 
-    def should_autorenew(self, interactive=False):
+    def should_autorenew(self, interactive=False, checker=None):
         """Should we now try to autorenew the most recent cert version?
 
         This is a policy question and does not only depend on whether
@@ -937,6 +970,8 @@ class RenewableCert(object):
         :param bool interactive: set to True to examine the question
             regardless of whether the renewal configuration allows
             automated renewal (for interactive use). Default False.
+        :param ocsp.RevocationChecker checker: checker used to find out
+            whether the cert is revoked, see :meth:`ocsp_revoked`
 
         :returns: whether an attempt should now be made to autorenew the
             most current cert version in this lineage
@@ -947,15 +982,14 @@ class RenewableCert(object):
             # Consider whether to attempt to autorenew this cert now
 
             # Renewals on the basis of revocation
-            if self.ocsp_revoked(self.latest_common_version()):
+            if self.ocsp_revoked(self.latest_common_version(), checker):
                 logger.debug("Should renew, certificate is revoked.")
                 return True
 
             # Renews some period before expiry time
             default_interval = constants.RENEWER_DEFAULTS["renew_before_expiry"]
             interval = self.configuration.get("renew_before_expiry", default_interval)
-            expiry = crypto_util.notAfter(self.version(
-                "cert", self.latest_common_version()))
+            expiry = self.cert_info(self.latest_common_version()).not_after
             now = pytz.UTC.fromutc(datetime.datetime.utcnow())
             if expiry < add_time_interval(now, interval):
                 logger.debug("Should renew, less than %s before certificate "
@@ -1061,7 +1095,8 @@ class RenewableCert(object):
         config_file.close()
 
         # Save only the config items that are relevant to renewal
-        values = relevant_values(vars(cli_config.namespace))
+        values = relevant_values(
+            configuration.namespace_vars(cli_config.namespace))
 
         new_config = write_renewal_config(config_filename, config_filename, archive,
             target, values)
@@ -1139,5 +1174,6 @@ class RenewableCert(object):
         self.configfile = update_configuration(
             self.lineagename, self.archive_dir, symlinks, cli_config)
         self.configuration = config_with_defaults(self.configfile)
+        self._cert_info.clear()
 
         return target_version
@@ -10,6 +10,7 @@ import zope.component
 from acme import challenges
 from acme import client as acme_client
 from acme import messages
+from acme import polling
 
 from certbot import achallenges
 from certbot import errors
@@ -278,7 +279,7 @@ class HandleAuthorizationsTest(unittest.TestCase):
         self.assertRaises(
             errors.AuthorizationError, self.handler.handle_authorizations, mock_order)
 
-    def _validate_all(self, unused_1, unused_2):
+    def _validate_all(self, unused_1, unused_2, unused_3):
         for i, aauthzr in enumerate(self.handler.aauthzrs):
             azr = aauthzr.authzr
             updated_azr = acme_util.gen_authzr(
@@ -300,6 +301,7 @@ class PollChallengesTest(unittest.TestCase):
 
         # Account and network are mocked...
         self.mock_net = mock.MagicMock()
+        self.mock_net.polling_policy = polling.PollingPolicy()
         self.handler = AuthHandler(
             None, self.mock_net, mock.Mock(key="mock_key"), [])
 
@@ -329,6 +331,33 @@ class PollChallengesTest(unittest.TestCase):
         for aauthzr in self.handler.aauthzrs:
             self.assertEqual(aauthzr.authzr.body.status, messages.STATUS_VALID)
 
+    @mock.patch("certbot.auth_handler.time")
+    def test_poll_challenges_policy(self, mock_time):
+        self.mock_net.polling_policy = polling.PollingPolicy(
+            initial_delay=60, max_delay=60)
+        self.mock_net.poll.side_effect = self._mock_poll_solve_one_valid
+        self.handler._poll_challenges(self.chall_update, False, "order")
+
+        # 2 challenges for the first domain and 3 for the others
+        self.assertEqual(mock_time.sleep.call_count, 3)
+        for call in mock_time.sleep.call_args_list:
+            self.assertTrue(call[0][0] > 40)
+        self.assertEqual(
+            self.mock_net.polling_policy.polls["order"], 2 + 3 + 3)
+
+    @mock.patch("certbot.auth_handler.time")
+    def test_poll_challenges_retry_after(self, mock_time):
+        def poll(authzr):
+            """Poll with a Retry-After header set to 0."""
+            authzr, response = self._mock_poll_solve_one_valid(authzr)
+            response.headers["Retry-After"] = "0"
+            return authzr, response
+        self.mock_net.polling_policy = polling.PollingPolicy(
+            initial_delay=0)
+        self.mock_net.poll.side_effect = poll
+        self.handler._poll_challenges(self.chall_update, False)
+        self.assertFalse(mock_time.sleep.called)
+
     @mock.patch("certbot.auth_handler.time")
     def test_poll_challenges_failure_best_effort(self, unused_mock_time):
         self.mock_net.poll.side_effect = self._mock_poll_solve_one_invalid
@@ -343,7 +372,8 @@ class PollChallengesTest(unittest.TestCase):
         self.mock_net.poll.side_effect = self._mock_poll_solve_one_invalid
         self.assertRaises(
             errors.AuthorizationError, self.handler._poll_challenges,
-            self.chall_update, False)
+            self.chall_update, False, "order")
+        self.assertFalse("order" in self.mock_net.polling_policy.polls)
 
     @mock.patch("certbot.auth_handler.time")
     def test_unable_to_find_challenge_status(self, unused_mock_time):
@@ -401,7 +431,7 @@ class PollChallengesTest(unittest.TestCase):
                 status=status_,
             ),
         )
-        return (new_authzr, "response")
+        return (new_authzr, mock.MagicMock(headers={}))
 
 
 class ChallbToAchallTest(unittest.TestCase):
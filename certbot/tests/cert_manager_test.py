@@ -219,7 +219,8 @@ class CertificatesTest(BaseCertManagerTest):
         # pylint: disable=protected-access
         get_report = lambda: cert_manager._report_human_readable(mock_config, parsed_certs)
 
-        mock_config = mock.MagicMock(certname=None, lineagename=None)
+        mock_config = mock.MagicMock(certname=None, lineagename=None,
+                                     work_dir=self.tempdir)
         # pylint: disable=protected-access
         out = get_report()
         self.assertTrue("INVALID: EXPIRED" in out)
@@ -430,6 +430,34 @@ class ParseTest(unittest.TestCase):  # pylint: disable=too-many-public-methods
         self.assertRaises(errors.Error, self.parse,
                           "--allow-subset-of-names -d *.example.org".split())
 
+    def test_argparse_type(self):
+        self.parse(["renew"])
+        self.assertEqual(cli.argparse_type("rsa_key_size"), int)
+        self.assertEqual(cli.argparse_type("not_an_option"), str)
+
+    def test_pluginless_verb_skips_plugin_options(self):
+        namespace = self.parse(["certificates"])
+        self.assertFalse(hasattr(namespace, "manual_auth_hook"))
+        self.assertTrue(hasattr(namespace, "manual"))
+
+        namespace = self.parse(["certonly"])
+        self.assertTrue(hasattr(namespace, "manual_auth_hook"))
+
+    @mock.patch("certbot.plugins.disco._PLUGIN_CLASSES", {})
+    @mock.patch("certbot.plugins.disco._ENTRY_POINTS", None)
+    def test_pluginless_verb_imports_no_plugin(self):
+        with mock.patch("pkg_resources.EntryPoint.load") as mock_load:
+            plugins = disco.PluginsRegistry.find_all()
+            with test_util.patch_get_utility():
+                cli.prepare_and_parse_args(plugins, ["certificates"])
+        self.assertTrue("standalone" in plugins)
+        self.assertFalse(mock_load.called)
+
+    def test_pluginless_verb_with_plugin_option(self):
+        namespace = self.parse(["certificates", "--manual-auth-hook", "foo"])
+        self.assertEqual(namespace.manual_auth_hook, "foo")
+        self.assertEqual(namespace.verb, "certificates")
+
 
 class DefaultTest(unittest.TestCase):
     """Tests for certbot.cli._Default."""
@@ -462,6 +490,17 @@ class SetByCliTest(unittest.TestCase):
         self.assertTrue(_call_set_by_cli(
             'renew_hook', '--deploy-hook foo'.split(), 'renew'))
 
+    def test_computed_once(self):
+        with mock.patch('certbot.cli.prepare_and_parse_args',
+                        wraps=cli.prepare_and_parse_args) as mock_parse:
+            args = '--deploy-hook foo'.split()
+            self.assertTrue(_call_set_by_cli('deploy_hook', args, 'renew'))
+            self.assertTrue(_call_set_by_cli('renew_hook', args, 'renew'))
+            self.assertFalse(_call_set_by_cli('dry_run', args, 'renew'))
+            self.assertFalse(_call_set_by_cli('not_an_option', args, 'renew'))
+        self.assertEqual(mock_parse.call_count, 1)
+        self.assertTrue(isinstance(cli.set_by_cli.detector, frozenset))
+
     def test_webroot_map(self):
         args = '-w /var/www/html -d example.com'.split()
         verb = 'renew'
@@ -205,12 +205,48 @@ class ClientTest(ClientTestCommon):
         self._test_obtain_certificate_common(mock.sentinel.key, csr)
 
         mock_crypto_util.init_save_key.assert_called_once_with(
-            self.config.rsa_key_size, self.config.key_dir)
+            self.config.rsa_key_size, self.config.key_dir, key_pool=None,
+            key_type="rsa", elliptic_curve="secp256r1")
         mock_crypto_util.init_save_csr.assert_called_once_with(
             mock.sentinel.key, self.eg_domains, self.config.csr_dir)
         mock_crypto_util.cert_and_chain_from_fullchain.assert_called_once_with(
             mock.sentinel.fullchain_pem)
 
+    @mock.patch("certbot.client.key_pool.get")
+    @mock.patch("certbot.client.crypto_util")
+    def test_obtain_certificate_key_pool(self, mock_crypto_util, mock_get_pool):
+        csr = util.CSR(form="pem", file=None, data=CSR_SAN)
+        mock_crypto_util.init_save_csr.return_value = csr
+        mock_crypto_util.init_save_key.return_value = mock.sentinel.key
+        mock_crypto_util.cert_and_chain_from_fullchain.return_value = (mock.sentinel.cert,
+            mock.sentinel.chain)
+
+        self._test_obtain_certificate_common(mock.sentinel.key, csr)
+
+        mock_get_pool.assert_called_once_with(self.config)
+        mock_crypto_util.init_save_key.assert_called_once_with(
+            self.config.rsa_key_size, self.config.key_dir,
+            key_pool=mock_get_pool.return_value,
+            key_type="rsa", elliptic_curve="secp256r1")
+
+    @mock.patch("certbot.client.key_pool.get")
+    @mock.patch("certbot.client.crypto_util")
+    def test_obtain_certificate_ecdsa(self, mock_crypto_util, mock_get_pool):
+        csr = util.CSR(form="pem", file=None, data=CSR_SAN)
+        mock_crypto_util.init_save_csr.return_value = csr
+        mock_crypto_util.init_save_key.return_value = mock.sentinel.key
+        mock_crypto_util.cert_and_chain_from_fullchain.return_value = (mock.sentinel.cert,
+            mock.sentinel.chain)
+        self.config.key_type = "ecdsa"
+        self.config.elliptic_curve = "secp384r1"
+
+        self._test_obtain_certificate_common(mock.sentinel.key, csr)
+
+        self.assertFalse(mock_get_pool.called)
+        mock_crypto_util.init_save_key.assert_called_once_with(
+            self.config.rsa_key_size, self.config.key_dir, key_pool=None,
+            key_type="ecdsa", elliptic_curve="secp384r1")
+
     @mock.patch("certbot.client.crypto_util")
     @mock.patch("os.remove")
     def test_obtain_certificate_partial_success(self, mock_remove, mock_crypto_util):
@@ -230,9 +266,11 @@ class ClientTest(ClientTestCommon):
         self.assertEqual(mock_remove.call_count, 2)
         self.assertEqual(mock_crypto_util.cert_and_chain_from_fullchain.call_count, 1)
 
+    @mock.patch("certbot.client.key_pool.get")
     @mock.patch("certbot.client.crypto_util")
     @mock.patch("certbot.client.acme_crypto_util")
-    def test_obtain_certificate_dry_run(self, mock_acme_crypto, mock_crypto):
+    def test_obtain_certificate_dry_run(self, mock_acme_crypto, mock_crypto,
+                                        mock_get_pool):
         csr = util.CSR(form="pem", file=None, data=CSR_SAN)
         mock_acme_crypto.make_csr.return_value = CSR_SAN
         mock_crypto.make_key.return_value = mock.sentinel.key_pem
@@ -243,11 +281,13 @@ class ClientTest(ClientTestCommon):
         self.client.config.dry_run = True
         self._test_obtain_certificate_common(key, csr)
 
-        mock_crypto.make_key.assert_called_once_with(self.config.rsa_key_size)
+        mock_crypto.make_key.assert_called_once_with(
+            self.config.rsa_key_size, "rsa", "secp256r1")
         mock_acme_crypto.make_csr.assert_called_once_with(
             mock.sentinel.key_pem, self.eg_domains, self.config.must_staple)
         mock_crypto.init_save_key.assert_not_called()
         mock_crypto.init_save_csr.assert_not_called()
+        self.assertFalse(mock_get_pool.called)
         self.assertEqual(mock_crypto.cert_and_chain_from_fullchain.call_count, 1)
 
     def _authzr_from_domains(self, domains):
@@ -1,4 +1,6 @@
 """Tests for certbot.configuration."""
+import argparse
+import copy
 import os
 import unittest
 
@@ -150,5 +152,61 @@ class NamespaceConfigTest(test_util.ConfigTestCase):
                                       constants.RENEWAL_POST_HOOKS_DIR))
 
 
+
+class OverlayTest(unittest.TestCase):
+    """Tests for certbot.configuration.NamespaceConfig.overlay."""
+
+    def setUp(self):
+        from certbot.configuration import NamespaceConfig
+        self.config = NamespaceConfig(argparse.Namespace(
+            **copy.deepcopy(constants.CLI_DEFAULTS)))
+        self.config.webroot_map = {'example.com': '/var/www'}
+        self.overlay = self.config.overlay()
+
+    def test_read_through(self):
+        self.assertEqual(self.overlay.server, self.config.server)
+        self.assertEqual(self.overlay.live_dir, self.config.live_dir)
+        self.assertRaises(AttributeError, getattr, self.overlay, 'missing')
+
+    def test_set(self):
+        self.overlay.rsa_key_size = 4096
+        self.overlay.namespace.foo = 'bar'
+        self.assertEqual(self.overlay.rsa_key_size, 4096)
+        self.assertEqual(self.overlay.foo, 'bar')
+        self.assertEqual(self.config.rsa_key_size,
+                         constants.CLI_DEFAULTS['rsa_key_size'])
+        self.assertFalse(hasattr(self.config, 'foo'))
+
+    def test_mutable_values_copied(self):
+        self.overlay.webroot_map['example.org'] = '/srv/www'
+        self.overlay.domains.append('example.org')
+        self.assertEqual(self.config.webroot_map, {'example.com': '/var/www'})
+        self.assertEqual(self.config.domains, [])
+        self.assertEqual(len(self.overlay.webroot_map), 2)
+
+    def test_nested(self):
+        self.overlay.rsa_key_size = 4096
+        nested = self.overlay.overlay()
+        nested.rsa_key_size = 3072
+        self.assertEqual(self.overlay.rsa_key_size, 4096)
+        self.assertEqual(nested.server, self.config.server)
+
+    def test_namespace_vars(self):
+        from certbot.configuration import namespace_vars
+        self.overlay.rsa_key_size = 4096
+        values = namespace_vars(self.overlay.namespace)
+        self.assertEqual(values['rsa_key_size'], 4096)
+        self.assertEqual(values['server'], self.config.server)
+        self.assertFalse('_base' in values)
+        self.assertEqual(namespace_vars(self.config.namespace)['rsa_key_size'],
+                         constants.CLI_DEFAULTS['rsa_key_size'])
+
+    def test_deepcopy(self):
+        copied = copy.deepcopy(self.overlay)
+        copied.webroot_map['example.org'] = '/srv/www'
+        self.assertEqual(copied.server, self.config.server)
+        self.assertEqual(self.config.webroot_map, {'example.com': '/var/www'})
+
+
 if __name__ == '__main__':
     unittest.main()  # pragma: no cover
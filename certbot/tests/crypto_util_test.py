@@ -54,6 +54,23 @@ class InitSaveKeyTest(test_util.TempDirTestCase):
         mock_make.side_effect = ValueError
         self.assertRaises(ValueError, self._call, 431, self.tempdir)
 
+    @mock.patch('certbot.crypto_util.make_key')
+    def test_key_pool(self, mock_make):
+        from certbot.crypto_util import init_save_key
+        pool = mock.MagicMock()
+        pool.take.return_value = b'pooled_key_pem'
+        key = init_save_key(1024, self.tempdir, key_pool=pool)
+        self.assertEqual(key.pem, b'pooled_key_pem')
+        pool.take.assert_called_once_with(1024)
+        self.assertFalse(mock_make.called)
+
+        mock_make.return_value = b'ecdsa_key_pem'
+        key = init_save_key(1024, self.tempdir, key_pool=pool,
+                            key_type='ecdsa', elliptic_curve='secp384r1')
+        self.assertEqual(key.pem, b'ecdsa_key_pem')
+        mock_make.assert_called_once_with(1024, 'ecdsa', 'secp384r1')
+        self.assertEqual(pool.take.call_count, 1)
+
 
 class InitSaveCSRTest(test_util.TempDirTestCase):
     """Tests for certbot.crypto_util.init_save_csr."""
@@ -167,6 +184,22 @@ class MakeKeyTest(unittest.TestCase):  # pylint: disable=too-few-public-methods
         OpenSSL.crypto.load_privatekey(
             OpenSSL.crypto.FILETYPE_PEM, make_key(1024))
 
+    def test_ecdsa(self):
+        from certbot.crypto_util import make_key
+        for curve, bits in (('secp256r1', 256), ('secp384r1', 384),
+                            ('secp521r1', 521)):
+            key = OpenSSL.crypto.load_privatekey(
+                OpenSSL.crypto.FILETYPE_PEM,
+                make_key(1024, key_type='ecdsa', elliptic_curve=curve))
+            self.assertNotEqual(key.type(), OpenSSL.crypto.TYPE_RSA)
+            self.assertEqual(key.bits(), bits)
+
+    def test_unsupported(self):
+        from certbot.crypto_util import make_key
+        self.assertRaises(errors.Error, make_key, 1024, key_type='dsa')
+        self.assertRaises(errors.Error, make_key, 1024, key_type='ecdsa',
+                          elliptic_curve='secp192r1')
+
 
 class VerifyCertSetup(unittest.TestCase):
     """Refactoring for verification tests."""
@@ -276,6 +309,10 @@ class ValidPrivkeyTest(unittest.TestCase):
     def test_valid_true(self):
         self.assertTrue(self._call(RSA512_KEY))
 
+    def test_valid_ecdsa_true(self):
+        from certbot.crypto_util import make_key
+        self.assertTrue(self._call(make_key(1024, key_type='ecdsa')))
+
     def test_empty_false(self):
         self.assertFalse(self._call(''))
 
@@ -364,6 +401,20 @@ class NotAfterTest(unittest.TestCase):
                          '2014-12-18T22:34:45+00:00')
 
 
+class GetCertInfoTest(unittest.TestCase):
+    """Tests for certbot.crypto_util.get_cert_info"""
+
+    def test_get_cert_info(self):
+        from certbot.crypto_util import get_cert_info
+        info = get_cert_info(CERT_PATH)
+        self.assertEqual(info.names, ['example.com'])
+        self.assertEqual(info.not_before.isoformat(), '2014-12-11T22:34:45+00:00')
+        self.assertEqual(info.not_after.isoformat(), '2014-12-18T22:34:45+00:00')
+        self.assertEqual(info.serial, 1337)
+        self.assertEqual(info.fingerprint,
+            'eff390bb0198fb8b70043a7faeb9230c3b299c224b2faf0d0d31f601cb3121d0')
+
+
 class Sha256sumTest(unittest.TestCase):
     """Tests for certbot.crypto_util.notAfter"""
 
@@ -0,0 +1,156 @@
+"""Tests for certbot.key_pool."""
+import os
+import stat
+import unittest
+
+import mock
+import OpenSSL
+
+from certbot import constants
+
+import certbot.tests.util as test_util
+
+
+class GetTest(test_util.ConfigTestCase):
+    """Tests for certbot.key_pool.get."""
+
+    def setUp(self):
+        super(GetTest, self).setUp()
+        self.config.rsa_key_size = 1024
+
+    @classmethod
+    def _call(cls, config):
+        from certbot.key_pool import get
+        return get(config)
+
+    def test_disabled(self):
+        self.config.key_pool_size = 0
+        self.assertTrue(self._call(self.config) is None)
+
+    @mock.patch('certbot.key_pool.KeyPool.fill')
+    def test_shared(self, mock_fill):
+        self.config.key_pool_size = 2
+        pool = self._call(self.config)
+        self.assertEqual(pool.directory, os.path.join(
+            self.config.config_dir, constants.KEY_POOL_DIR))
+        self.assertEqual(pool.passphrase_path, os.path.join(
+            self.config.work_dir, constants.KEY_POOL_PASSPHRASE))
+        mock_fill.assert_called_once_with(1024)
+
+        self.config.key_pool_size = 3
+        self.assertTrue(self._call(self.config) is pool)
+        self.assertEqual(pool.size, 3)
+
+
+class KeyPoolTest(test_util.TempDirTestCase):
+    """Tests for certbot.key_pool.KeyPool."""
+
+    def setUp(self):
+        super(KeyPoolTest, self).setUp()
+        from certbot.key_pool import KeyPool
+        self.directory = os.path.join(self.tempdir, 'key-pool')
+        self.passphrase_path = os.path.join(self.tempdir, 'passphrase')
+        self.pool = KeyPool(self.directory, 2, self.passphrase_path, workers=1)
+
+    def _wait(self):
+        # pylint: disable=protected-access
+        self.pool._thread_pool.close()
+        self.pool._thread_pool.join()
+        self.pool._thread_pool = None
+
+    def _key_files(self, bits=1024):
+        size_dir = os.path.join(self.directory, 'rsa{0}'.format(bits))
+        return sorted(name for name in os.listdir(size_dir)
+                      if not name.startswith('.'))
+
+    def test_fill_and_take(self):
+        self.pool.fill(1024)
+        self.pool.fill(1024)
+        self._wait()
+        key_files = self._key_files()
+        self.assertEqual(len(key_files), 2)
+        key_path = os.path.join(self.directory, 'rsa1024', key_files[0])
+        self.assertEqual(stat.S_IMODE(os.stat(key_path).st_mode), 0o600)
+        self.assertEqual(stat.S_IMODE(os.stat(self.directory).st_mode), 0o700)
+        self.assertEqual(
+            stat.S_IMODE(os.stat(self.passphrase_path).st_mode), 0o600)
+        with open(key_path, 'rb') as f:
+            self.assertTrue(b'ENCRYPTED' in f.read())
+
+        key_pem = self.pool.take(1024)
+        key = OpenSSL.crypto.load_privatekey(OpenSSL.crypto.FILETYPE_PEM, key_pem)
+        self.assertEqual(key.bits(), 1024)
+        self._wait()
+        # The taken key was replaced by a new one
+        self.assertEqual(len(self._key_files()), 2)
+        self.assertFalse(key_files[0] in self._key_files() and
+                         key_files[1] in self._key_files())
+
+    @mock.patch('certbot.key_pool.KeyPool.fill')
+    @mock.patch('certbot.key_pool.crypto_util.make_key')
+    def test_take_empty(self, mock_make, mock_fill):
+        mock_make.return_value = b'new key'
+        self.assertEqual(self.pool.take(2048), b'new key')
+        mock_make.assert_called_once_with(2048)
+        mock_fill.assert_called_once_with(2048)
+
+    @mock.patch('certbot.key_pool.logger')
+    @mock.patch('certbot.key_pool.KeyPool.fill')
+    @mock.patch('certbot.key_pool.crypto_util.make_key')
+    def test_take_unusable(self, mock_make, unused_mock_fill, mock_logger):
+        mock_make.return_value = b'new key'
+        size_dir = os.path.join(self.directory, 'rsa1024')
+        os.makedirs(size_dir)
+        with open(os.path.join(size_dir, 'garbage.pem'), 'wb') as f:
+            f.write(b'garbage')
+        self.assertEqual(self.pool.take(1024), b'new key')
+        self.assertTrue(mock_logger.warning.called)
+        self.assertEqual(os.listdir(size_dir), [])
+
+    @mock.patch('certbot.key_pool.crypto_util.make_key')
+    def test_take_without_passphrase(self, mock_make):
+        mock_make.return_value = b'new key'
+        self.pool.fill(1024)
+        self._wait()
+        os.remove(self.passphrase_path)
+        from certbot.key_pool import KeyPool
+        # A new passphrase is created, which cannot decrypt the old keys
+        pool = KeyPool(self.directory, 0, self.passphrase_path, workers=1)
+        with mock.patch('certbot.key_pool.logger'):
+            self.assertEqual(pool.take(1024), b'new key')
+        self.assertEqual(self._key_files(), [])
+
+    @mock.patch('certbot.key_pool.KeyPool.fill')
+    @mock.patch('certbot.key_pool.crypto_util.make_key')
+    def test_take_unreadable_passphrase(self, mock_make, unused_mock_fill):
+        mock_make.return_value = b'new key'
+        self.pool.passphrase_path = os.path.join(self.tempdir, 'missing', 'x')
+        size_dir = os.path.join(self.directory, 'rsa1024')
+        os.makedirs(size_dir)
+        with open(os.path.join(size_dir, 'key.pem'), 'wb') as f:
+            f.write(b'key')
+        self.assertEqual(self.pool.take(1024), b'new key')
+        self.assertEqual(os.listdir(size_dir), ['key.pem'])
+
+    @mock.patch('certbot.key_pool.util.atexit_register')
+    def test_generation_not_waited_for(self, mock_register):
+        self.pool.fill(1024)
+        # pylint: disable=protected-access
+        workers = self.pool._thread_pool._pool
+        self._wait()
+        self.assertFalse(mock_register.called)
+        self.assertTrue(workers and all(worker.daemon for worker in workers))
+
+    @mock.patch('certbot.key_pool.logger')
+    def test_generate_failure(self, mock_logger):
+        # pylint: disable=protected-access
+        self.pool._pending[1024] = 1
+        with mock.patch('certbot.key_pool.OpenSSL.crypto.PKey') as mock_pkey:
+            mock_pkey.return_value.generate_key.side_effect = ValueError
+            self.pool._generate(1024)
+        self.assertTrue(mock_logger.warning.called)
+        self.assertEqual(self.pool._pending[1024], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()  # pragma: no cover
@@ -215,6 +215,53 @@ class FindDomainsOrCertnameTest(unittest.TestCase):
             (["one.com", "two.com"], "one.com"))
 
 
+class RenewCertTest(unittest.TestCase):
+    """Tests for certbot.main.renew_cert."""
+
+    def setUp(self):
+        self.get_utility_patch = test_util.patch_get_utility()
+        self.mock_get_utility = self.get_utility_patch.start()
+        self.config = mock.MagicMock(installer='nginx')
+        self.lineage = mock.MagicMock(fullchain='example/fullchain.pem')
+        self.installer = mock.MagicMock()
+
+    def tearDown(self):
+        self.get_utility_patch.stop()
+
+    @mock.patch('certbot.main._get_and_save_cert')
+    @mock.patch('certbot.main._init_le_client')
+    @mock.patch('certbot.main.plug_sel.choose_configurator_plugins')
+    def _call(self, reloads, mock_choose, mock_init, mock_get_and_save,
+              plugin_locks=None):
+        mock_choose.return_value = (self.installer, mock.MagicMock())
+        main.renew_cert(self.config, [], self.lineage, reloads, plugin_locks)
+        self.assertTrue(mock_get_and_save.called)
+        self.assertEqual(mock_choose.called, plugin_locks is None)
+        return mock_init
+
+    def test_reload(self):
+        self._call(None)  # pylint: disable=no-value-for-parameter
+        self.installer.restart.assert_called_once_with()
+
+    def test_deferred_reload(self):
+        reloads = mock.MagicMock()
+        self._call(reloads)  # pylint: disable=no-value-for-parameter
+        self.assertFalse(self.installer.restart.called)
+        reloads.add.assert_called_once_with(
+            self.config, self.installer, 'example/fullchain.pem')
+
+    def test_plugin_locks(self):
+        plugin_locks = mock.MagicMock()
+        auth = mock.MagicMock()
+        plugin_locks.choose_configurator_plugins.return_value = (
+            self.installer, auth)
+        # pylint: disable=no-value-for-parameter
+        mock_init = self._call(mock.MagicMock(), plugin_locks=plugin_locks)
+        plugin_locks.choose_configurator_plugins.assert_called_once_with(
+            self.config, [])
+        mock_init.assert_called_once_with(self.config, auth, self.installer)
+
+
 class RevokeTest(test_util.TempDirTestCase):
     """Tests for certbot.main.revoke."""
 
@@ -1031,6 +1078,7 @@ class MainTest(test_util.ConfigTestCase):  # pylint: disable=too-many-public-met
         mock_lineage.should_autorenew.return_value = due_for_renewal
         mock_lineage.has_pending_deployment.return_value = False
         mock_lineage.names.return_value = ['isnot.org']
+        mock_lineage.cert_info.return_value.not_after = expiry_date
         mock_certr = mock.MagicMock()
         mock_key = mock.MagicMock(pem='pem_key')
         mock_client = mock.MagicMock()
@@ -1055,23 +1103,21 @@ class MainTest(test_util.ConfigTestCase):  # pylint: disable=too-many-public-met
                             mock_latest = mock.MagicMock()
                             mock_latest.get_issuer.return_value = "Fake fake"
                             mock_ssl.crypto.load_certificate.return_value = mock_latest
-                            with mock.patch('certbot.main.renewal.crypto_util') as mock_crypto_util:
-                                mock_crypto_util.notAfter.return_value = expiry_date
-                                if not args:
-                                    args = ['-d', 'isnot.org', '-a', 'standalone', 'certonly']
-                                if extra_args:
-                                    args += extra_args
-                                try:
-                                    ret, stdout, _, _ = self._call(args, stdout)
-                                    if ret:
-                                        print("Returned", ret)
-                                        raise AssertionError(ret)
-                                    assert not error_expected, "renewal should have errored"
-                                except: # pylint: disable=bare-except
-                                    if not error_expected:
-                                        raise AssertionError(
-                                            "Unexpected renewal error:\n" +
-                                            traceback.format_exc())
+                            if not args:
+                                args = ['-d', 'isnot.org', '-a', 'standalone', 'certonly']
+                            if extra_args:
+                                args += extra_args
+                            try:
+                                ret, stdout, _, _ = self._call(args, stdout)
+                                if ret:
+                                    print("Returned", ret)
+                                    raise AssertionError(ret)
+                                assert not error_expected, "renewal should have errored"
+                            except: # pylint: disable=bare-except
+                                if not error_expected:
+                                    raise AssertionError(
+                                        "Unexpected renewal error:\n" +
+                                        traceback.format_exc())
 
             if should_renew:
                 mock_client.obtain_certificate.assert_called_once_with(['isnot.org'])
@@ -1,18 +1,28 @@
 """Tests for ocsp.py"""
 # pylint: disable=protected-access
 
+import datetime
+import os
+import shutil
+import tempfile
 import unittest
 
 import mock
+import requests
 
 from certbot import errors
 
+try:
+    from cryptography.x509 import ocsp as ocsp_lib  # pylint: disable=import-error
+except ImportError:  # pragma: no cover
+    ocsp_lib = None  # type: ignore
+
 out = """Missing = in header key=value
 ocsp: Use -help for summary.
 """
 
-class OCSPTest(unittest.TestCase):
-
+class OCSPTestOpenSSL(unittest.TestCase):
+    """OCSP revocation tests using the openssl binary"""
 
     def setUp(self):
         from certbot import ocsp
@@ -22,7 +32,7 @@ class OCSPTest(unittest.TestCase):
                 mock_communicate.communicate.return_value = (None, out)
                 mock_popen.return_value = mock_communicate
                 mock_exists.return_value = True
-                self.checker = ocsp.RevocationChecker()
+                self.checker = ocsp.RevocationChecker(enforce_openssl_binary_usage=True)
 
     def tearDown(self):
         pass
@@ -37,18 +47,18 @@ class OCSPTest(unittest.TestCase):
         mock_exists.return_value = True
 
         from certbot import ocsp
-        checker = ocsp.RevocationChecker()
+        checker = ocsp.RevocationChecker(enforce_openssl_binary_usage=True)
         self.assertEqual(mock_popen.call_count, 1)
         self.assertEqual(checker.host_args("x"), ["Host=x"])
 
         mock_communicate.communicate.return_value = (None, out.partition("\n")[2])
-        checker = ocsp.RevocationChecker()
+        checker = ocsp.RevocationChecker(enforce_openssl_binary_usage=True)
         self.assertEqual(checker.host_args("x"), ["Host", "x"])
         self.assertEqual(checker.broken, False)
 
         mock_exists.return_value = False
         mock_popen.call_count = 0
-        checker = ocsp.RevocationChecker()
+        checker = ocsp.RevocationChecker(enforce_openssl_binary_usage=True)
         self.assertEqual(mock_popen.call_count, 0)
         self.assertEqual(mock_log.call_count, 1)
         self.assertEqual(checker.broken, True)
@@ -73,19 +83,31 @@ class OCSPTest(unittest.TestCase):
 
 
     @mock.patch('certbot.ocsp.logger.info')
-    @mock.patch('certbot.util.run_script')
-    def test_determine_ocsp_server(self, mock_run, mock_info):
+    @mock.patch('certbot.ocsp._load_cert')
+    def test_determine_ocsp_server(self, mock_load, mock_info):
+        from cryptography import x509
         uri = "http://ocsp.stg-int-x1.letsencrypt.org/"
         host = "ocsp.stg-int-x1.letsencrypt.org"
-        mock_run.return_value = uri, ""
+        mock_load.return_value = _cert_with_ocsp_uri(uri)
         self.assertEqual(self.checker.determine_ocsp_server("beep"), (uri, host))
-        mock_run.return_value = "ftp:/" + host + "/", ""
+        mock_load.return_value = _cert_with_ocsp_uri("ftp:/" + host + "/")
         self.assertEqual(self.checker.determine_ocsp_server("beep"), (None, None))
         self.assertEqual(mock_info.call_count, 1)
 
-        c = "confusion"
-        mock_run.side_effect = errors.SubprocessError(c)
+        mock_load.return_value.extensions.get_extension_for_class.side_effect = (
+            x509.ExtensionNotFound("confusion", None))
         self.assertEqual(self.checker.determine_ocsp_server("beep"), (None, None))
+        mock_load.side_effect = IOError
+        self.assertEqual(self.checker.determine_ocsp_server("beep"), (None, None))
+        self.assertEqual(mock_info.call_count, 3)
+
+    @mock.patch('certbot.ocsp.RevocationChecker.ocsp_revoked')
+    def test_ocsp_revoked_all(self, mock_revoked):
+        mock_revoked.side_effect = lambda cert_path, chain_path: cert_path == "revoked"
+        paths = [("revoked", "chain"), ("good", "chain"), ("revoked", "chain")]
+        self.assertEqual(self.checker.ocsp_revoked_all(iter(paths)), [True, False, True])
+        self.assertEqual(self.checker.ocsp_revoked_all(paths[1:2]), [False])
+        self.assertEqual(self.checker.ocsp_revoked_all([]), [])
 
     @mock.patch('certbot.ocsp.logger')
     @mock.patch('certbot.util.run_script')
@@ -112,7 +134,212 @@ class OCSPTest(unittest.TestCase):
         self.assertEqual(mock_log.info.call_count, 1)
 
 
-# pylint: disable=line-too-long
+@unittest.skipIf(ocsp_lib is None,
+                 reason='This class tests functionalities available only on cryptography>=2.5')
+class OCSPTestCryptography(unittest.TestCase):
+    """OCSP revocation tests using cryptography"""
+
+    def setUp(self):
+        from certbot import ocsp
+        self.tempdir = tempfile.mkdtemp()
+        self.checker = ocsp.RevocationChecker(cache_dir=os.path.join(self.tempdir, "ocsp"))
+        self.cert_path = "cert.pem"
+        self.chain_path = "chain.pem"
+        self.cert = mock.MagicMock(serial_number=1234)
+        self.issuer = mock.MagicMock()
+
+        load_patch = mock.patch('certbot.ocsp._load_cert')
+        self.mock_load = load_patch.start()
+        self.mock_load.side_effect = lambda path: (
+            self.cert if path == self.cert_path else self.issuer)
+        self.addCleanup(load_patch.stop)
+
+        self.request = mock.MagicMock(serial_number=1234, issuer_key_hash=b'\x01\xab')
+        builder = mock.MagicMock()
+        builder.add_certificate.return_value.build.return_value = self.request
+        builder_patch = mock.patch('certbot.ocsp.ocsp.OCSPRequestBuilder',
+                                   return_value=builder)
+        builder_patch.start()
+        self.addCleanup(builder_patch.stop)
+
+        determine_patch = mock.patch('certbot.ocsp.RevocationChecker.determine_ocsp_server')
+        determine_patch.start().return_value = ("http://ocsp.example.org", "ocsp.example.org")
+        self.addCleanup(determine_patch.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def _response(self, status=ocsp_lib.OCSPCertStatus.GOOD if ocsp_lib else None):
+        response = mock.MagicMock(
+            response_status=ocsp_lib.OCSPResponseStatus.SUCCESSFUL,
+            certificate_status=status,
+            next_update=datetime.datetime.utcnow() + datetime.timedelta(days=1))
+        response.public_bytes.return_value = b'der'
+        return response
+
+    def _http_response(self, status_code=200):
+        http_response = mock.MagicMock(status_code=status_code, content=b'der')
+        self.checker._session = mock.MagicMock()
+        self.checker._session.post.return_value = http_response
+        return self.checker._session
+
+    @mock.patch('certbot.ocsp._check_ocsp_response')
+    @mock.patch('certbot.ocsp.ocsp.load_der_ocsp_response')
+    def test_ocsp_revoked(self, mock_load_response, mock_check):
+        session = self._http_response()
+        mock_load_response.return_value = self._response(ocsp_lib.OCSPCertStatus.REVOKED)
+        self.assertTrue(self.checker.ocsp_revoked(self.cert_path, self.chain_path))
+        self.assertEqual(session.post.call_count, 1)
+        mock_check.assert_called_once_with(
+            mock_load_response.return_value, self.request, self.issuer)
+
+        mock_load_response.return_value = self._response()
+        self.checker.cache_dir = None
+        self.assertFalse(self.checker.ocsp_revoked(self.cert_path, self.chain_path))
+        self.assertEqual(session.post.call_count, 2)
+
+    @mock.patch('certbot.ocsp._check_ocsp_response')
+    @mock.patch('certbot.ocsp.ocsp.load_der_ocsp_response')
+    def test_ocsp_revoked_invalid_response(self, mock_load_response, mock_check):
+        self._http_response()
+        mock_load_response.return_value = self._response(ocsp_lib.OCSPCertStatus.REVOKED)
+        mock_check.side_effect = errors.Error("invalid signature")
+        self.assertFalse(self.checker.ocsp_revoked(self.cert_path, self.chain_path))
+        self.assertFalse(os.path.exists(self.checker.cache_dir))
+
+    @mock.patch('certbot.ocsp.ocsp.load_der_ocsp_response')
+    def test_ocsp_revoked_query_failures(self, mock_load_response):
+        session = self._http_response(status_code=500)
+        self.assertFalse(self.checker.ocsp_revoked(self.cert_path, self.chain_path))
+
+        session.post.side_effect = requests.exceptions.ConnectionError
+        self.assertFalse(self.checker.ocsp_revoked(self.cert_path, self.chain_path))
+
+        session = self._http_response()
+        mock_load_response.side_effect = ValueError
+        self.assertFalse(self.checker.ocsp_revoked(self.cert_path, self.chain_path))
+
+        mock_load_response.side_effect = None
+        mock_load_response.return_value = mock.MagicMock(
+            response_status=ocsp_lib.OCSPResponseStatus.UNAUTHORIZED)
+        self.assertFalse(self.checker.ocsp_revoked(self.cert_path, self.chain_path))
+
+    def test_ocsp_revoked_unloadable_cert(self):
+        self.mock_load.side_effect = IOError
+        self.assertFalse(self.checker.ocsp_revoked(self.cert_path, self.chain_path))
+
+    @mock.patch('certbot.ocsp._check_ocsp_response')
+    @mock.patch('certbot.ocsp.ocsp.load_der_ocsp_response')
+    def test_cache(self, mock_load_response, unused_mock_check):
+        session = self._http_response()
+        response = self._response(ocsp_lib.OCSPCertStatus.REVOKED)
+        response.public_bytes.return_value = b'cached der'
+        mock_load_response.return_value = response
+        self.assertTrue(self.checker.ocsp_revoked(self.cert_path, self.chain_path))
+        self.assertEqual(os.listdir(self.checker.cache_dir), ["01ab-4d2.der"])
+
+        self.assertTrue(self.checker.ocsp_revoked(self.cert_path, self.chain_path))
+        self.assertEqual(session.post.call_count, 1)
+        mock_load_response.assert_called_with(b'cached der')
+
+        response.next_update = datetime.datetime.utcnow() - datetime.timedelta(seconds=1)
+        self.checker.ocsp_revoked(self.cert_path, self.chain_path)
+        self.assertEqual(session.post.call_count, 2)
+
+    def test_cache_write_failure(self):
+        response = self._response()
+        with open(self.checker.cache_dir, "w"):
+            pass
+        # The cache directory is a file, so nothing is cached
+        self.checker._save_cached_response(self.request, response)
+        self.assertTrue(os.path.isfile(self.checker.cache_dir))
+        self.assertEqual(self.checker._load_cached_response(self.request), None)
+
+
+@unittest.skipIf(ocsp_lib is None,
+                 reason='This class tests functionalities available only on cryptography>=2.5')
+class CheckOCSPResponseTest(unittest.TestCase):
+    """Tests for certbot.ocsp._check_ocsp_response"""
+
+    def setUp(self):
+        from cryptography.hazmat.primitives import hashes
+        now = datetime.datetime.utcnow()
+        self.request = mock.MagicMock(
+            serial_number=1234, hash_algorithm=hashes.SHA1(),
+            issuer_key_hash=b'key', issuer_name_hash=b'name')
+        self.response = mock.MagicMock(
+            serial_number=1234, hash_algorithm=hashes.SHA1(),
+            issuer_key_hash=b'key', issuer_name_hash=b'name', certificates=[],
+            this_update=now - datetime.timedelta(hours=1),
+            next_update=now + datetime.timedelta(days=1))
+        self.issuer = mock.MagicMock()
+
+    def _call(self):
+        from certbot.ocsp import _check_ocsp_response
+        _check_ocsp_response(self.response, self.request, self.issuer)
+
+    @mock.patch('certbot.ocsp._verify_signature')
+    def test_valid(self, mock_verify):
+        self._call()
+        mock_verify.assert_called_once_with(
+            self.issuer.public_key(), self.response.signature,
+            self.response.tbs_response_bytes, self.response.signature_hash_algorithm)
+
+    @mock.patch('certbot.ocsp._verify_signature')
+    def test_mismatch(self, unused_mock_verify):
+        self.response.serial_number = 5678
+        self.assertRaises(errors.Error, self._call)
+        self.response.serial_number = 1234
+        self.response.issuer_key_hash = b'other key'
+        self.assertRaises(errors.Error, self._call)
+
+    @mock.patch('certbot.ocsp._verify_signature')
+    def test_times(self, unused_mock_verify):
+        self.response.next_update = datetime.datetime.utcnow() - datetime.timedelta(hours=1)
+        self.assertRaises(errors.Error, self._call)
+        self.response.next_update = None
+        self._call()
+        self.response.this_update = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+        self.assertRaises(errors.Error, self._call)
+
+    @mock.patch('certbot.ocsp._verify_signature')
+    def test_invalid_signature(self, mock_verify):
+        from cryptography.exceptions import InvalidSignature, UnsupportedAlgorithm
+        mock_verify.side_effect = InvalidSignature
+        self.assertRaises(errors.Error, self._call)
+        mock_verify.side_effect = UnsupportedAlgorithm("nope")
+        self.assertRaises(errors.Error, self._call)
+
+    @mock.patch('certbot.ocsp._verify_signature')
+    def test_delegated_responder(self, mock_verify):
+        from cryptography import x509
+        responder = mock.MagicMock(issuer=self.issuer.subject)
+        responder.extensions.get_extension_for_class.return_value = mock.MagicMock(
+            value=[x509.oid.ExtendedKeyUsageOID.OCSP_SIGNING])
+        self.response.certificates = [responder]
+        self._call()
+        self.assertEqual(mock_verify.call_count, 2)
+        mock_verify.assert_called_with(
+            responder.public_key(), self.response.signature,
+            self.response.tbs_response_bytes, self.response.signature_hash_algorithm)
+
+        responder.extensions.get_extension_for_class.side_effect = (
+            x509.ExtensionNotFound("no EKU", None))
+        self.assertRaises(errors.Error, self._call)
+        responder.issuer = mock.MagicMock()
+        self.assertRaises(errors.Error, self._call)
+
+
+def _cert_with_ocsp_uri(uri):
+    from cryptography import x509
+    description = x509.AccessDescription(
+        x509.oid.AuthorityInformationAccessOID.OCSP, x509.UniformResourceIdentifier(uri))
+    cert = mock.MagicMock()
+    cert.extensions.get_extension_for_class.return_value = mock.MagicMock(
+        value=[description])
+    return cert
+
+
 openssl_confused = ("", """
 /etc/letsencrypt/live/example.org/cert.pem: good
 	This Update: Dec 17 00:00:00 2016 GMT
@@ -120,7 +347,8 @@ openssl_confused = ("", """
 """,
 """
 Response Verify Failure
-139903674214048:error:27069065:OCSP routines:OCSP_basic_verify:certificate verify error:ocsp_vfy.c:138:Verify error:unable to get local issuer certificate
+139903674214048:error:27069065:OCSP routines:OCSP_basic_verify:"""
+"""certificate verify error:ocsp_vfy.c:138:Verify error:unable to get local issuer certificate
 """)
 
 openssl_happy = ("blah.pem", """
@@ -0,0 +1,112 @@
+"""Tests for certbot.renewal_index."""
+import datetime
+import json
+import os
+import unittest
+
+import mock
+import pytz
+
+from certbot import constants
+from certbot import storage
+
+import certbot.tests.util as test_util
+
+
+class RenewalIndexTest(test_util.ConfigTestCase):
+    """Tests for certbot.renewal_index.RenewalIndex."""
+
+    def setUp(self):
+        super(RenewalIndexTest, self).setUp()
+        self.renewal_file = test_util.make_lineage(
+            self.config.config_dir, 'sample-renewal.conf')
+        self.lineage = storage.RenewableCert(self.renewal_file, self.config)
+        self.not_after = datetime.datetime(2100, 1, 1, tzinfo=pytz.UTC)
+        self.index_path = os.path.join(
+            self.config.config_dir, constants.RENEWAL_INDEX)
+
+    def _load(self):
+        from certbot.renewal_index import RenewalIndex
+        return RenewalIndex.from_config(self.config)
+
+    def _record_and_reload(self):
+        index = self._load()
+        index.record(self.renewal_file, self.lineage, self.not_after)
+        index.save()
+        return self._load()
+
+    def test_missing_index(self):
+        self.assertTrue(self._load().lookup(self.renewal_file) is None)
+
+    def test_corrupt_index(self):
+        with open(self.index_path, 'w') as f:
+            f.write('{"not": "json"')
+        self.assertTrue(self._load().lookup(self.renewal_file) is None)
+
+    def test_other_format_version(self):
+        with open(self.index_path, 'w') as f:
+            json.dump({'version': 0, 'lineages': {}}, f)
+        self.assertTrue(self._load().lookup(self.renewal_file) is None)
+
+    def test_round_trip(self):
+        entry = self._record_and_reload().lookup(self.renewal_file)
+        self.assertEqual(entry['fullchain'], self.lineage.fullchain)
+        self.assertEqual(entry['chain'], self.lineage.version('chain', 1))
+        self.assertEqual(entry['version'], 1)
+        self.assertEqual(entry['names'], self.lineage.names())
+        self.assertEqual(entry['not_after'], '2100-01-01T00:00:00Z')
+        self.assertEqual(entry['renew_before_expiry'], '4 years')
+
+    def test_renewal_file_modified(self):
+        index = self._record_and_reload()
+        with open(self.renewal_file, 'a') as f:
+            f.write('\n# modified\n')
+        self.assertTrue(index.lookup(self.renewal_file) is None)
+
+    def test_new_version_in_archive(self):
+        index = self._record_and_reload()
+        with open(os.path.join(self.lineage.archive_dir, 'cert2.pem'), 'w'):
+            pass
+        self.assertTrue(index.lookup(self.renewal_file) is None)
+
+    def test_renewal_file_deleted(self):
+        index = self._record_and_reload()
+        os.remove(self.renewal_file)
+        self.assertTrue(index.lookup(self.renewal_file) is None)
+        index.record(self.renewal_file, self.lineage, self.not_after)
+        index.save()
+        self.assertTrue(self._load().lookup(self.renewal_file) is None)
+
+    def test_save_unmodified(self):
+        self._load().save()
+        self.assertFalse(os.path.exists(self.index_path))
+
+    @mock.patch('certbot.renewal_index.logger')
+    def test_save_failure(self, mock_logger):
+        index = self._load()
+        index.record(self.renewal_file, self.lineage, self.not_after)
+        index.path = os.path.join(self.tempdir, 'missing', 'index.json')
+        index.save()
+        self.assertTrue(mock_logger.warning.called)
+
+
+class IsDueTest(unittest.TestCase):
+    """Tests for certbot.renewal_index.is_due."""
+
+    @classmethod
+    def _call(cls, not_after, interval="30 days"):
+        from certbot.renewal_index import is_due
+        return is_due({'not_after': not_after,
+                       'renew_before_expiry': interval})
+
+    def test_due(self):
+        soon = datetime.datetime.utcnow() + datetime.timedelta(days=10)
+        self.assertTrue(self._call(soon.strftime('%Y-%m-%dT%H:%M:%SZ')))
+
+    def test_not_due(self):
+        self.assertFalse(self._call('2100-01-01T00:00:00Z'))
+        self.assertTrue(self._call('2100-01-01T00:00:00Z', '100 years'))
+
+
+if __name__ == "__main__":
+    unittest.main()  # pragma: no cover
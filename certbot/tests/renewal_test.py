@@ -1,11 +1,20 @@
 """Tests for certbot.renewal"""
-import mock
+import os
+import threading
+import time
 import unittest
 
+import mock
+import zope.component
+import zope.component.hooks
+import zope.interface
+
 from acme import challenges
 
+from certbot import cli
 from certbot import configuration
 from certbot import errors
+from certbot import interfaces
 from certbot import storage
 
 import certbot.tests.util as test_util
@@ -91,5 +100,450 @@ class RestoreRequiredConfigElementsTest(test_util.ConfigTestCase):
         self.assertRaises(
             errors.Error, self._call, self.config, renewalparams)
 
+class HandleRenewalRequestTest(test_util.ConfigTestCase):
+    """Tests for certbot.renewal.handle_renewal_request."""
+
+    def setUp(self):
+        super(HandleRenewalRequestTest, self).setUp()
+        self.config.domains = []
+        self.config.webroot_map = {}
+        self.config.certname = None
+        self.conf_files = ['a.conf', 'b.conf', 'c.conf', 'd.conf']
+        self.results = {
+            'a.conf': ('success', 'a/fullchain.pem'),
+            'b.conf': ('skipped', 'b/fullchain.pem expires on 2100-01-01'),
+            'c.conf': ('parsefail', 'c.conf'),
+            'd.conf': ('success', 'd/fullchain.pem'),
+        }
+
+        self.patches = [
+            mock.patch.multiple('certbot.renewal', DeferredReloads=mock.DEFAULT,
+                                _renew_describe_results=mock.DEFAULT,
+                                _revoked_lineages=mock.DEFAULT),
+            mock.patch('certbot.renewal.cli.set_by_cli'),
+            mock.patch('certbot.renewal.storage.renewal_conf_files',
+                       return_value=self.conf_files),
+            mock.patch('certbot.renewal.ocsp.RevocationChecker.from_config'),
+        ]
+        self.mocks = self.patches[0].start()
+        for patch in self.patches[1:-1]:
+            patch.start()
+        self.checker = self.patches[-1].start().return_value
+        self.mocks['_revoked_lineages'].return_value = set(['b.conf'])
+        self.reloads = self.mocks['DeferredReloads'].return_value
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        super(HandleRenewalRequestTest, self).tearDown()
+
+    @classmethod
+    def _call(cls, *args, **kwargs):
+        from certbot.renewal import handle_renewal_request
+        return handle_renewal_request(*args, **kwargs)
+
+    def _renew_lineage(self, unused_config, renewal_file, **kwargs):
+        parallel = self.config.parallel_renewals > 1
+        self.assertTrue(kwargs['index'] is not None)
+        self.assertEqual(kwargs['revoked'], set(['b.conf']))
+        self.assertEqual(kwargs.get('plugin_locks') is not None, parallel)
+        self.assertTrue(kwargs['reloads'] is self.reloads)
+        self.assertTrue(kwargs['checker'] is self.checker)
+        return self.results[renewal_file]
+
+    def _test_results_merged(self, reload_failures=()):
+        self.reloads.reload.return_value = list(reload_failures)
+        with mock.patch('certbot.renewal._renew_lineage') as mock_renew:
+            mock_renew.side_effect = self._renew_lineage
+            self.assertRaises(errors.Error, self._call, self.config)
+        self.assertEqual(mock_renew.call_count, len(self.conf_files))
+        self.reloads.reload.assert_called_once_with()
+        successes = [description for description in
+                     ('a/fullchain.pem', 'd/fullchain.pem')
+                     if description not in reload_failures]
+        self.mocks['_renew_describe_results'].assert_called_once_with(
+            self.config, successes, list(reload_failures),
+            ['b/fullchain.pem expires on 2100-01-01'], ['c.conf'])
+        self.mocks['_revoked_lineages'].assert_called_once_with(
+            self.config, self.conf_files, mock.ANY, self.checker)
+
+    def test_serial(self):
+        self.config.parallel_renewals = 1
+        self._test_results_merged()
+
+    def test_parallel(self):
+        self.config.parallel_renewals = 3
+        self._test_results_merged()
+
+    def test_reload_failure(self):
+        self.config.parallel_renewals = 1
+        self._test_results_merged(reload_failures=['d/fullchain.pem'])
+
+
+@zope.interface.implementer(interfaces.IInstaller)
+class _FakeInstaller(object):
+    """Plugin class of the installers in the tests."""
+
+
+def _fake_plugins():
+    """Registry of fake plugins, keyed by name."""
+    from certbot.plugins import dns_common
+    from certbot.plugins import standalone
+    return {
+        'apache': mock.MagicMock(plugin_cls=_FakeInstaller),
+        'nginx': mock.MagicMock(plugin_cls=_FakeInstaller),
+        'dns-foo': mock.MagicMock(plugin_cls=dns_common.DNSAuthenticator),
+        'standalone': mock.MagicMock(plugin_cls=standalone.Authenticator),
+    }
+
+
+class RenewLineagesInParallelTest(test_util.ConfigTestCase):
+    """Tests for renewing real lineages with --parallel-renewals."""
+
+    def setUp(self):
+        super(RenewLineagesInParallelTest, self).setUp()
+        from certbot.plugins import disco
+        self.config = configuration.NamespaceConfig(cli.prepare_and_parse_args(
+            disco.PluginsRegistry.find_all(), [
+                'renew', '--force-renewal', '--parallel-renewals', '2',
+                '--config-dir', self.config.config_dir,
+                '--work-dir', self.config.work_dir,
+                '--logs-dir', self.config.logs_dir]))
+        self.lock = threading.Lock()
+        self.renewing = []
+        self.overlapped = False
+
+    def _make_lineages(self, authenticator, installer):
+        """Makes two lineages using the given plugins."""
+        first = test_util.make_lineage(
+            self.config.config_dir, 'sample-renewal.conf')
+        second = os.path.join(os.path.dirname(first), 'other.conf')
+        with open(first) as src:
+            contents = src.read().replace(
+                'installer = None', 'installer = ' + installer).replace(
+                    'authenticator = standalone',
+                    'authenticator = ' + authenticator)
+        for path in first, second:
+            with open(path, 'w') as dst:
+                dst.write(contents)
+
+    def _choose(self, unused_config, unused_plugins, verb):
+        self.assertEqual(verb, 'certonly')
+        return mock.MagicMock(), mock.MagicMock()
+
+    def _renew_cert(self, config, plugins, lineage, unused_reloads,
+                    plugin_locks):
+        """Performs and cleans up challenges like main.renew_cert would."""
+        _, auth = plugin_locks.choose_configurator_plugins(config, plugins)
+        achalls = [mock.MagicMock()]
+        auth.perform(achalls)
+        with self.lock:
+            self.renewing.append(lineage)
+            self.overlapped = self.overlapped or len(self.renewing) > 1
+        time.sleep(0.1)
+        with self.lock:
+            self.renewing.remove(lineage)
+        auth.cleanup(achalls)
+
+    @test_util.patch_get_utility()
+    @mock.patch('certbot.renewal._renew_describe_results')
+    def _renew(self, authenticator, installer, mock_describe,
+               unused_mock_get_utility):
+        """Renews two lineages, returns whether their challenges overlapped."""
+        self._make_lineages(authenticator, installer)
+        with mock.patch('certbot.main.renew_cert') as mock_renew_cert:
+            mock_renew_cert.side_effect = self._renew_cert
+            with mock.patch('certbot.renewal.plugins_disco') as mock_disco:
+                mock_disco.PluginsRegistry.find_all.side_effect = _fake_plugins
+                with mock.patch('certbot.renewal.plug_sel'
+                                '.choose_configurator_plugins') as mock_choose:
+                    mock_choose.side_effect = self._choose
+                    from certbot.renewal import handle_renewal_request
+                    handle_renewal_request(self.config)
+        self.assertEqual(mock_renew_cert.call_count, 2)
+        self.assertEqual(len(mock_describe.call_args[0][1]), 2)
+        self.assertEqual(zope.component.hooks.getSite(), None)
+        return self.overlapped
+
+    def test_same_dns_authenticator(self):
+        # pylint: disable=no-value-for-parameter
+        self.assertTrue(self._renew('dns-foo', 'nginx'))
+
+    def test_same_authenticator(self):
+        # pylint: disable=no-value-for-parameter
+        self.assertFalse(self._renew('standalone', 'None'))
+
+    def test_installer_authenticator(self):
+        # pylint: disable=no-value-for-parameter
+        self.assertFalse(self._renew('nginx', 'nginx'))
+
+
+class PluginLocksTest(unittest.TestCase):
+    """Tests for certbot.renewal._PluginLocks."""
+
+    def setUp(self):
+        # pylint: disable=protected-access
+        from certbot.renewal import _PluginLocks
+        self.locks = _PluginLocks()
+        self.plugins = _fake_plugins()
+
+    @classmethod
+    def _config(cls, authenticator, installer):
+        config = mock.MagicMock(
+            configurator=None, authenticator=authenticator,
+            installer=installer, nginx=False, apache=False,
+            standalone=False, webroot=False, manual=False)
+        for option in ('dns_cloudflare', 'dns_cloudxns', 'dns_digitalocean',
+                       'dns_dnsimple', 'dns_dnsmadeeasy', 'dns_google',
+                       'dns_luadns', 'dns_nsone', 'dns_rfc2136', 'dns_route53'):
+            setattr(config, option, False)
+        return config
+
+    def _prepare_lock_name(self, authenticator, installer):
+        return self.locks.prepare_lock_name(
+            self._config(authenticator, installer), self.plugins)
+
+    def _challenge_lock_name(self, authenticator):
+        return self.locks.challenge_lock_name(
+            self._config(authenticator, None), self.plugins)
+
+    def test_prepare_lock_name(self):
+        self.assertEqual(self._prepare_lock_name('dns-foo', 'nginx'),
+                         'installers')
+        self.assertEqual(self._prepare_lock_name('apache', None),
+                         'installers')
+        self.assertEqual(self._prepare_lock_name(None, None), 'installers')
+        self.assertEqual(self._prepare_lock_name('dns-foo', None), None)
+        self.assertEqual(self._prepare_lock_name('standalone', None), None)
+
+    def test_challenge_lock_name(self):
+        self.assertEqual(self._challenge_lock_name('nginx'), 'installers')
+        self.assertEqual(self._challenge_lock_name('apache'), 'installers')
+        self.assertEqual(self._challenge_lock_name('dns-foo'), None)
+        self.assertEqual(self._challenge_lock_name('standalone'),
+                         'standalone')
+        self.assertEqual(self._challenge_lock_name('unknown'), 'unknown')
+
+    def test_get(self):
+        self.assertTrue(self.locks.get('a') is self.locks.get('a'))
+        self.assertFalse(self.locks.get('a') is self.locks.get('b'))
+
+    def test_lineage_release(self):
+        with self.locks.lineage() as lineage_locks:
+            lineage_locks.acquire('standalone', 2)
+            lineage_locks.done(1)
+            self.assertTrue(self.locks.get('standalone').locked())
+        self.assertFalse(self.locks.get('standalone').locked())
+
+    def test_lineage_done(self):
+        with self.locks.lineage() as lineage_locks:
+            lineage_locks.acquire('standalone', 1)
+            lineage_locks.acquire('standalone', 1)
+            lineage_locks.done(1)
+            self.assertTrue(self.locks.get('standalone').locked())
+            lineage_locks.done(1)
+            self.assertFalse(self.locks.get('standalone').locked())
+
+    @mock.patch('certbot.renewal.plug_sel.choose_configurator_plugins')
+    def test_choose_configurator_plugins(self, mock_choose):
+        installer, auth = mock.MagicMock(), mock.MagicMock()
+        mock_choose.return_value = (installer, auth)
+        config = self._config('dns-foo', 'nginx')
+        with self.locks.lineage() as lineage_locks:
+            self.assertEqual(lineage_locks.choose_configurator_plugins(
+                config, self.plugins), (installer, auth))
+        mock_choose.assert_called_once_with(config, self.plugins, 'certonly')
+
+        config = self._config('standalone', None)
+        with self.locks.lineage() as lineage_locks:
+            _, locked = lineage_locks.choose_configurator_plugins(
+                config, self.plugins)
+            self.assertTrue(locked.more_info is auth.more_info)
+            auth.perform.side_effect = errors.PluginError
+            self.assertRaises(errors.PluginError, locked.perform, ['a'])
+            self.assertTrue(self.locks.get('standalone').locked())
+            auth.cleanup.side_effect = errors.PluginError
+            self.assertRaises(errors.PluginError, locked.cleanup, ['a'])
+            self.assertFalse(self.locks.get('standalone').locked())
+
+
+class DeferredReloadsTest(test_util.ConfigTestCase):
+    """Tests for certbot.renewal.DeferredReloads."""
+
+    def setUp(self):
+        super(DeferredReloadsTest, self).setUp()
+        from certbot.renewal import DeferredReloads
+        self.reloads = DeferredReloads()
+        self.installers = [mock.MagicMock() for _ in range(3)]
+
+    def _config(self, installer, **options):
+        config = self.config.overlay()
+        config.installer = installer
+        for name, value in options.items():
+            setattr(config, name, value)
+        return config
+
+    @test_util.patch_get_utility()
+    def test_reload_once_per_server(self, unused_mock_get_utility):
+        self.reloads.add(self._config('nginx', nginx_ctl='nginx'),
+                         self.installers[0], 'a')
+        self.reloads.add(self._config('nginx', nginx_ctl='nginx'),
+                         self.installers[1], 'b')
+        self.reloads.add(self._config('nginx', nginx_ctl='other'),
+                         self.installers[2], 'c')
+        self.assertEqual(self.reloads.reload(), [])
+        for installer in self.installers[0], self.installers[2]:
+            installer.config_test.assert_called_once_with()
+            installer.restart.assert_called_once_with()
+        self.assertFalse(self.installers[1].config_test.called)
+        self.assertFalse(self.installers[1].restart.called)
+
+        self.assertEqual(self.reloads.reload(), [])
+        self.assertEqual(self.installers[0].restart.call_count, 1)
+
+    @test_util.patch_get_utility()
+    def test_reload_failure(self, unused_mock_get_utility):
+        self.installers[0].config_test.side_effect = errors.MisconfigurationError
+        self.installers[1].restart.side_effect = errors.MisconfigurationError
+        self.reloads.add(self._config('nginx'), self.installers[0], 'a')
+        self.reloads.add(self._config('nginx'), self.installers[0], 'b')
+        self.reloads.add(self._config('apache'), self.installers[1], 'c')
+        self.reloads.add(self._config('other'), self.installers[2], 'd')
+        self.assertEqual(self.reloads.reload(), ['a', 'b', 'c'])
+        self.assertFalse(self.installers[0].restart.called)
+        self.installers[2].restart.assert_called_once_with()
+
+
+class RevokedLineagesTest(test_util.ConfigTestCase):
+    """Tests for certbot.renewal._revoked_lineages."""
+
+    def setUp(self):
+        super(RevokedLineagesTest, self).setUp()
+        self.config.renew_by_default = False
+        self.config.dry_run = False
+        self.renewal_file = test_util.make_lineage(
+            self.config.config_dir, 'sample-renewal.conf')
+        self.lineage = storage.RenewableCert(self.renewal_file, self.config)
+        self.index = mock.MagicMock()
+        self.index.lookup.return_value = None
+        self.checker = mock.MagicMock(use_openssl_binary=False)
+
+    def _call(self, conf_files):
+        # pylint: disable=protected-access
+        from certbot.renewal import _revoked_lineages
+        return _revoked_lineages(self.config, conf_files, self.index,
+                                 self.checker)
+
+    def test_from_renewal_files(self):
+        mock_revoked_all = self.checker.ocsp_revoked_all
+        mock_revoked_all.side_effect = lambda paths: [True for _ in paths]
+        self.assertEqual(self._call([self.renewal_file, 'missing.conf']),
+                         set([self.renewal_file]))
+        self.assertEqual(mock_revoked_all.call_args[0][0],
+                         [(self.lineage.cert, self.lineage.chain)])
+
+    def test_from_index(self):
+        mock_revoked_all = self.checker.ocsp_revoked_all
+        mock_revoked_all.side_effect = lambda paths: [False for _ in paths]
+        self.index.lookup.return_value = {'cert': 'cert1.pem',
+                                          'chain': 'chain1.pem'}
+        self.assertEqual(self._call(['a.conf']), set())
+        self.assertEqual(mock_revoked_all.call_args[0][0],
+                         [('cert1.pem', 'chain1.pem')])
+
+    def test_forced(self):
+        self.config.renew_by_default = True
+        self.assertEqual(self._call([self.renewal_file]), set())
+        self.config.renew_by_default = False
+        self.config.dry_run = True
+        self.assertEqual(self._call([self.renewal_file]), set())
+        self.assertFalse(self.checker.ocsp_revoked_all.called)
+
+    def test_openssl_binary(self):
+        self.checker.use_openssl_binary = True
+        self.assertEqual(self._call([self.renewal_file]), set())
+        self.assertFalse(self.checker.ocsp_revoked_all.called)
+
+
+class SkipIndexedLineageTest(test_util.ConfigTestCase):
+    """Tests for certbot.renewal._skip_indexed_lineage."""
+
+    def setUp(self):
+        super(SkipIndexedLineageTest, self).setUp()
+        self.config.renew_by_default = False
+        self.config.dry_run = False
+        self.index = mock.MagicMock()
+        self.index.lookup.return_value = {
+            'fullchain': 'live/fullchain.pem',
+            'not_after': '2100-01-01T00:00:00Z',
+            'renew_before_expiry': '30 days'}
+
+    def _call(self):
+        # pylint: disable=protected-access
+        from certbot.renewal import _skip_indexed_lineage
+        return _skip_indexed_lineage(self.config, 'a.conf', self.index)
+
+    def test_not_due(self):
+        self.assertEqual(
+            self._call(), 'live/fullchain.pem expires on 2100-01-01')
+
+    def test_due(self):
+        self.index.lookup.return_value['renew_before_expiry'] = '100 years'
+        self.assertTrue(self._call() is None)
+
+    def test_not_indexed(self):
+        self.index.lookup.return_value = None
+        self.assertTrue(self._call() is None)
+
+    def test_forced(self):
+        self.config.renew_by_default = True
+        self.assertTrue(self._call() is None)
+        self.config.renew_by_default = False
+        self.config.dry_run = True
+        self.assertTrue(self._call() is None)
+        self.assertFalse(self.index.lookup.called)
+
+
+class ProvideLineageConfigTest(unittest.TestCase):
+    """Tests for certbot.renewal._provide_lineage_config."""
+
+    def setUp(self):
+        zope.component.hooks.setHooks()
+        self.global_config = mock.MagicMock()
+        zope.component.provideUtility(
+            self.global_config, provides=interfaces.IConfig)
+
+    def tearDown(self):
+        zope.component.getGlobalSiteManager().unregisterUtility(
+            self.global_config, provided=interfaces.IConfig)
+
+    @classmethod
+    def _call(cls, *args, **kwargs):
+        # pylint: disable=protected-access
+        from certbot.renewal import _provide_lineage_config
+        return _provide_lineage_config(*args, **kwargs)
+
+    def test_isolated(self):
+        lineage_config = mock.MagicMock()
+        seen = {}
+
+        def worker():
+            """Records the IConfig utility seen by another thread."""
+            with self._call(lineage_config, isolated=True):
+                seen['inside'] = zope.component.getUtility(interfaces.IConfig)
+                seen['display'] = zope.component.queryUtility(interfaces.IDisplay)
+            seen['after'] = zope.component.getUtility(interfaces.IConfig)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        self.assertTrue(seen['inside'] is lineage_config)
+        self.assertTrue(seen['after'] is self.global_config)
+        self.assertEqual(seen['display'],
+                         zope.component.queryUtility(interfaces.IDisplay))
+        self.assertTrue(
+            zope.component.getUtility(interfaces.IConfig) is self.global_config)
+
+
 if __name__ == "__main__":
     unittest.main()  # pragma: no cover
@@ -0,0 +1,91 @@
+"""Tests for certbot.startup_profile."""
+import sys
+import unittest
+
+import mock
+
+from certbot import startup_profile
+
+
+class PhaseTest(unittest.TestCase):
+    """Tests for certbot.startup_profile.phase."""
+
+    def setUp(self):
+        self.patches = [
+            mock.patch('certbot.startup_profile._PHASES', []),
+            mock.patch('certbot.startup_profile._enabled', False)]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+
+    def test_disabled(self):
+        with startup_profile.phase('parsing'):
+            pass
+        self.assertFalse(startup_profile.enabled())
+        self.assertEqual(startup_profile.phases(), [])
+
+    @mock.patch('certbot.startup_profile.time.time')
+    def test_enabled(self, mock_time):
+        mock_time.side_effect = [1.0, 1.5, 2.0, 4.0]
+        startup_profile.enable()
+        with startup_profile.phase('outer'):
+            with startup_profile.phase('inner'):
+                pass
+        self.assertTrue(startup_profile.enabled())
+        self.assertEqual(startup_profile.phases(),
+                         [('inner', 0.5), ('outer', 3.0)])
+
+    def test_exception(self):
+        startup_profile.enable()
+        def _fail():
+            with startup_profile.phase('failing'):
+                raise ValueError
+        self.assertRaises(ValueError, _fail)
+        self.assertEqual([name for name, _ in startup_profile.phases()],
+                         ['failing'])
+
+    def test_report(self):
+        startup_profile.enable()
+        with startup_profile.phase('parsing'):
+            pass
+        report = startup_profile.report([('certbot.main', 0.25)])
+        self.assertTrue('certbot.main' in report)
+        self.assertTrue('0.250s' in report)
+        self.assertTrue('parsing' in report)
+
+
+class ImportTimesTest(unittest.TestCase):
+    """Tests for certbot.startup_profile.import_times."""
+
+    IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2000 |       5000 | certbot.main
+import time:       300 |       3000 |   certbot.cli
+"""
+
+    def test_parse(self):
+        # pylint: disable=protected-access
+        self.assertEqual(
+            startup_profile._parse_importtime(self.IMPORTTIME),
+            [('certbot.main', 0.005), ('certbot.cli', 0.003),
+             ('_io', 0.00012)])
+
+    @mock.patch('certbot.startup_profile.subprocess')
+    def test_import_times(self, mock_subprocess):
+        mock_subprocess.Popen.return_value.communicate.return_value = (
+            '', self.IMPORTTIME)
+        times = startup_profile.import_times()
+        if sys.version_info >= (3, 7):
+            self.assertEqual(times[0], ('certbot.main', 0.005))
+            self.assertEqual(len(times), 3)
+        else:
+            self.assertEqual(len(times), 1)
+            self.assertEqual(times[0][0], 'certbot.main')
+
+
+if __name__ == '__main__':
+    unittest.main()  # pragma: no cover
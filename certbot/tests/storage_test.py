@@ -383,6 +383,29 @@ class RenewableCertTests(BaseRenewableCertTest):
         os.unlink(self.test_rc.cert)
         self.assertRaises(errors.CertStorageError, self.test_rc.names)
 
+    @mock.patch("certbot.storage.crypto_util.get_cert_info")
+    def test_cert_info_cached(self, mock_get_cert_info):
+        self._write_out_ex_kinds()
+        for _ in range(3):
+            self.test_rc.names()
+            self.test_rc.names(11)
+            self.test_rc.target_expiry  # pylint: disable=pointless-statement
+        self.assertEqual(mock_get_cert_info.call_count, 1)
+
+        self.test_rc.update_all_links_to(12)
+        self.test_rc.names()
+        self.assertEqual(mock_get_cert_info.call_count, 2)
+
+    def test_cert_info_file_changed(self):
+        self._write_out_kind("cert", 12, test_util.load_vector("cert_512.pem"))
+        self.assertEqual(self.test_rc.cert_info().serial, 1337)
+        self._write_out_kind("cert", 12, test_util.load_vector("cert-san_512.pem"))
+        self.assertEqual(self.test_rc.names(), ["example.com", "www.example.com"])
+
+    def test_cert_info_missing_version(self):
+        self._write_out_kind("cert", 12, test_util.load_vector("cert_512.pem"))
+        self.assertRaises(errors.CertStorageError, self.test_rc.cert_info, 99)
+
     @mock.patch("certbot.storage.datetime")
     def test_time_interval_judgments(self, mock_datetime):
         """Test should_autodeploy() and should_autorenew() on the basis
@@ -675,10 +698,31 @@ class RenewableCertTests(BaseRenewableCertTest):
             errors.CertStorageError,
             self.test_rc._update_link_to, "elephant", 17)
 
-    def test_ocsp_revoked(self):
-        # XXX: This is currently hardcoded to False due to a lack of an
-        #      OCSP server to test against.
-        self.assertFalse(self.test_rc.ocsp_revoked())
+    @mock.patch("certbot.storage.ocsp.RevocationChecker.ocsp_revoked")
+    def test_ocsp_revoked(self, mock_revoked):
+        for kind in ALL_FOUR:
+            self._write_out_kind(kind, 2)
+            self._write_out_kind(kind, 1)
+        mock_revoked.return_value = True
+        self.assertTrue(self.test_rc.ocsp_revoked())
+        mock_revoked.assert_called_once_with(
+            self.test_rc.version("cert", 1), self.test_rc.version("chain", 1))
+
+        mock_revoked.return_value = False
+        self.assertFalse(self.test_rc.ocsp_revoked(2))
+        mock_revoked.assert_called_with(
+            self.test_rc.version("cert", 2), self.test_rc.version("chain", 2))
+
+    def test_ocsp_revoked_checker(self):
+        for kind in ALL_FOUR:
+            self._write_out_kind(kind, 1)
+        checker = mock.MagicMock()
+        checker.ocsp_revoked.return_value = True
+        with mock.patch("certbot.storage.ocsp.RevocationChecker") as mock_checker:
+            self.assertTrue(self.test_rc.ocsp_revoked(checker=checker))
+        self.assertFalse(mock_checker.from_config.called)
+        checker.ocsp_revoked.assert_called_once_with(
+            self.test_rc.version("cert", 1), self.test_rc.version("chain", 1))
 
     def test_add_time_interval(self):
         from certbot import storage
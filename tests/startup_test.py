@@ -0,0 +1,199 @@
+"""Tests to ensure Certbot keeps starting up quickly.
+
+Each command is run in a new interpreter and checked in two ways:
+
+- the modules it imports must not include any plugin module nor any of
+  the slow optional dependencies listed in startup_budget.json, which
+  would mean that plugins are discovered or imported eagerly;
+- the fastest of a few runs must not take longer than its budget, which
+  is a multiple of the fastest run of a bare ``import certbot`` in the
+  same environment, so that budgets do not depend on the machine.
+
+Run with --record to write the measured ratios, plus a margin, to the
+budget file.
+
+"""
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import pkg_resources
+
+from certbot import constants
+
+
+logger = logging.getLogger(__name__)
+
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           'startup_budget.json')
+
+RUNS = 5
+"""Number of times each command is timed."""
+
+RECORD_MARGIN = 1.5
+"""Factor applied to measured ratios when recording budgets."""
+
+BASELINE_COMMAND = [sys.executable, '-c', 'import certbot']
+"""Command whose duration the budgets are relative to."""
+
+RUN_AND_LIST_MODULES = """
+import json
+import sys
+
+from certbot import main
+
+try:
+    main.main(sys.argv[2:])
+finally:
+    with open(sys.argv[1], 'w') as f:
+        json.dump(sorted(sys.modules), f)
+"""
+"""Script running Certbot with its arguments after the first one, then
+writing the names of the imported modules to the file named by the first
+one."""
+
+
+def main():
+    """Run the startup tests."""
+    logging.basicConfig(format='%(message)s', level=logging.INFO)
+    record = '--record' in sys.argv[1:]
+    with open(BUDGET_PATH) as f:
+        budget = json.load(f)
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        args = set_up_args(temp_dir)
+        unexpected = dict(
+            (subcommand, unexpected_modules(
+                args + [subcommand], os.path.join(temp_dir, 'modules.json'),
+                budget['forbidden_modules']))
+            for subcommand in sorted(budget['ratios']))
+        baseline = time_command(BASELINE_COMMAND)
+        ratios = dict(
+            (subcommand, time_command(
+                [sys.executable, '-m', 'certbot.main'] + args + [subcommand])
+             / baseline)
+            for subcommand in sorted(budget['ratios']))
+    finally:
+        shutil.rmtree(temp_dir)
+
+    if record:
+        budget['ratios'] = dict(
+            (subcommand, round(ratio * RECORD_MARGIN, 1))
+            for subcommand, ratio in ratios.items())
+        with open(BUDGET_PATH, 'w') as f:
+            json.dump(budget, f, indent=4, sort_keys=True)
+            f.write('\n')
+        logger.info('Startup budgets recorded in %s', BUDGET_PATH)
+        return
+
+    failures = []
+    for subcommand in sorted(ratios):
+        logger.info('certbot %s: %.1f times import certbot, which took '
+                    '%.3fs (budget %.1f times)', subcommand,
+                    ratios[subcommand], baseline,
+                    budget['ratios'][subcommand])
+        if unexpected[subcommand]:
+            failures.append('certbot {0} imported {1}'.format(
+                subcommand, ', '.join(unexpected[subcommand])))
+        if ratios[subcommand] > budget['ratios'][subcommand]:
+            failures.append('certbot {0} is over its startup time '
+                            'budget'.format(subcommand))
+    if failures:
+        sys.exit('{0}. Run certbot with --profile-startup to find out '
+                 'why.'.format('; '.join(failures)))
+    logger.info('Startup test ran successfully.')
+
+
+def set_up_args(temp_dir):
+    """Creates Certbot arguments using directories in temp_dir.
+
+    :param str temp_dir: path to an empty temporary directory
+
+    :returns: arguments to append a subcommand to
+    :rtype: `list` of `str`
+
+    """
+    args = []
+    for name in ('config', 'logs', 'work',):
+        path = os.path.join(temp_dir, name)
+        os.mkdir(path)
+        args.extend(['--{0}-dir'.format(name), path])
+    return args
+
+
+def plugin_modules():
+    """Finds the modules of the installed plugins.
+
+    :returns: names of the modules holding the plugin classes
+    :rtype: set
+
+    """
+    return set(
+        entry_point.module_name
+        for group in (constants.SETUPTOOLS_PLUGINS_ENTRY_POINT,
+                      constants.OLD_SETUPTOOLS_PLUGINS_ENTRY_POINT)
+        for entry_point in pkg_resources.iter_entry_points(group))
+
+
+def unexpected_modules(args, modules_path, forbidden):
+    """Runs Certbot once and finds the modules it should not have imported.
+
+    :param list args: arguments to run Certbot with
+    :param str modules_path: path of a file the names of the imported
+        modules are written to
+    :param list forbidden: top level packages that must not be imported
+
+    :returns: the plugin modules and modules of forbidden packages that
+        were imported
+    :rtype: `list` of `str`
+
+    """
+    run([sys.executable, '-c', RUN_AND_LIST_MODULES, modules_path] + args)
+    with open(modules_path) as f:
+        modules = json.load(f)
+    plugins = plugin_modules()
+    return [module for module in modules
+            if module in plugins or module.split('.')[0] in forbidden]
+
+
+def run(command):
+    """Runs command, exiting if it fails.
+
+    :param list command: program and its arguments to be run
+
+    """
+    process = subprocess.Popen(command, stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE,
+                               universal_newlines=True)
+    out, err = process.communicate()
+    if process.returncode:
+        logger.fatal('%s exited with a nonzero status!', ' '.join(command))
+        logger.info('stdout:\n%s\nstderr:\n%s', out, err)
+        sys.exit(1)
+
+
+def time_command(command):
+    """Times the fastest of several runs of command.
+
+    :param list command: program and its arguments to be run
+
+    :returns: duration of the fastest run in seconds
+    :rtype: float
+
+    """
+    durations = []
+    for _ in range(RUNS):
+        start = time.time()
+        run(command)
+        durations.append(time.time() - start)
+    return min(durations)
+
+
+if __name__ == "__main__":
+    main()